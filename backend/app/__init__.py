@@ -37,6 +37,7 @@ def create_app(config_class=Config):
     from .api.notifications import notifications_bp
     from .api.dashboard import dashboard_bp
     from .api.reports import reports_bp
+    from .api.health import health_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(users_bp, url_prefix='/api/users')
@@ -44,8 +45,13 @@ def create_app(config_class=Config):
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
     app.register_blueprint(dashboard_bp, url_prefix='/api/v1/dashboard')
     app.register_blueprint(reports_bp, url_prefix='/api/v1/reports')
+    app.register_blueprint(health_bp, url_prefix='/api/health')
 
     # 引入模型 (这部分代码不变)
     from .models import user, order, commission, notification
 
+    # 令牌吊销检查：角色变更、禁用、删除后，该用户此前签发的令牌立即失效
+    from .services import token_service
+    jwt.token_in_blocklist_loader(token_service.is_token_revoked)
+
     return app
\ No newline at end of file
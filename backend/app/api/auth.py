@@ -1,10 +1,21 @@
-from flask import Blueprint, request, jsonify
-from ..models.user import User
-from flask_jwt_extended import create_access_token
-import bcrypt
+import math
+from flask import Blueprint, request, jsonify, current_app
+from ..services import auth_service, token_service
+from ..schemas import user_schemas
+from ..utils.identity import current_identity
+from flask_jwt_extended import jwt_required, get_jwt
+from .. import db
 
 auth_bp = Blueprint('auth', __name__)
 
+def _client_ip() -> str | None:
+    """客户端IP：经过 TRUSTED_PROXY_COUNT 层代理时从 X-Forwarded-For 末尾往前取，不信任客户端自己填写的部分"""
+    proxy_count = current_app.config['TRUSTED_PROXY_COUNT']
+    forwarded = request.access_route
+    if proxy_count and request.headers.get('X-Forwarded-For') and len(forwarded) >= proxy_count:
+        return forwarded[-proxy_count]
+    return request.remote_addr
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -14,17 +25,56 @@ def login():
     if not username or not password:
         return jsonify({"msg": "Missing username or password"}), 400
 
-    user = User.query.filter_by(username=username).first()
+    try:
+        user = auth_service.authenticate(username, password, _client_ip())
+    except auth_service.LoginRateLimited as e:
+        response = jsonify({"msg": str(e)})
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+        return response, 429
+    except auth_service.LoginOverloaded as e:
+        response = jsonify({"msg": str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    if user:
+        # 短期 Access Token(附带角色等非敏感信息) + 一次性 Refresh Token
+        tokens = token_service.issue_tokens(user)
+        db.session.commit()
+        return jsonify(tokens)
+
+    return jsonify({"msg": "Bad username or password"}), 401
 
-    # 简化: 显式地检查用户存在并且密码匹配
-    if user and bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
-        if not user.is_active:
-            return jsonify({"msg": "User account is disabled"}), 403
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """用 Refresh Token 换发新的一对令牌，旧的 Refresh Token 随即作废"""
+    claims = get_jwt()
+    try:
+        tokens = token_service.rotate_refresh_token(int(claims['sub']), claims['jti'])
+        return jsonify(tokens), 200
+    except PermissionError as e:
+        db.session.rollback()
+        return jsonify({"msg": str(e)}), 401
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
 
-        # 创建Token时可以附带一些非敏感信息
-        additional_claims = {"role": user.role.value, "full_name": user.full_name}
-        access_token = create_access_token(identity=str(user.id), additional_claims=additional_claims)
-        
-        return jsonify(access_token=access_token)
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(refresh=True)
+def logout():
+    """登出：作废当前 Refresh Token"""
+    try:
+        token_service.revoke_refresh_token(get_jwt()['jti'])
+        return jsonify({"msg": "Logged out"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
 
-    return jsonify({"msg": "Bad username or password"}), 401
\ No newline at end of file
+@auth_bp.route('/me', methods=['GET'])
+@jwt_required()
+def get_current_user():
+    """返回当前登录用户的信息，用户对象来自本次请求的身份上下文"""
+    user = current_identity().user
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+    return jsonify(user_schemas.UserOut.model_validate(user).model_dump(mode='json')), 200
\ No newline at end of file
@@ -1,25 +1,36 @@
 # backend/app/api/dashboard.py
 
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import Blueprint, jsonify, request
+from pydantic import ValidationError
+from flask_jwt_extended import jwt_required
 from ..services import dashboard_service
+from ..schemas import dashboard_schemas
 from ..models.user import UserRole
 from ..utils.decorators import role_required
+from ..utils.identity import current_identity
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/personal', methods=['GET'])
 @jwt_required()
 def get_personal_dashboard():
-    """获取个人业绩仪表盘数据 (客服/技术)"""
-    current_user_id = int(get_jwt_identity())
-    claims = get_jwt()
-    user_role = claims.get("role")
+    """
+    获取个人业绩仪表盘数据 (客服/技术)
+    接收查询参数: period (month/quarter/custom), year, month, quarter, start_date, end_date
+    """
+    identity = current_identity()
+    current_user_id = identity.user_id
+    user_role = identity.role
 
     if user_role not in [UserRole.CUSTOMER_SERVICE.value, UserRole.DEVELOPER.value]:
         return jsonify({"msg": "This endpoint is for Customer Service or Developers only"}), 403
 
-    stats = dashboard_service.get_personal_stats(current_user_id, user_role)
+    try:
+        period = dashboard_schemas.DashboardPeriodQuery.model_validate(request.args.to_dict())
+    except ValidationError as e:
+        return jsonify(e.errors(include_context=False)), 400
+
+    stats = dashboard_service.get_personal_stats(current_user_id, user_role, period)
     return jsonify(stats), 200
 
 @dashboard_bp.route('/global', methods=['GET'])
@@ -34,6 +45,21 @@ def get_global_dashboard():
 @jwt_required()
 @role_required(UserRole.SUPER_ADMIN.value)
 def get_team_performance():
-    """获取团队绩效数据 (仅限超管)"""
-    stats = dashboard_service.get_team_performance_stats()
+    """
+    获取团队绩效数据 (仅限超管)
+    接收查询参数: period (month/quarter/custom), year, month, quarter, start_date, end_date
+    """
+    try:
+        period = dashboard_schemas.DashboardPeriodQuery.model_validate(request.args.to_dict())
+    except ValidationError as e:
+        return jsonify(e.errors(include_context=False)), 400
+
+    stats = dashboard_service.get_team_performance_stats(period)
     return jsonify(stats), 200
+
+@dashboard_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.SUPER_ADMIN.value)
+def get_dashboard_cache_stats():
+    """获取仪表盘缓存的命中/未命中计数 (仅限超管)"""
+    return jsonify(dashboard_service.get_cache_stats()), 200
@@ -0,0 +1,45 @@
+# backend/app/api/health.py
+
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from ..models.user import UserRole
+from ..utils.decorators import role_required
+from ..services import health_service
+
+health_bp = Blueprint('health', __name__)
+
+# 除 /details 外的健康检查接口无需登录，供 Docker HEALTHCHECK、负载均衡和监控调用，只返回状态与连接池计数
+
+@health_bp.route('', methods=['GET'])
+def health():
+    """健康状态与连接池计数：数据库不可用时返回 503"""
+    database = health_service.check_database()
+    return jsonify({
+        "status": "ok" if database['ok'] else "unavailable",
+        "pool": health_service.get_pool_stats()
+    }), 200 if database['ok'] else 503
+
+@health_bp.route('/details', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.SUPER_ADMIN.value)
+def health_details():
+    """完整健康报告(数据库耗时、各缓存/限流器/推送的计数)，仅超管可见"""
+    report = health_service.get_health_report()
+    status_code = 200 if report['database']['ok'] else 503
+    return jsonify(report), status_code
+
+@health_bp.route('/live', methods=['GET'])
+def liveness():
+    """存活检查：只说明进程能处理请求，不访问数据库，数据库故障时不应因此重启服务"""
+    return jsonify({"status": "ok"}), 200
+
+@health_bp.route('/ready', methods=['GET'])
+def readiness():
+    """就绪检查：数据库可用且往返耗时未超过 HEALTH_DB_LATENCY_THRESHOLD_MS 时才接收流量"""
+    database = health_service.check_database()
+    ready = database['ok'] and database['round_trip_ms'] <= current_app.config['HEALTH_DB_LATENCY_THRESHOLD_MS']
+    return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "database": database,
+        "pool": health_service.get_pool_stats()
+    }), 200 if ready else 503
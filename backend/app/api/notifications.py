@@ -1,38 +1,82 @@
 # backend/app/api/notifications.py (新建文件)
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from pydantic import ValidationError
+from .. import db
+from ..models.order import Order
+from ..models.user import UserRole
+from ..utils.decorators import role_required
+from ..utils.identity import current_identity
 from ..services import notification_service
 from ..schemas import notification_schemas
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 
 notifications_bp = Blueprint('notifications', __name__)
 
 @notifications_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_user_notifications():
-    """获取当前登录用户的通知列表"""
+    """
+    获取当前登录用户的通知列表（键集分页）
+    查询参数: unread_only, cursor, limit
+    """
     try:
-        current_user_id = int(get_jwt_identity())
-        notifications = notification_service.get_notifications_for_user(current_user_id)
+        current_user_id = current_identity().user_id
+        params = notification_schemas.NotificationListQuery.model_validate(request.args.to_dict())
+        notifications, next_cursor = notification_service.get_notifications_for_user(current_user_id, params)
         
         # 使用 Pydantic Schema 进行序列化
-        notifications_out = [
-            notification_schemas.NotificationOut.model_validate(n).model_dump(mode='json') 
-            for n in notifications
-        ]
-        return jsonify(notifications_out), 200
-        
+        page = notification_schemas.NotificationPageOut(items=notifications, next_cursor=next_cursor)
+        return jsonify(page.model_dump(mode='json')), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     except Exception as e:
         return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
 
 
+@notifications_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """获取当前登录用户的未读通知数，供前端轮询使用"""
+    try:
+        current_user_id = current_identity().user_id
+        return jsonify({"unread_count": notification_service.get_unread_count(current_user_id)}), 200
+    except Exception as e:
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
+
+@notifications_bp.route('/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_as_read():
+    """
+    批量标记已读，只执行一条 UPDATE.
+    请求体: {"all": true} 或 {"ids": [1, 2, 3]}
+    """
+    try:
+        current_user_id = current_identity().user_id
+        data = notification_schemas.NotificationMarkReadRequest.model_validate(request.get_json())
+        updated = notification_service.mark_notifications_as_read(
+            current_user_id,
+            None if data.all else data.ids
+        )
+        return jsonify({"updated": updated}), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors(include_context=False)), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
+
 @notifications_bp.route('/<int:notification_id>/read', methods=['POST'])
 @jwt_required()
 def mark_notification_as_read(notification_id: int):
     """将单条通知标记为已读"""
     try:
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_identity().user_id
         updated_notification = notification_service.mark_notification_as_read(
             notification_id,
             current_user_id
@@ -48,4 +92,89 @@ def mark_notification_as_read(notification_id: int):
     except PermissionError as e:
          return jsonify({"msg": str(e)}), 403
     except Exception as e:
-        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
\ No newline at end of file
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
+
+@notifications_bp.route('/stream-ticket', methods=['POST'])
+@jwt_required()
+def create_stream_ticket():
+    """签发打开通知推送连接用的短期凭证，避免把 Access Token 放进 URL(会被记录到访问日志)"""
+    ticket = notification_service.create_stream_ticket(current_identity().user_id)
+    return jsonify({
+        "ticket": ticket,
+        "expires_in": current_app.config['NOTIFICATION_STREAM_TICKET_SECONDS']
+    }), 200
+
+
+@notifications_bp.route('/stream', methods=['GET'])
+def stream_notifications():
+    """
+    通知实时推送 (Server-Sent Events)，只由单独的推送进程(NOTIFICATION_STREAM_ENABLED)提供。
+    浏览器的 EventSource 无法设置请求头，使用 /stream-ticket 签发的 ?ticket= 认证。
+    断线重连时根据 Last-Event-ID 请求头(或 last_event_id 参数)补发错过的通知。
+    """
+    config = current_app.config
+    if not config['NOTIFICATION_STREAM_ENABLED']:
+        # 普通 API worker 的线程数有限，不承载长连接
+        response = jsonify({"msg": "Notification stream is not served by this process"})
+        response.headers['Retry-After'] = '60'
+        return response, 503
+
+    current_user_id = notification_service.verify_stream_ticket(request.args.get('ticket', ''))
+    if current_user_id is None:
+        return jsonify({"msg": "Invalid or expired stream ticket"}), 401
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"msg": "Invalid Last-Event-ID"}), 400
+
+    stream = notification_service.open_notification_stream(
+        current_user_id,
+        last_event_id,
+        heartbeat_seconds=config['NOTIFICATION_STREAM_HEARTBEAT_SECONDS'],
+        max_duration_seconds=config['NOTIFICATION_STREAM_MAX_SECONDS'],
+        backfill_limit=config['NOTIFICATION_STREAM_BACKFILL_LIMIT']
+    )
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # 禁止 nginx 缓冲，事件才能即时到达
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@notifications_bp.route('/broadcast', methods=['POST'])
+@jwt_required()
+@role_required(UserRole.SUPER_ADMIN.value)
+def broadcast_notification():
+    """
+    超管批量发送通知.
+    请求体: {"content": "...", "role": "FINANCE"} 或 {"content": "...", "user_ids": [1, 2]}
+           或 {"content": "...", "order_id": 1} (通知该订单的客服和技术)
+    可选: related_order_id, dedup_window_seconds
+    """
+    try:
+        data = notification_schemas.NotificationBroadcast.model_validate(request.get_json())
+
+        if data.order_id is not None:
+            order = db.session.get(Order, data.order_id)
+            if not order:
+                return jsonify({"msg": "Order not found"}), 404
+            sent = notification_service.notify_order_team(order, data.content, data.dedup_window_seconds)
+        elif data.role is not None:
+            sent = notification_service.notify_role(
+                data.role, data.content, data.related_order_id, data.dedup_window_seconds
+            )
+        else:
+            sent = notification_service.notify_users(
+                data.user_ids, data.content, data.related_order_id, data.dedup_window_seconds
+            )
+        db.session.commit()
+        return jsonify({"sent": sent}), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors(include_context=False)), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
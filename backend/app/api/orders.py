@@ -5,12 +5,13 @@ from pydantic import ValidationError
 from .. import db
 from ..models.user import UserRole
 # --- 修改 schemas 导入 ---
-from ..schemas import order_schemas, work_log_schemas
+from ..schemas import order_schemas, work_log_schemas, commission_schemas
 from ..utils.decorators import role_required
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from ..utils.identity import current_identity
+from flask_jwt_extended import jwt_required
 
 # --- 修改 services 导入 ---
-from ..services import order_service, work_log_service
+from ..services import order_service, work_log_service, commission_service
 
 orders_bp = Blueprint('orders', __name__)
 
@@ -21,7 +22,7 @@ def create_order():
     """客服创建新订单"""
     try:
         order_data = order_schemas.OrderCreate.model_validate(request.get_json())
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_identity().user_id
 
         # --- CHANGED: 调用服务层来处理业务逻辑 ---
         new_order = order_service.create_order(order_data, current_user_id)
@@ -35,25 +36,72 @@ def create_order():
         db.session.rollback()
         return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
 
+@orders_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@role_required(UserRole.CUSTOMER_SERVICE.value)
+def bulk_create_orders():
+    """
+    客服批量创建订单.
+    请求体: {"orders": [{"customer_info": {...}, "requirements_desc": "..."}, ...]}
+    返回每一项的结果，index 对应请求中的序号；校验失败的项不影响其他项。
+    """
+    try:
+        data = order_schemas.OrderBulkCreate.model_validate(request.get_json())
+        current_user_id = current_identity().user_id
+
+        results = []
+        valid_items = []
+        for index, raw in enumerate(data.orders):
+            try:
+                valid_items.append((index, order_schemas.OrderCreate.model_validate(raw)))
+            except ValidationError as e:
+                results.append({"index": index, "ok": False, "error": e.errors(include_context=False)})
+
+        results.extend(order_service.bulk_create_orders(valid_items, current_user_id))
+        results.sort(key=lambda r: r["index"])
+        success_count = sum(1 for r in results if r["ok"])
+        return jsonify({
+            "results": results,
+            "success_count": success_count,
+            "failure_count": len(results) - success_count
+        }), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
 @orders_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_orders():
-    """获取订单列表（根据角色区分）"""
-    claims = get_jwt()
-    user_role = claims.get("role")
-    user_id = int(get_jwt_identity())
-    
-    # --- CHANGED: 调用服务层来获取数据 ---
-    orders = order_service.get_orders_for_user(user_id, user_role)
+    """
+    获取订单列表（根据角色区分），支持筛选与游标分页。
+    接收查询参数: status, creator_id, developer_id, start_date, end_date (YYYY-MM-DD), cursor, limit
+    """
+    try:
+        identity = current_identity()
+        user_role = identity.role
+        user_id = identity.user_id
+
+        params = order_schemas.OrderListQuery.model_validate(request.args.to_dict())
+
+        # --- CHANGED: 调用服务层来获取分页数据 ---
+        orders, next_cursor = order_service.get_orders_for_user(user_id, user_role, params)
 
-    orders_out = [order_schemas.OrderOut.model_validate(order).model_dump(mode='json') for order in orders]
-    return jsonify(orders_out), 200
+        page = order_schemas.OrderPageOut(items=orders, next_cursor=next_cursor)
+        return jsonify(page.model_dump(mode='json')), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
 @orders_bp.route('/<int:order_id>', methods=['GET'])
 @jwt_required()
 def get_order_details(order_id: int):
     """获取单个订单的详细信息"""
-    order = order_service.get_order_by_id(order_id)
+    order = order_service.get_order_detail(order_id)
     if not order:
         return jsonify({"msg": "Order not found"}), 404
     
@@ -69,8 +117,9 @@ def update_order_status_route(order_id: int):
     核心接口：驱动订单生命周期流转
     """
     try:
-        claims = get_jwt()
-        user_role = claims.get("role")
+        identity = current_identity()
+        user_role = identity.role
+        current_user_id = identity.user_id
         
         order = order_service.get_order_by_id(order_id)
         if not order:
@@ -79,7 +128,7 @@ def update_order_status_route(order_id: int):
         data = order_schemas.OrderStatusUpdate.model_validate(request.get_json())
         
         # 调用服务层处理状态变更
-        order_service.update_order_status(order, data.status, user_role)
+        order_service.update_order_status(order, data.status, user_role, current_user_id)
 
         return jsonify({"message": f"订单状态已成功更新为 [{data.status.value}]"}), 200
 
@@ -92,6 +141,67 @@ def update_order_status_route(order_id: int):
         return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
 
 
+@orders_bp.route('/status/bulk', methods=['POST'])
+@jwt_required()
+def bulk_update_order_status_route():
+    """
+    批量流转订单状态，例如财务一次核验或结算多个订单.
+    请求体: {"items": [{"order_id": 1, "status": "已结算"}, ...]}
+    每一项按与单个接口相同的规则校验，返回每一项的结果。
+    """
+    try:
+        identity = current_identity()
+        user_role = identity.role
+        current_user_id = identity.user_id
+
+        data = order_schemas.OrderStatusBulkUpdate.model_validate(request.get_json())
+        results = order_service.bulk_update_order_status(
+            [(item.order_id, item.status) for item in data.items], user_role, current_user_id
+        )
+        success_count = sum(1 for r in results if r["ok"])
+        return jsonify({
+            "results": results,
+            "success_count": success_count,
+            "failure_count": len(results) - success_count
+        }), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors(include_context=False)), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
+
+@orders_bp.route('/<int:order_id>/transitions', methods=['GET'])
+@jwt_required()
+def get_order_transitions(order_id: int):
+    """获取当前用户可以将订单流转到的下一步状态，前端据此展示操作按钮"""
+    order = order_service.get_order_by_id(order_id)
+    if not order:
+        return jsonify({"msg": "Order not found"}), 404
+
+    identity = current_identity()
+    transitions = order_schemas.OrderTransitionsOut(
+        order_id=order.id,
+        status=order.status,
+        next_statuses=order_service.get_allowed_next_statuses(order, identity.role, identity.user_id)
+    )
+    return jsonify(transitions.model_dump(mode='json')), 200
+
+
+@orders_bp.route('/<int:order_id>/status-events', methods=['GET'])
+@jwt_required()
+def get_order_status_events(order_id: int):
+    """获取订单的状态流转记录"""
+    order = order_service.get_order_by_id(order_id)
+    if not order:
+        return jsonify({"msg": "Order not found"}), 404
+
+    events = order_service.get_status_events(order)
+    events_out = [order_schemas.OrderStatusEventOut.model_validate(e).model_dump(mode='json') for e in events]
+    return jsonify(events_out), 200
+
+
 @orders_bp.route('/<int:order_id>', methods=['PATCH'])
 @jwt_required()
 # --- 修改点 1: 允许超管也能调用此接口 ---
@@ -104,8 +214,7 @@ def update_order_details_route(order_id: int):
             return jsonify({"msg": "Order not found"}), 404
         
         # --- 修改点 2: 从JWT中获取当前用户的角色 ---
-        claims = get_jwt()
-        user_role = claims.get("role")
+        user_role = current_identity().role
         
         update_data = order_schemas.OrderUpdateByCs.model_validate(request.get_json())
         
@@ -134,8 +243,9 @@ def set_commission_override_route(order_id: int):
             return jsonify({"msg": "Order not found"}), 404
             
         override_data = order_schemas.CommissionOverrideUpdate.model_validate(request.get_json())
+        user_role = current_identity().role
 
-        order_service.set_commission_override(order, override_data)
+        order_service.set_commission_override(order, override_data, user_role)
         
         return '', 204 # 204 No Content表示成功，无需返回内容
         
@@ -147,6 +257,25 @@ def set_commission_override_route(order_id: int):
         db.session.rollback()
         return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
     
+@orders_bp.route('/commissions/recalculate', methods=['POST'])
+@jwt_required()
+@role_required([UserRole.SUPER_ADMIN.value, UserRole.FINANCE.value])
+def recalculate_commissions_route():
+    """
+    批量重算已核验订单的提成（调整提成比例后使用）。
+    请求体: {"user_ids": [...], "order_ids": [...], "dry_run": true}，默认只预览差异。
+    """
+    try:
+        data = commission_schemas.CommissionRecalculateRequest.model_validate(request.get_json() or {})
+        result = commission_service.recalculate_commissions(data.user_ids, data.order_ids, data.dry_run)
+        return jsonify(commission_schemas.CommissionRecalculateResult.model_validate(result).model_dump(mode='json')), 200
+
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
     # ---【任务 4.1】新增工作日志提交 API ---
 @orders_bp.route('/<int:order_id>/work_logs', methods=['POST'])
 @jwt_required()
@@ -158,9 +287,9 @@ def add_work_log_route(order_id: int):
         if not order:
             return jsonify({"msg": "Order not found"}), 404
 
-        current_user_id = int(get_jwt_identity())
-        claims = get_jwt()
-        user_role = claims.get("role")
+        identity = current_identity()
+        current_user_id = identity.user_id
+        user_role = identity.role
 
         log_data = work_log_schemas.WorkLogCreate.model_validate(request.get_json())
         
@@ -1,8 +1,10 @@
 # backend/app/api/reports.py
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, Response, send_file
+from pydantic import ValidationError
 from flask_jwt_extended import jwt_required
-from ..services import report_service
+from ..services import report_service, report_job_service
+from ..schemas import report_schemas
 from ..models.user import UserRole
 from ..utils.decorators import role_required
 
@@ -27,15 +29,68 @@ def download_settled_orders_report():
         
         filename = f"settled_orders_{start_date}_to_{end_date}.xlsx"
         
-        return send_file(
-            excel_file,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # 文件已写入临时文件，分块流式返回给客户端
+        return Response(
+            report_service.iter_file_chunks(excel_file),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
     except ValueError as e:
         return jsonify({"msg": str(e)}), 400
     except Exception as e:
         # 在生产环境中，应该记录更详细的错误日志
-        return jsonify({"msg": "An unexpected error occurred while generating the report."}), 500
\ No newline at end of file
+        return jsonify({"msg": "An unexpected error occurred while generating the report."}), 500
+
+
+@reports_bp.route('/jobs', methods=['POST'])
+@jwt_required()
+@role_required([UserRole.FINANCE.value, UserRole.SUPER_ADMIN.value])
+def submit_report_job():
+    """
+    提交已结算订单报表的后台生成任务，立即返回任务ID.
+    请求体: {"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}
+    相同参数的任务正在执行或已有缓存结果时直接复用。
+    """
+    try:
+        job_data = report_schemas.ReportJobCreate.model_validate(request.get_json())
+        job = report_job_service.submit_settled_orders_job(job_data.start_date, job_data.end_date)
+        return jsonify(job), 202
+
+    except ValidationError as e:
+        return jsonify(e.errors(include_context=False)), 400
+    except Exception as e:
+        return jsonify({"msg": "An unexpected error occurred", "details": str(e)}), 500
+
+
+@reports_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@role_required([UserRole.FINANCE.value, UserRole.SUPER_ADMIN.value])
+def get_report_job(job_id: str):
+    """查询报表任务状态"""
+    job = report_job_service.get_job(job_id)
+    if not job:
+        return jsonify({"msg": "Report job not found or expired"}), 404
+    return jsonify(job), 200
+
+
+@reports_bp.route('/jobs/<job_id>/download', methods=['GET'])
+@jwt_required()
+@role_required([UserRole.FINANCE.value, UserRole.SUPER_ADMIN.value])
+def download_report_job(job_id: str):
+    """下载已完成的报表任务结果"""
+    job = report_job_service.get_job(job_id)
+    if not job:
+        return jsonify({"msg": "Report job not found or expired"}), 404
+
+    result_path = report_job_service.get_job_result_path(job_id)
+    if not result_path:
+        return jsonify({"msg": f"Report job is not ready (status: {job['status']})"}), 409
+
+    params = job['params']
+    return send_file(
+        result_path,
+        as_attachment=True,
+        download_name=f"settled_orders_{params['start_date']}_to_{params['end_date']}.xlsx",
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
@@ -1,15 +1,16 @@
 # backend/app/api/users.py
 
-from flask import Blueprint, request, jsonify
+import os
+from flask import Blueprint, request, jsonify, current_app
 from pydantic import ValidationError
 from .. import db
 from ..models.user import UserRole
 from ..schemas import user_schemas
 from ..utils.decorators import role_required
-from flask_jwt_extended import jwt_required, get_jwt
-from io import BytesIO # + 新增
+from ..utils.identity import current_identity
+from flask_jwt_extended import jwt_required
 # --- ADDED: 导入新的服务层 ---
-from ..services import user_service
+from ..services import user_service, user_import_job_service, user_directory_service
 
 users_bp = Blueprint('users', __name__)
 
@@ -37,19 +38,22 @@ def create_user_route():
 @jwt_required()
 def get_users_route():
     """获取用户列表（根据调用者角色返回不同数据）"""
-    claims = get_jwt()
-    current_user_role = claims.get("role")
+    current_user_role = current_identity().role
 
-    # --- CHANGED: 业务逻辑移至服务层 ---
+    # --- CHANGED: 从用户目录缓存读取已序列化的列表，并支持 ETag 条件请求 ---
     if current_user_role == UserRole.SUPER_ADMIN.value:
-        users = user_service.get_all_users()
+        users_out, etag = user_directory_service.list_users()
     elif current_user_role == UserRole.CUSTOMER_SERVICE.value:
-        users = user_service.get_active_developers()
+        users_out, etag = user_directory_service.list_active_developers()
     else:
-        users = [] # 其他角色无权获取列表
+        return jsonify([]), 200 # 其他角色无权获取列表
 
-    users_out = [user_schemas.UserOut.model_validate(user).model_dump(mode='json') for user in users]
-    return jsonify(users_out), 200
+    response = jsonify(users_out)
+    response.set_etag(etag)
+    # 浏览器每次都带 If-None-Match 重新验证，列表未变化时返回 304 且不传输响应体
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
 @jwt_required()
@@ -116,7 +120,7 @@ def delete_user_route(user_id: int):
 @jwt_required()
 @role_required(UserRole.SUPER_ADMIN.value)
 def import_users_route():
-    """超管通过上传Excel文件批量导入用户"""
+    """超管通过上传Excel或CSV文件批量导入用户"""
     if 'file' not in request.files:
         return jsonify({"msg": "请求中未包含文件部分(file part)"}), 400
     
@@ -124,17 +128,63 @@ def import_users_route():
     if file.filename == '':
         return jsonify({"msg": "未选择任何文件"}), 400
 
-    if file and file.filename.endswith('.xlsx'):
-        try:
-            # 将文件内容读入内存中的字节流
-            file_stream = BytesIO(file.read())
-            result = user_service.batch_import_users(file_stream)
-            return jsonify(result), 200
-        except ValueError as e:
-            return jsonify({"msg": str(e)}), 400
-        except Exception as e:
-            # 确保在未知错误发生时回滚会话
-            db.session.rollback()
-            return jsonify({"msg": "处理文件时发生意外错误", "details": str(e)}), 500
-    else:
-        return jsonify({"msg": "文件类型无效，请上传 .xlsx 文件"}), 400
\ No newline at end of file
+    path = None
+    try:
+        file_format = user_service.detect_import_format(file.filename)
+        # 将上传内容分块落盘，而不是整个读入内存
+        path = user_service.spool_upload_to_disk(file)
+
+        def log_progress(done, total, success_count, failure_count):
+            current_app.logger.info(
+                "User import %s: %d/%d rows processed (%d ok, %d failed)",
+                file.filename, done, total, success_count, failure_count
+            )
+
+        result = user_service.batch_import_users(path, file_format, log_progress)
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except Exception as e:
+        # 确保在未知错误发生时回滚会话
+        db.session.rollback()
+        return jsonify({"msg": "处理文件时发生意外错误", "details": str(e)}), 500
+    finally:
+        if path:
+            os.remove(path)
+
+
+@users_bp.route('/import/jobs', methods=['POST'])
+@jwt_required()
+@role_required(UserRole.SUPER_ADMIN.value)
+def submit_import_job_route():
+    """
+    超管上传Excel或CSV文件，在后台批量导入用户，立即返回任务ID.
+    适用于大文件，避免请求超过 gunicorn 超时时间。
+    """
+    if 'file' not in request.files:
+        return jsonify({"msg": "请求中未包含文件部分(file part)"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"msg": "未选择任何文件"}), 400
+
+    try:
+        file_format = user_service.detect_import_format(file.filename)
+        path = user_service.spool_upload_to_disk(file)
+        job = user_import_job_service.submit_import_job(path, file_format, file.filename, current_identity().user_id)
+        return jsonify(job), 202
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except Exception as e:
+        return jsonify({"msg": "处理文件时发生意外错误", "details": str(e)}), 500
+
+
+@users_bp.route('/import/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.SUPER_ADMIN.value)
+def get_import_job_route(job_id: str):
+    """查询批量导入任务的进度(已处理行数、成功数、失败数、预计剩余时间)及最终错误列表"""
+    job = user_import_job_service.get_job(job_id)
+    if not job:
+        return jsonify({"msg": "Import job not found or expired"}), 404
+    return jsonify(job), 200
@@ -22,4 +22,22 @@ class Commission(db.Model):
     user = db.relationship('User', back_populates='commissions')
 
     def __repr__(self):
-        return f'<Commission {self.id} for Order {self.order_id}>'
\ No newline at end of file
+        return f'<Commission {self.id} for Order {self.order_id}>'
+
+# --- ADDED: 按用户/角色/月份预聚合的提成汇总，由 commission_service 在同一事务中维护 ---
+class CommissionMonthlyRollup(db.Model):
+    __tablename__ = 'commission_monthly_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'role_at_time', 'month', name='uq_commission_rollup_user_role_month'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, comment="提成归属的用户ID")
+    role_at_time = db.Column(db.String(50), nullable=False, comment="计算时该用户在订单中的角色(客服/技术)")
+    month = db.Column(db.Date, nullable=False, comment="所属月份(当月1日)")
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0, comment="当月提成总额")
+    commission_count = db.Column(db.Integer, nullable=False, default=0, comment="当月提成记录数")
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CommissionMonthlyRollup user={self.user_id} {self.role_at_time} {self.month}>'
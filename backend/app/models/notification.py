@@ -5,6 +5,14 @@ from datetime import datetime
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # 收件箱键集分页: WHERE recipient_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_notifications_recipient_created_at_id', 'recipient_id', 'created_at', 'id'),
+        # 未读数统计: WHERE recipient_id = ? AND is_read = 0，只需扫描索引
+        db.Index('ix_notifications_recipient_read_created_at', 'recipient_id', 'is_read', 'created_at'),
+        # 归档任务按时间顺序分批挑选已读的旧通知
+        db.Index('ix_notifications_read_created_at', 'is_read', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, comment="通知ID(主键)")
     recipient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, comment="接收通知的用户ID")
@@ -20,4 +28,26 @@ class Notification(db.Model):
     recipient = db.relationship('User', back_populates='notifications')
 
     def __repr__(self):
-        return f'<Notification {self.id} for User {self.recipient_id}>'
\ No newline at end of file
+        return f'<Notification {self.id} for User {self.recipient_id}>'
+
+
+class NotificationArchive(db.Model):
+    """
+    已归档的通知：已读且超过保留期的通知从 notifications 表移到这里。
+    不设外键，主键包含 created_at，便于需要时在 MySQL 中按 created_at 做范围分区。
+    """
+    __tablename__ = 'notifications_archive'
+    __table_args__ = (
+        db.Index('ix_notifications_archive_recipient_created_at', 'recipient_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False, comment="原通知ID")
+    created_at = db.Column(db.DateTime, primary_key=True, comment="通知创建时间")
+    recipient_id = db.Column(db.Integer, nullable=False, comment="接收通知的用户ID")
+    content = db.Column(db.String(255), nullable=False, comment="通知内容")
+    is_read = db.Column(db.Boolean, nullable=False, comment="是否已读")
+    related_order_id = db.Column(db.Integer, nullable=True, comment="(可选)关联的订单ID")
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, comment="归档时间")
+
+    def __repr__(self):
+        return f'<NotificationArchive {self.id} for User {self.recipient_id}>'
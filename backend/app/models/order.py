@@ -21,6 +21,18 @@ class OrderStatus(Enum):
 # 订单数据模型
 class Order(db.Model):
     __tablename__ = 'orders'
+    # --- ADDED: 订单列表键集分页 (created_at, id) 及各筛选条件所需的复合索引 ---
+    __table_args__ = (
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_creator_created_at_id', 'creator_id', 'created_at', 'id'),
+        db.Index('ix_orders_developer_created_at_id', 'developer_id', 'created_at', 'id'),
+        db.Index('ix_orders_status_created_at_id', 'status', 'created_at', 'id'),
+        # --- ADDED: 仪表盘业绩统计的覆盖索引 ---
+        db.Index('ix_orders_creator_created_at_price', 'creator_id', 'created_at', 'final_price'),
+        db.Index('ix_orders_developer_settled_at_price', 'developer_id', 'settled_at', 'final_price'),
+        # --- ADDED: 报表按真实结算时间做范围扫描 ---
+        db.Index('ix_orders_settled_at', 'settled_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     
@@ -51,6 +63,9 @@ class Order(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     shipped_at = db.Column(db.DateTime, nullable=True)
+    # --- ADDED: 冗余记录关键状态的发生时间，详细流转记录见 order_status_events ---
+    verified_at = db.Column(db.DateTime, nullable=True, comment="财务核验时间")
+    settled_at = db.Column(db.DateTime, nullable=True, comment="结算时间")
 
     # 关系定义
     creator = db.relationship('User', back_populates='orders_created', foreign_keys=[creator_id])
@@ -59,6 +74,8 @@ class Order(db.Model):
     
     # --- ADDED: 新增与提成表的关系 ---
     commissions = db.relationship('Commission', back_populates='order', cascade="all, delete-orphan")
+    status_events = db.relationship('OrderStatusEvent', back_populates='order', cascade="all, delete-orphan",
+                                    order_by='OrderStatusEvent.id', lazy='dynamic')
 
     def __repr__(self):
         return f'<Order {self.id}>'
@@ -81,4 +98,36 @@ class WorkLog(db.Model):
     developer = db.relationship('User', back_populates='work_logs')
 
     def __repr__(self):
-        return f'<WorkLog for Order {self.order_id}>'
\ No newline at end of file
+        return f'<WorkLog for Order {self.order_id}>'
+
+# --- ADDED: 订单状态流转记录 (只追加，不修改) ---
+class OrderStatusEvent(db.Model):
+    __tablename__ = 'order_status_events'
+    __table_args__ = (
+        db.Index('ix_order_status_events_order_id_id', 'order_id', 'id'),
+        db.Index('ix_order_status_events_to_status_created_at', 'to_status', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    from_status = db.Column(db.Enum(OrderStatus), nullable=True, comment="变更前状态, 创建订单时为空")
+    to_status = db.Column(db.Enum(OrderStatus), nullable=False, comment="变更后状态")
+    changed_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, comment="操作人ID")
+    changed_by_role = db.Column(db.String(50), nullable=True, comment="操作时的角色")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, comment="状态变更时间")
+
+    # 关系定义
+    order = db.relationship('Order', back_populates='status_events')
+
+    def __repr__(self):
+        return f'<OrderStatusEvent {self.from_status} -> {self.to_status} for Order {self.order_id}>'
+
+# --- ADDED: 订单业务ID的按天计数器，生成 order_uid 时在事务中加行锁递增 ---
+class OrderUidSequence(db.Model):
+    __tablename__ = 'order_uid_sequences'
+
+    day = db.Column(db.Date, primary_key=True, comment="日期(UTC)")
+    last_value = db.Column(db.Integer, nullable=False, default=0, comment="当天已分配的最大序号")
+
+    def __repr__(self):
+        return f'<OrderUidSequence {self.day}: {self.last_value}>'
@@ -1,8 +1,9 @@
 # backend/app/models/user.py
 
 from .. import db
+from datetime import datetime
 from enum import Enum
-from sqlalchemy.dialects.mysql import JSON # 建议显式导入
+from sqlalchemy.dialects.mysql import DATETIME, JSON # 建议显式导入
 
 # 定义用户角色的枚举 (保持不变)
 class UserRole(Enum):
@@ -30,6 +31,12 @@ class User(db.Model):
 
     financial_account = db.Column(db.String(255), nullable=True, comment="财务账号(银行卡/支付宝)") # 
     is_active = db.Column(db.Boolean, default=True)
+    # 各 worker 的用户目录缓存以 (最大 updated_at, 用户数) 为版本；MySQL 上保留微秒，同一秒内的修改也能区分
+    updated_at = db.Column(
+        db.DateTime().with_variant(DATETIME(fsp=6), 'mysql'),
+        nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True,
+        comment="最后修改时间(UTC)"
+    )
 
     # --- 关系定义 (保持不变) ---
     # 一个客服创建多个订单
@@ -44,4 +51,30 @@ class User(db.Model):
     notifications = db.relationship('Notification', back_populates='recipient', lazy='dynamic')
 
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<User {self.username}>'
+
+# --- ADDED: 令牌吊销与刷新令牌轮换 ---
+class TokenRevocation(db.Model):
+    """每个用户一行：签发时间早于 not_before 的令牌一律失效(角色变更、禁用、改密码、删除时更新)"""
+    __tablename__ = 'token_revocations'
+
+    # 不设外键：用户删除后仍需保留吊销记录
+    user_id = db.Column(db.Integer, primary_key=True)
+    not_before = db.Column(db.DateTime, nullable=False, comment="早于该时间(UTC)签发的令牌无效")
+    updated_at = db.Column(db.DateTime, nullable=False, index=True, comment="各 worker 按该字段增量同步")
+
+    def __repr__(self):
+        return f'<TokenRevocation user={self.user_id} not_before={self.not_before}>'
+
+
+class RefreshToken(db.Model):
+    """已签发的刷新令牌，每个只能使用一次，使用后换发新令牌"""
+    __tablename__ = 'refresh_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime, nullable=True, comment="已使用(轮换或登出)的时间，为空表示仍可使用")
+
+    def __repr__(self):
+        return f'<RefreshToken {self.jti} user={self.user_id}>'
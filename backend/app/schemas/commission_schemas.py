@@ -1,6 +1,7 @@
 # backend/app/schemas/commission_schemas.py
 
 from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -16,4 +17,29 @@ class CommissionOut(CommissionBase):
     # --- ADDED: 嵌套返回用户信息，便于前端展示 ---
     full_name: str | None = Field(None, alias="user.full_name")
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# --- ADDED: 批量重算提成的请求参数 ---
+class CommissionRecalculateRequest(BaseModel):
+    user_ids: Optional[List[int]] = Field(None, description="只重算这些用户(客服或技术)参与的订单")
+    order_ids: Optional[List[int]] = Field(None, description="只重算这些订单")
+    dry_run: bool = Field(True, description="为 true 时只返回差异，不写入数据库")
+
+class CommissionChange(BaseModel):
+    user_id: int
+    role_at_time: str
+    old_amount: Optional[Decimal] = None
+    new_amount: Optional[Decimal] = None
+
+class CommissionOrderDiff(BaseModel):
+    order_id: int
+    order_uid: str
+    changes: List[CommissionChange]
+
+# --- ADDED: 批量重算提成的结果 ---
+class CommissionRecalculateResult(BaseModel):
+    dry_run: bool
+    orders_scanned: int
+    orders_changed: int
+    total_delta: Decimal
+    diffs: List[CommissionOrderDiff]
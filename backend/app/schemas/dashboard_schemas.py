@@ -0,0 +1,27 @@
+# backend/app/schemas/dashboard_schemas.py
+
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
+from datetime import date
+
+# 仪表盘统计周期的查询参数
+# - month: 按自然月统计，可选 year/month，默认当月
+# - quarter: 按季度统计，可选 year/quarter，默认当季
+# - custom: 自定义日期范围，必须提供 start_date 和 end_date (含当天)
+#   日期范围与 year 一致，保证计算周期结束时间(end_date 加一天)时不会溢出
+class DashboardPeriodQuery(BaseModel):
+    period: Literal['month', 'quarter', 'custom'] = 'month'
+    year: Optional[int] = Field(None, ge=2000, le=9998)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    quarter: Optional[int] = Field(None, ge=1, le=4)
+    start_date: Optional[date] = Field(None, ge=date(2000, 1, 1), le=date(9998, 12, 31))
+    end_date: Optional[date] = Field(None, ge=date(2000, 1, 1), le=date(9998, 12, 31))
+
+    @model_validator(mode='after')
+    def check_custom_range(self):
+        if self.period == 'custom':
+            if self.start_date is None or self.end_date is None:
+                raise ValueError("start_date and end_date are required for a custom period")
+            if self.end_date < self.start_date:
+                raise ValueError("end_date must not be earlier than start_date")
+        return self
@@ -1,8 +1,9 @@
 # backend/app/schemas/notification_schemas.py
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from ..models.user import UserRole
 
 class NotificationBase(BaseModel):
     content: str
@@ -13,4 +14,40 @@ class NotificationBase(BaseModel):
 class NotificationOut(NotificationBase):
     id: int
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class NotificationListQuery(BaseModel):
+    unread_only: bool = Field(False, description="只返回未读通知")
+    cursor: Optional[str] = Field(None, description="上一页返回的 next_cursor")
+    limit: int = Field(20, ge=1, description="每页条数, 超过上限时按上限处理")
+
+class NotificationPageOut(BaseModel):
+    items: List[NotificationOut]
+    next_cursor: Optional[str] = None
+
+class NotificationMarkReadRequest(BaseModel):
+    """批量标记已读: all 为 true 时标记全部, 否则标记 ids 中的通知"""
+    all: bool = False
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+
+    @model_validator(mode='after')
+    def check_target(self):
+        if self.all == bool(self.ids):
+            raise ValueError("Specify either 'all': true or a non-empty 'ids' list.")
+        return self
+
+class NotificationBroadcast(BaseModel):
+    """批量发送通知，role / user_ids / order_id(订单的客服和技术) 三选一"""
+    content: str = Field(..., min_length=1, max_length=255)
+    role: Optional[UserRole] = None
+    user_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    order_id: Optional[int] = None
+    related_order_id: Optional[int] = None
+    dedup_window_seconds: Optional[int] = Field(None, ge=0, description="该时间窗口内已收到相同通知的用户不再发送")
+
+    @model_validator(mode='after')
+    def check_target(self):
+        targets = [self.role is not None, bool(self.user_ids), self.order_id is not None]
+        if sum(targets) != 1:
+            raise ValueError("Specify exactly one of 'role', 'user_ids' or 'order_id'.")
+        return self
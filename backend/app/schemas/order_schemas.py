@@ -1,8 +1,8 @@
 # backend/app/schemas/order_schemas.py
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 from decimal import Decimal
 from ..models.order import OrderStatus
 from .user_schemas import UserOut
@@ -31,13 +31,44 @@ class OrderUpdateByCs(BaseModel):
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus = Field(..., description="目标状态")
 
+# --- ADDED: 批量创建订单，每一项按 OrderCreate 单独校验 ---
+class OrderBulkCreate(BaseModel):
+    orders: List[Dict[str, Any]] = Field(..., min_length=1, max_length=500)
+
+# --- ADDED: 批量流转订单状态 ---
+class OrderStatusBulkItem(BaseModel):
+    order_id: int
+    status: OrderStatus = Field(..., description="目标状态")
+
+class OrderStatusBulkUpdate(BaseModel):
+    items: List[OrderStatusBulkItem] = Field(..., min_length=1, max_length=500)
+
+    @model_validator(mode='after')
+    def check_unique_orders(self):
+        # 同一订单出现两次时，两项都按原状态校验通过，第二项会在已流转的状态上再次执行
+        order_ids = [item.order_id for item in self.items]
+        if len(order_ids) != len(set(order_ids)):
+            raise ValueError("Each order_id may appear only once.")
+        return self
+
+# --- ADDED: 订单列表查询参数（筛选 + 键集分页） ---
+class OrderListQuery(BaseModel):
+    status: Optional[OrderStatus] = Field(None, description="按状态筛选")
+    creator_id: Optional[int] = Field(None, description="按创建人(客服)筛选")
+    developer_id: Optional[int] = Field(None, description="按负责人(技术)筛选")
+    # 日期上限与 DashboardPeriodQuery 一致，保证计算截止时间(end_date 加一天)时不会溢出
+    start_date: Optional[date] = Field(None, le=date(9998, 12, 31), description="创建日期起 (YYYY-MM-DD)")
+    end_date: Optional[date] = Field(None, le=date(9998, 12, 31), description="创建日期止 (YYYY-MM-DD, 含当天)")
+    cursor: Optional[str] = Field(None, description="上一页返回的 next_cursor")
+    limit: int = Field(20, ge=1, description="每页条数, 超过上限时按上限处理")
+
 # --- ADDED: 超管设置特殊提成的Schema ---
 class CommissionOverrideUpdate(BaseModel):
     cs_rate: Optional[Decimal] = Field(None, ge=0, le=100)
     tech_rate: Optional[Decimal] = Field(None, ge=0, le=100)
 
-# --- CHANGED: 从API返回订单信息的标准格式，包含所有关联信息 ---
-class OrderOut(BaseModel):
+# --- ADDED: 订单列表使用的精简格式，不含工作日志和提成，避免列表页逐条加载关联数据 ---
+class OrderSummaryOut(BaseModel):
     id: int
     order_uid: str
     customer_info: Dict[str, Any]
@@ -54,9 +85,35 @@ class OrderOut(BaseModel):
     created_at: datetime
     updated_at: datetime
     shipped_at: Optional[datetime] = None
-    
+    verified_at: Optional[datetime] = None
+    settled_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+# --- CHANGED: 从API返回订单信息的标准格式，包含所有关联信息 ---
+class OrderOut(OrderSummaryOut):
     # --- ADDED: 嵌套返回工作日志和提成信息 ---
     logs: List[WorkLogOut] = []
     commissions: List[CommissionOut] = []
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+# --- ADDED: 订单状态流转记录 ---
+class OrderStatusEventOut(BaseModel):
+    id: int
+    from_status: Optional[OrderStatus] = None
+    to_status: OrderStatus
+    changed_by_id: Optional[int] = None
+    changed_by_role: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+# --- ADDED: 当前角色可执行的下一步状态 ---
+class OrderTransitionsOut(BaseModel):
+    order_id: int
+    status: OrderStatus
+    next_statuses: List[OrderStatus]
+
+# --- ADDED: 订单列表分页返回的信封结构 ---
+class OrderPageOut(BaseModel):
+    items: List[OrderSummaryOut]
+    next_cursor: Optional[str] = None
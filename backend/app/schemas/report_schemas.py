@@ -0,0 +1,15 @@
+# backend/app/schemas/report_schemas.py
+
+from pydantic import BaseModel, Field, model_validator
+from datetime import date
+
+# 提交异步报表任务时的参数
+class ReportJobCreate(BaseModel):
+    start_date: date = Field(..., description="开始日期 (YYYY-MM-DD)")
+    end_date: date = Field(..., description="结束日期 (YYYY-MM-DD, 含当天)")
+
+    @model_validator(mode='after')
+    def check_date_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must not be earlier than start_date")
+        return self
@@ -0,0 +1,127 @@
+# backend/app/services/auth_service.py
+
+import secrets
+import threading
+import bcrypt
+from flask import current_app
+from .. import db
+from ..models.user import User
+from ..utils.rate_limit import AttemptLimiter
+from .user_service import hash_password
+
+
+class LoginRateLimited(Exception):
+    """同一用户名或IP在时间窗口内失败次数过多"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many failed login attempts. Please try again later.")
+        self.retry_after = retry_after
+
+
+class LoginOverloaded(Exception):
+    """同时进行的密码校验已达上限，直接拒绝而不是占满请求线程"""
+
+    def __init__(self):
+        super().__init__("Login service is busy. Please try again later.")
+
+
+_limiter = AttemptLimiter()
+
+# --- 限制同时进行的密码校验 ---
+# bcrypt 计算期间释放 GIL，直接在请求线程中计算即可并行利用多核；
+# 信号量上限小于 gunicorn 的请求线程数，登录洪峰时其余线程仍能处理其他请求，超出的登录立即拒绝
+_verify_slots = None
+_verify_lock = threading.Lock()
+# 用户不存在或已禁用时用于校验的哈希，使这类请求与密码错误同样耗时
+_dummy_hash = None
+
+
+def _get_verify_slots() -> threading.BoundedSemaphore:
+    global _verify_slots
+    with _verify_lock:
+        if _verify_slots is None:
+            _verify_slots = threading.BoundedSemaphore(current_app.config['LOGIN_VERIFY_CONCURRENCY'])
+        return _verify_slots
+
+
+def _get_dummy_hash() -> str:
+    """与当前 BCRYPT_LOG_ROUNDS 相同 cost 的随机密码哈希"""
+    global _dummy_hash
+    rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+    if _dummy_hash is None or password_hash_rounds(_dummy_hash) != rounds:
+        _dummy_hash = hash_password(secrets.token_urlsafe(16), rounds)
+    return _dummy_hash
+
+
+def password_hash_rounds(password_hash: str) -> int | None:
+    """从 bcrypt 哈希 ($2b$12$...) 中解析出 cost"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def _check_password(password: str, password_hash: str, rounds: int) -> tuple[bool, str | None]:
+    """校验密码，cost 与当前配置不一致时顺带生成新哈希"""
+    if not bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+        return False, None
+    if password_hash_rounds(password_hash) != rounds:
+        return True, hash_password(password, rounds)
+    return True, None
+
+
+def verify_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """
+    校验密码，返回 (是否匹配, 需要写回的新哈希或 None)。
+    同时进行的校验数达到 LOGIN_VERIFY_CONCURRENCY 时抛出 LoginOverloaded。
+    """
+    slots = _get_verify_slots()
+    if not slots.acquire(blocking=False):
+        raise LoginOverloaded()
+    try:
+        return _check_password(password, password_hash, current_app.config['BCRYPT_LOG_ROUNDS'])
+    finally:
+        slots.release()
+
+
+def authenticate(username: str, password: str, client_ip: str | None) -> User | None:
+    """
+    校验用户名和密码，成功时返回用户，用户名或密码错误时返回 None。
+    - 按用户名、按IP分别限制失败次数，超过时抛出 LoginRateLimited
+    - 用户不存在或已禁用时对一个随机哈希做同样的 bcrypt 校验并按失败处理，响应与耗时都与密码错误相同，不暴露账号状态
+    - 密码正确且哈希的 cost 与 BCRYPT_LOG_ROUNDS 不一致时，透明地用新 cost 重新哈希并保存
+    """
+    config = current_app.config
+    window = config['LOGIN_ATTEMPT_WINDOW_SECONDS']
+    user_key = f"user:{username.lower()}"
+    ip_key = f"ip:{client_ip}"
+
+    retry_after = max(
+        _limiter.retry_after(user_key, config['LOGIN_MAX_ATTEMPTS_PER_USER'], window),
+        _limiter.retry_after(ip_key, config['LOGIN_MAX_ATTEMPTS_PER_IP'], window)
+    )
+    if retry_after > 0:
+        raise LoginRateLimited(retry_after)
+
+    user = User.query.filter_by(username=username).first()
+    if user is None or not user.is_active:
+        verify_password(password, _get_dummy_hash())
+        _limiter.record_failure(user_key, window)
+        _limiter.record_failure(ip_key, window)
+        return None
+
+    matched, new_hash = verify_password(password, user.password_hash)
+    if not matched:
+        _limiter.record_failure(user_key, window)
+        _limiter.record_failure(ip_key, window)
+        return None
+
+    _limiter.reset(user_key)
+    if new_hash:
+        user.password_hash = new_hash
+        db.session.commit()
+    return user
+
+
+def get_login_stats() -> dict:
+    return _limiter.stats()
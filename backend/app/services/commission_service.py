@@ -1,10 +1,42 @@
 # backend/app/services/commission_service.py (新增文件)
 
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime, date
+from collections import defaultdict
 from .. import db
-from ..models.order import Order
-from ..models.commission import Commission
+from sqlalchemy.orm import aliased
+from ..models.order import Order, OrderStatus
+from ..models.commission import Commission, CommissionMonthlyRollup
 from ..models.user import User, UserRole
+from ..utils.upsert import insert_if_missing
+
+CENT = Decimal('0.01')
+
+def month_of(moment: datetime) -> date:
+    """返回时间所在月份的第一天"""
+    return date(moment.year, moment.month, 1)
+
+def compute_commission_amount(final_price: Decimal, override_rate, default_rate) -> Decimal | None:
+    """按特殊比例(优先)或默认比例计算提成金额，保留两位小数；两者都未设置时返回 None"""
+    rate = override_rate if override_rate is not None else default_rate
+    if rate is None:
+        return None
+    return (Decimal(final_price) * (Decimal(str(rate)) / 100)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def _apply_rollup_delta(user_id: int, role_at_time: str, month: date, amount_delta: Decimal, count_delta: int):
+    """
+    在当前事务中增减某用户某月的提成汇总，行不存在时创建。
+    与订单ID计数器相同，先确保行存在再加锁，并发的当月首次结算不会死锁或违反唯一约束
+    """
+    query = CommissionMonthlyRollup.query.filter_by(user_id=user_id, role_at_time=role_at_time, month=month)
+    if query.with_entities(CommissionMonthlyRollup.id).first() is None:
+        insert_if_missing(
+            CommissionMonthlyRollup, user_id=user_id, role_at_time=role_at_time, month=month,
+            total_amount=Decimal('0'), commission_count=0, updated_at=datetime.utcnow()
+        )
+    rollup = query.with_for_update().populate_existing().one()
+    rollup.total_amount = (rollup.total_amount or Decimal('0')) + amount_delta
+    rollup.commission_count = (rollup.commission_count or 0) + count_delta
 
 def calculate_and_create_commissions(order: Order):
     """
@@ -15,45 +47,218 @@ def calculate_and_create_commissions(order: Order):
         print(f"订单 {order.id} 价格无效，跳过提成计算。")
         return
 
-    # 清除旧的提成记录，以防重复计算
-    Commission.query.filter_by(order_id=order.id).delete()
-
-    # 准备提成计算所需的数据
-    final_price = order.final_price
-    override_rates = order.commission_rate_override or {}
-
-    # 1. 计算客服的提成
-    if order.creator and order.creator.role == UserRole.CUSTOMER_SERVICE:
-        cs_rate = override_rates.get('cs_rate')
-        if cs_rate is None and order.creator.default_commission_rate is not None:
-            cs_rate = order.creator.default_commission_rate
-        
-        if cs_rate is not None:
-            amount = final_price * (Decimal(str(cs_rate)) / 100)
-            commission_cs = Commission(
-                order_id=order.id,
-                user_id=order.creator_id,
-                amount=amount,
-                role_at_time=UserRole.CUSTOMER_SERVICE.value
-            )
-            db.session.add(commission_cs)
-            print(f"为客服 {order.creator.full_name} 计算提成: {amount}")
-
-    # 2. 计算技术人员的提成
-    if order.developer and order.developer.role == UserRole.DEVELOPER:
-        tech_rate = override_rates.get('tech_rate')
-        if tech_rate is None and order.developer.default_commission_rate is not None:
-            tech_rate = order.developer.default_commission_rate
-
-        if tech_rate is not None:
-            amount = final_price * (Decimal(str(tech_rate)) / 100)
-            commission_tech = Commission(
-                order_id=order.id,
-                user_id=order.developer_id,
-                amount=amount,
-                role_at_time=UserRole.DEVELOPER.value
-            )
-            db.session.add(commission_tech)
-            print(f"为技术 {order.developer.full_name} 计算提成: {amount}")
-
-    # 注意：这里的 commit 将由上层调用者 (update_order_status) 统一执行
\ No newline at end of file
+    # 计算规则与批量版本共用，旧提成会被清除并从月度汇总中扣除
+    calculate_and_create_commissions_for_orders([order])
+    # 注意：这里的 commit 将由上层调用者 (update_order_status) 统一执行
+
+
+def _order_commission_row(order: Order) -> tuple:
+    """将已加载创建人/负责人的订单转换为 _expected_commissions 所需的行格式"""
+    creator, developer = order.creator, order.developer
+    return (
+        order.id, order.order_uid, order.final_price, order.commission_rate_override,
+        order.creator_id, creator.role if creator else None, creator.default_commission_rate if creator else None,
+        order.developer_id, developer.role if developer else None, developer.default_commission_rate if developer else None
+    )
+
+def calculate_and_create_commissions_for_orders(orders: list[Order]) -> int:
+    """
+    批量为已核验的订单计算并创建提成记录，规则与 calculate_and_create_commissions 一致，返回新建的提成条数。
+    一次查询旧提成、一次删除、一次批量插入，月度汇总按 (用户, 角色, 月份) 合并后再加锁更新。
+    commit 由调用者统一执行。
+    """
+    orders = [order for order in orders if order.final_price and order.final_price > 0]
+    if not orders:
+        return 0
+
+    now = datetime.utcnow()
+    order_ids = [order.id for order in orders]
+    rollup_deltas = defaultdict(lambda: [Decimal('0'), 0])
+
+    # 清除旧的提成记录，并从月度汇总中扣除
+    for user_id, role_at_time, amount, created_at in db.session.query(
+        Commission.user_id, Commission.role_at_time, Commission.amount, Commission.created_at
+    ).filter(Commission.order_id.in_(order_ids)):
+        bucket = rollup_deltas[(user_id, role_at_time, month_of(created_at or now))]
+        bucket[0] -= Decimal(amount)
+        bucket[1] -= 1
+    Commission.query.filter(Commission.order_id.in_(order_ids)).delete(synchronize_session=False)
+
+    new_rows = []
+    for order in orders:
+        for (user_id, role_at_time), amount in _expected_commissions(_order_commission_row(order)).items():
+            new_rows.append(dict(order_id=order.id, user_id=user_id, amount=amount,
+                                 role_at_time=role_at_time, created_at=now))
+            bucket = rollup_deltas[(user_id, role_at_time, month_of(now))]
+            bucket[0] += amount
+            bucket[1] += 1
+    db.session.bulk_insert_mappings(Commission, new_rows)
+
+    # 固定加锁顺序，避免并发批量操作互相死锁
+    for (user_id, role_at_time, month), (amount_delta, count_delta) in sorted(rollup_deltas.items()):
+        if amount_delta or count_delta:
+            _apply_rollup_delta(user_id, role_at_time, month, amount_delta, count_delta)
+    return len(new_rows)
+
+def rebuild_monthly_rollups(batch_size: int = 5000) -> int:
+    """
+    根据提成明细全量重建月度汇总表，返回生成的汇总行数。
+    明细按批流式读取，内存中只保留 (用户, 角色, 月份) 维度的累计值。
+    """
+    now = datetime.utcnow()
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    rows = db.session.query(
+        Commission.user_id, Commission.role_at_time, Commission.amount, Commission.created_at
+    ).yield_per(batch_size)
+    for user_id, role_at_time, amount, created_at in rows:
+        bucket = totals[(user_id, role_at_time, month_of(created_at or now))]
+        bucket[0] += Decimal(amount)
+        bucket[1] += 1
+
+    CommissionMonthlyRollup.query.delete()
+    db.session.bulk_insert_mappings(CommissionMonthlyRollup, [
+        dict(user_id=user_id, role_at_time=role_at_time, month=month,
+             total_amount=amount, commission_count=count, updated_at=now)
+        for (user_id, role_at_time, month), (amount, count) in totals.items()
+    ])
+    db.session.commit()
+    return len(totals)
+
+
+def get_commission_total(user_id: int, role_at_time: str, start_month: date | None = None, end_month: date | None = None) -> Decimal:
+    """
+    从月度汇总表读取提成总额，复杂度与月份数相关而非明细条数。
+    start_month/end_month 为半开区间 [start_month, end_month)，不传则为累计总额。
+    """
+    query = db.session.query(db.func.sum(CommissionMonthlyRollup.total_amount)).filter(
+        CommissionMonthlyRollup.user_id == user_id,
+        CommissionMonthlyRollup.role_at_time == role_at_time
+    )
+    if start_month is not None:
+        query = query.filter(CommissionMonthlyRollup.month >= start_month)
+    if end_month is not None:
+        query = query.filter(CommissionMonthlyRollup.month < end_month)
+    return query.scalar() or Decimal('0')
+
+
+# --- ADDED: 批量重算提成 ---
+# 每个事务处理的订单数
+RECALCULATION_CHUNK_SIZE = 500
+
+def _select_orders_for_recalculation(user_ids: list[int] | None, order_ids: list[int] | None):
+    """集合方式选出需要重算的已核验订单，一次查询带出计算所需的全部字段"""
+    creator = aliased(User)
+    developer = aliased(User)
+    query = db.session.query(
+        Order.id, Order.order_uid, Order.final_price, Order.commission_rate_override,
+        Order.creator_id, creator.role, creator.default_commission_rate,
+        Order.developer_id, developer.role, developer.default_commission_rate
+    ).outerjoin(
+        creator, creator.id == Order.creator_id
+    ).outerjoin(
+        developer, developer.id == Order.developer_id
+    ).filter(
+        Order.status == OrderStatus.VERIFIED
+    )
+    if user_ids:
+        query = query.filter(db.or_(Order.creator_id.in_(user_ids), Order.developer_id.in_(user_ids)))
+    if order_ids:
+        query = query.filter(Order.id.in_(order_ids))
+    return query.order_by(Order.id)
+
+def _expected_commissions(row) -> dict:
+    """根据订单行计算应有的提成 {(user_id, role): amount}，规则与 calculate_and_create_commissions 一致"""
+    (order_id, order_uid, final_price, override, creator_id, creator_role, creator_rate,
+     developer_id, developer_role, developer_rate) = row
+    expected = {}
+    if not final_price or final_price <= 0:
+        return expected
+    override = override or {}
+    if creator_id and creator_role == UserRole.CUSTOMER_SERVICE:
+        amount = compute_commission_amount(final_price, override.get('cs_rate'), creator_rate)
+        if amount is not None:
+            expected[(creator_id, UserRole.CUSTOMER_SERVICE.value)] = amount
+    if developer_id and developer_role == UserRole.DEVELOPER:
+        amount = compute_commission_amount(final_price, override.get('tech_rate'), developer_rate)
+        if amount is not None:
+            expected[(developer_id, UserRole.DEVELOPER.value)] = amount
+    return expected
+
+def recalculate_commissions(user_ids: list[int] | None = None, order_ids: list[int] | None = None,
+                            dry_run: bool = True, chunk_size: int = RECALCULATION_CHUNK_SIZE) -> dict:
+    """
+    批量重算已核验订单的提成（用于调整默认提成比例或特殊提成比例之后）。
+    按 chunk_size 分块处理，每块一个事务：一次查询现有提成、一次删除、一次批量插入，
+    同时维护月度汇总表。dry_run 为 True 时只返回差异，不写入数据库。
+    """
+    rows = _select_orders_for_recalculation(user_ids, order_ids).all()
+    result = {
+        "dry_run": dry_run,
+        "orders_scanned": len(rows),
+        "orders_changed": 0,
+        "total_delta": Decimal('0'),
+        "diffs": []
+    }
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        chunk_ids = [row[0] for row in chunk]
+
+        existing = defaultdict(dict)
+        for order_id, user_id, role_at_time, amount, created_at in db.session.query(
+            Commission.order_id, Commission.user_id, Commission.role_at_time, Commission.amount, Commission.created_at
+        ).filter(Commission.order_id.in_(chunk_ids)):
+            existing[order_id][(user_id, role_at_time)] = (Decimal(amount), created_at)
+
+        now = datetime.utcnow()
+        changed_ids = []
+        new_rows = []
+        rollup_deltas = defaultdict(lambda: [Decimal('0'), 0])
+        for row in chunk:
+            order_id, order_uid = row[0], row[1]
+            old = existing.get(order_id, {})
+            new = _expected_commissions(row)
+            if {key: value[0] for key, value in old.items()} == new:
+                continue
+
+            changes = []
+            for key in sorted(set(old) | set(new)):
+                old_amount = old[key][0] if key in old else None
+                new_amount = new.get(key)
+                if old_amount != new_amount:
+                    changes.append({
+                        "user_id": key[0],
+                        "role_at_time": key[1],
+                        "old_amount": old_amount,
+                        "new_amount": new_amount
+                    })
+                    result["total_delta"] += (new_amount or 0) - (old_amount or 0)
+            result["diffs"].append({"order_id": order_id, "order_uid": order_uid, "changes": changes})
+            changed_ids.append(order_id)
+
+            # 重算后的提成沿用原提成的计算时间，保持其在月度统计中的归属月份不变
+            for (user_id, role_at_time), (amount, created_at) in old.items():
+                bucket = rollup_deltas[(user_id, role_at_time, month_of(created_at or now))]
+                bucket[0] -= amount
+                bucket[1] -= 1
+            for (user_id, role_at_time), amount in new.items():
+                created_at = old.get((user_id, role_at_time), (None, None))[1] or now
+                new_rows.append(dict(order_id=order_id, user_id=user_id, amount=amount,
+                                     role_at_time=role_at_time, created_at=created_at))
+                bucket = rollup_deltas[(user_id, role_at_time, month_of(created_at))]
+                bucket[0] += amount
+                bucket[1] += 1
+
+        result["orders_changed"] += len(changed_ids)
+        if dry_run or not changed_ids:
+            continue
+
+        Commission.query.filter(Commission.order_id.in_(changed_ids)).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(Commission, new_rows)
+        # 与 calculate_and_create_commissions_for_orders 相同的加锁顺序
+        for (user_id, role_at_time, month), (amount, count) in sorted(rollup_deltas.items()):
+            if amount or count:
+                _apply_rollup_delta(user_id, role_at_time, month, amount, count)
+        db.session.commit()
+
+    return result
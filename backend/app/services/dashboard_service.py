@@ -1,18 +1,118 @@
 # backend/app/services/dashboard_service.py
 
-from sqlalchemy import func, extract
-from datetime import datetime
+from sqlalchemy import func
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from flask import current_app
 from .. import db
 from ..models.user import User, UserRole
-from ..models.order import Order, OrderStatus
+from ..models.order import Order, OrderStatus, OrderStatusEvent
 from ..models.commission import Commission
+from ..schemas import dashboard_schemas
+from ..utils.cache import TTLCache
+from . import commission_service
 
-def get_personal_stats(user_id: int, user_role: str):
-    """为客服/技术提供个人业绩统计"""
-    
-    # 获取本月时间范围
+# --- ADDED: 全局看板和团队绩效的聚合结果缓存 ---
+GLOBAL_STATS_KEY = 'global_stats'
+_global_stats_cache = TTLCache()
+# 团队绩效按统计周期 (start, end) 分别缓存；自定义周期可以任意组合，限制缓存项数量
+_team_performance_cache = TTLCache(max_size=128)
+
+def _cache_ttl() -> int:
+    return current_app.config['DASHBOARD_CACHE_TTL_SECONDS']
+
+def get_cache_stats() -> dict:
+    """返回仪表盘缓存的命中/未命中计数"""
+    return {
+        "global_stats": _global_stats_cache.stats(),
+        "team_performance": _team_performance_cache.stats()
+    }
+
+def invalidate_dashboard_cache():
+    """清空仪表盘缓存"""
+    _global_stats_cache.invalidate()
+    _team_performance_cache.invalidate()
+
+def on_order_created(status: OrderStatus):
+    """新订单创建后，原地更新全局看板中的订单总数和状态分布"""
+    def apply(stats):
+        distribution = dict(stats["status_distribution"])
+        distribution[status.value] = distribution.get(status.value, 0) + 1
+        return dict(stats, total_orders=stats["total_orders"] + 1, status_distribution=distribution)
+    _global_stats_cache.update(GLOBAL_STATS_KEY, apply)
+
+def on_order_status_changed(old_status: OrderStatus, new_status: OrderStatus, final_price):
+    """订单状态流转后，原地更新全局看板的状态分布和已结算总额，团队绩效缓存直接失效"""
+    def apply(stats):
+        distribution = dict(stats["status_distribution"])
+        distribution[old_status.value] = distribution.get(old_status.value, 0) - 1
+        if distribution[old_status.value] <= 0:
+            del distribution[old_status.value]
+        distribution[new_status.value] = distribution.get(new_status.value, 0) + 1
+
+        settled_value = Decimal(str(stats["total_settled_value"]))
+        price = Decimal(final_price or 0)
+        if new_status == OrderStatus.SETTLED:
+            settled_value += price
+        if old_status == OrderStatus.SETTLED:
+            settled_value -= price
+        return dict(stats, status_distribution=distribution, total_settled_value=float(settled_value))
+    _global_stats_cache.update(GLOBAL_STATS_KEY, apply)
+    _team_performance_cache.invalidate()
+
+def on_order_price_changed(status: OrderStatus, old_price, new_price):
+    """订单价格修改后，原地更新已结算总额，团队绩效缓存直接失效"""
+    if status == OrderStatus.SETTLED:
+        def apply(stats):
+            settled_value = Decimal(str(stats["total_settled_value"])) + Decimal(new_price or 0) - Decimal(old_price or 0)
+            return dict(stats, total_settled_value=float(settled_value))
+        _global_stats_cache.update(GLOBAL_STATS_KEY, apply)
+    _team_performance_cache.invalidate()
+
+# --- ADDED: 统计周期解析，统一转换为半开区间 [start, end)，便于走索引的范围查询 ---
+def resolve_period(period: dashboard_schemas.DashboardPeriodQuery) -> tuple[datetime, datetime]:
+    """将统计周期参数解析为 [start, end) 时间区间，未指定年份/月份/季度时取当前值"""
     today = datetime.utcnow()
-    start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    if period.period == 'custom':
+        start = datetime.combine(period.start_date, time.min)
+        end = datetime.combine(period.end_date + timedelta(days=1), time.min)
+        return start, end
+
+    year = period.year or today.year
+    if period.period == 'quarter':
+        quarter = period.quarter or (today.month - 1) // 3 + 1
+        first_month, months = (quarter - 1) * 3 + 1, 3
+    else:
+        first_month, months = period.month or today.month, 1
+
+    start = datetime(year, first_month, 1)
+    next_month = first_month - 1 + months
+    end = datetime(year + next_month // 12, next_month % 12 + 1, 1)
+    return start, end
+
+def _period_out(start: datetime, end: datetime) -> dict:
+    return {"start": start.isoformat(), "end": end.isoformat()}
+
+def _is_month_start(moment: datetime) -> bool:
+    return moment.day == 1 and moment.time() == time.min
+
+def _get_period_commission(user_id: int, role_at_time: str, start: datetime, end: datetime):
+    """统计周期内的提成：按整月划分的周期直接读月度汇总，自定义日期范围才回退到明细求和"""
+    if _is_month_start(start) and _is_month_start(end):
+        return commission_service.get_commission_total(user_id, role_at_time, start.date(), end.date())
+    return db.session.query(func.sum(Commission.amount)).filter(
+        Commission.user_id == user_id,
+        Commission.role_at_time == role_at_time,
+        Commission.created_at >= start,
+        Commission.created_at < end
+    ).scalar()
+
+def get_personal_stats(user_id: int, user_role: str, period: dashboard_schemas.DashboardPeriodQuery):
+    """为客服/技术提供个人业绩统计（默认本月）"""
+    
+    # 获取统计时间范围
+    start, end = resolve_period(period)
     
     stats = {}
 
@@ -20,48 +120,56 @@ def get_personal_stats(user_id: int, user_role: str):
         # 本月创建订单数
         monthly_orders = db.session.query(func.count(Order.id)).filter(
             Order.creator_id == user_id,
-            Order.created_at >= start_of_month
+            Order.created_at >= start,
+            Order.created_at < end
         ).scalar()
 
-        # 累计总提成
-        total_commission = db.session.query(func.sum(Commission.amount)).filter(
-            Commission.user_id == user_id,
-            Commission.role_at_time == UserRole.CUSTOMER_SERVICE.value
-        ).scalar()
+        # 累计总提成与本期提成 (读取月度汇总表)
+        total_commission = commission_service.get_commission_total(user_id, UserRole.CUSTOMER_SERVICE.value)
+        period_commission = _get_period_commission(user_id, UserRole.CUSTOMER_SERVICE.value, start, end)
         
         stats = {
             "monthly_orders_created": monthly_orders or 0,
-            "total_commission_earned": float(total_commission or 0)
+            "total_commission_earned": float(total_commission or 0),
+            "period_commission_earned": float(period_commission or 0),
+            "period": _period_out(start, end)
         }
 
     elif user_role == UserRole.DEVELOPER.value:
-        # 本月完成订单数 (状态变为 '可结算' 或更高)
-        monthly_completed = db.session.query(func.count(Order.id)).filter(
+        # 本期完成订单数 (本期内被确认为 '可结算'，且当前仍为 '可结算' 或更高)
+        # 完成时间取自状态流转记录，而不是会被后续编辑改动的 updated_at
+        monthly_completed = db.session.query(func.count(func.distinct(Order.id))).join(
+            OrderStatusEvent, OrderStatusEvent.order_id == Order.id
+        ).filter(
+            OrderStatusEvent.to_status == OrderStatus.PENDING_SETTLEMENT,
+            OrderStatusEvent.created_at >= start,
+            OrderStatusEvent.created_at < end,
             Order.developer_id == user_id,
             Order.status.in_([
                 OrderStatus.PENDING_SETTLEMENT, 
                 OrderStatus.VERIFIED, 
                 OrderStatus.SETTLED
-            ]),
-            Order.updated_at >= start_of_month
+            ])
         ).scalar()
 
-        # 累计总提成
-        total_commission = db.session.query(func.sum(Commission.amount)).filter(
-            Commission.user_id == user_id,
-            Commission.role_at_time == UserRole.DEVELOPER.value
-        ).scalar()
+        # 累计总提成与本期提成 (读取月度汇总表)
+        total_commission = commission_service.get_commission_total(user_id, UserRole.DEVELOPER.value)
+        period_commission = _get_period_commission(user_id, UserRole.DEVELOPER.value, start, end)
         
         stats = {
             "monthly_orders_completed": monthly_completed or 0,
-            "total_commission_earned": float(total_commission or 0)
+            "total_commission_earned": float(total_commission or 0),
+            "period_commission_earned": float(period_commission or 0),
+            "period": _period_out(start, end)
         }
         
     return stats
 
 def get_global_stats():
-    """为超管提供全局数据看板"""
-    
+    """为超管提供全局数据看板（带缓存）"""
+    return _global_stats_cache.get_or_compute(GLOBAL_STATS_KEY, _compute_global_stats, _cache_ttl())
+
+def _compute_global_stats():
     total_users = db.session.query(func.count(User.id)).scalar()
     total_orders = db.session.query(func.count(Order.id)).scalar()
     
@@ -85,49 +193,59 @@ def get_global_stats():
         "status_distribution": status_distribution
     }
 
-def get_team_performance_stats() -> dict:
-    """
-    获取团队绩效统计（本月）
-    :return: 包含客服和技术团队业绩的字典
-    """
-    today = datetime.utcnow()
-    current_month = today.month
-    current_year = today.year
-
-    # 1. 查询客服团队业绩（按本月创建订单的金额排名）
-    cs_performance = db.session.query(
+def build_cs_performance_query(start: datetime, end: datetime):
+    """客服团队业绩查询（按周期内创建订单的金额排名），走 (creator_id, created_at, final_price) 覆盖索引"""
+    return db.session.query(
         User.full_name,
         func.sum(Order.final_price).label('total_amount')
     ).join(
         Order, User.id == Order.creator_id
     ).filter(
         User.role == UserRole.CUSTOMER_SERVICE,
-        extract('year', Order.created_at) == current_year,
-        extract('month', Order.created_at) == current_month,
+        Order.created_at >= start,
+        Order.created_at < end,
         Order.final_price.isnot(None) # 只统计已定价的订单
     ).group_by(
         User.id
     ).order_by(
         func.sum(Order.final_price).desc()
-    ).all()
+    )
 
-    # 2. 查询技术团队业绩（按本月完成结算的订单金额排名）
-    dev_performance = db.session.query(
+def build_dev_performance_query(start: datetime, end: datetime):
+    """技术团队业绩查询（按周期内完成结算的订单金额排名），走 (developer_id, settled_at, final_price) 覆盖索引"""
+    return db.session.query(
         User.full_name,
         func.sum(Order.final_price).label('total_amount')
     ).join(
         Order, User.id == Order.developer_id
     ).filter(
         User.role == UserRole.DEVELOPER,
-        # 订单的最终更新时间（变为SETTLED状态的时间）在本月
-        extract('year', Order.updated_at) == current_year,
-        extract('month', Order.updated_at) == current_month,
-        Order.status == OrderStatus.SETTLED # 只统计已结算的订单
+        Order.status == OrderStatus.SETTLED, # 只统计已结算的订单
+        # 订单的结算时间在统计周期内
+        Order.settled_at >= start,
+        Order.settled_at < end
     ).group_by(
         User.id
     ).order_by(
         func.sum(Order.final_price).desc()
-    ).all()
+    )
+
+def get_team_performance_stats(period: dashboard_schemas.DashboardPeriodQuery) -> dict:
+    """
+    获取团队绩效统计（默认本月，带缓存）
+    :return: 包含客服和技术团队业绩的字典
+    """
+    start, end = resolve_period(period)
+    return _team_performance_cache.get_or_compute(
+        (start, end), lambda: _compute_team_performance_stats(start, end), _cache_ttl()
+    )
+
+def _compute_team_performance_stats(start: datetime, end: datetime) -> dict:
+    # 1. 查询客服团队业绩
+    cs_performance = build_cs_performance_query(start, end).all()
+
+    # 2. 查询技术团队业绩
+    dev_performance = build_dev_performance_query(start, end).all()
 
     # 格式化结果
     formatted_cs = [{"full_name": name, "total_value": float(amount or 0)} for name, amount in cs_performance]
@@ -135,5 +253,6 @@ def get_team_performance_stats() -> dict:
 
     return {
         "customer_service_performance": formatted_cs,
-        "developer_performance": formatted_dev
-    }
\ No newline at end of file
+        "developer_performance": formatted_dev,
+        "period": _period_out(start, end)
+    }
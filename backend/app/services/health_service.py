@@ -0,0 +1,61 @@
+# backend/app/services/health_service.py
+
+import time
+from sqlalchemy import text
+from .. import db
+from . import auth_service, notification_service, user_directory_service
+
+
+def get_pool_stats() -> dict:
+    """当前 worker 的连接池状态：常驻连接数、空闲(checked_in)/借出(checked_out)连接数、溢出连接数"""
+    pool = db.engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    # StaticPool 等(如测试用的内存 SQLite)没有这些计数
+    if hasattr(pool, 'checkedout'):
+        checked_in, checked_out = pool.checkedin(), pool.checkedout()
+        stats.update({
+            "size": pool.size(),
+            "checked_in": checked_in,
+            "checked_out": checked_out,
+            "open": checked_in + checked_out,
+            # SQLAlchemy 在常驻连接尚未全部建立时返回负数，这里只报告实际的溢出连接数
+            "overflow": max(pool.overflow(), 0)
+        })
+    return stats
+
+
+def check_database() -> dict:
+    """
+    从连接池借出一个连接执行 SELECT 1，分别记录借出耗时(含 pre-ping)与查询往返耗时(毫秒)。
+    失败时只返回异常类型，不把数据库地址等信息暴露给未登录的调用者。
+    """
+    started = time.perf_counter()
+    try:
+        with db.engine.connect() as connection:
+            checked_out = time.perf_counter()
+            connection.execute(text('SELECT 1'))
+            finished = time.perf_counter()
+    except Exception as e:
+        return {
+            "ok": False,
+            "error": type(e).__name__,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    return {
+        "ok": True,
+        "checkout_ms": round((checked_out - started) * 1000, 2),
+        "round_trip_ms": round((finished - checked_out) * 1000, 2)
+    }
+
+
+def get_health_report() -> dict:
+    """/api/health/details 的完整报告：数据库连通性与耗时、连接池状态，以及本 worker 内各缓存/限流器的计数"""
+    database = check_database()
+    return {
+        "status": "ok" if database['ok'] else "unavailable",
+        "database": database,
+        "pool": get_pool_stats(),
+        "notification_stream": dict(notification_service.get_broker().stats(), feed=notification_service.get_feed_stats()),
+        "user_directory": user_directory_service.get_directory_stats(),
+        "login": auth_service.get_login_stats()
+    }
@@ -0,0 +1,54 @@
+# backend/app/services/notification_archive_service.py
+
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, literal, select
+from .. import db
+from ..models.notification import Notification, NotificationArchive
+
+# 每批移动的通知条数，每批一个短事务，避免长时间锁表
+ARCHIVE_BATCH_SIZE = 1000
+
+_ARCHIVE_COLUMNS = ['id', 'created_at', 'recipient_id', 'content', 'is_read', 'related_order_id', 'archived_at']
+
+
+def archive_read_notifications(older_than_days: int, batch_size: int = ARCHIVE_BATCH_SIZE,
+                               max_batches: int | None = None, pause_seconds: float = 0) -> dict:
+    """
+    将创建时间早于 older_than_days 天前的已读通知分批移入归档表。
+    每批: 按 (is_read, created_at) 索引取出一批ID -> INSERT ... SELECT 到归档表 -> DELETE -> 提交。
+
+    :param max_batches: 最多处理的批数，None 表示处理完为止
+    :param pause_seconds: 每批之间的停顿，给线上流量让出资源
+    :return: {"cutoff": 截止时间, "archived": 移动条数, "batches": 批数}
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        ids = [notification_id for (notification_id,) in db.session.query(Notification.id).filter(
+            Notification.is_read.is_(True),
+            Notification.created_at < cutoff
+        ).order_by(Notification.created_at, Notification.id).limit(batch_size)]
+        if not ids:
+            break
+
+        batch_filter = (Notification.id.in_(ids), Notification.is_read.is_(True))
+        db.session.execute(insert(NotificationArchive).from_select(
+            _ARCHIVE_COLUMNS,
+            select(
+                Notification.id, Notification.created_at, Notification.recipient_id, Notification.content,
+                Notification.is_read, Notification.related_order_id,
+                literal(datetime.utcnow(), type_=db.DateTime)
+            ).where(*batch_filter)
+        ))
+        db.session.execute(delete(Notification).where(*batch_filter))
+        db.session.commit()
+
+        archived += len(ids)
+        batches += 1
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    return {"cutoff": cutoff.isoformat(), "archived": archived, "batches": batches}
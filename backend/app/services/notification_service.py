@@ -1,8 +1,22 @@
 # backend/app/services/notification_service.py
 
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import exists, func, insert, literal, select, update
+from sqlalchemy.orm import aliased
 from .. import db
 from ..models.notification import Notification
+from ..schemas import notification_schemas
 from ..models.user import User, UserRole
+from ..utils.pubsub import PubSubBroker
+from ..utils.pagination import encode_cursor, after_cursor
+
+# 进程内的通知分发器，频道为接收者的用户ID；事件来自下方按主键轮询数据库的线程
+_broker = PubSubBroker()
 
 def create_notification(recipient_id: int, content: str, related_order_id: int = None):
     """
@@ -14,22 +28,163 @@ def create_notification(recipient_id: int, content: str, related_order_id: int =
         related_order_id=related_order_id
     )
     db.session.add(notification)
-    # 此处的 commit 将由调用它的上层业务函数统一处理
+    # 此处的 commit 将由调用它的上层业务函数统一处理，提交后由推送进程轮询到再推送给在线用户
+
+def _bulk_notify(recipient_filter, content: str, related_order_id: int | None,
+                 dedup_window_seconds: int | None) -> int:
+    """
+    用一条 INSERT ... SELECT 向 users 表中满足 recipient_filter 的启用用户批量发送同一条通知，
+    返回实际插入的条数。
+    dedup_window_seconds 不为空时，跳过在该时间窗口内已收到过相同内容(且关联同一订单)通知的用户，
+    避免订单状态反复变化时刷屏。
+    """
+    now = datetime.utcnow()
+    recipients = select(
+        User.id,
+        literal(content),
+        literal(False),
+        literal(related_order_id, type_=db.Integer),
+        literal(now, type_=db.DateTime)
+    ).where(recipient_filter, User.is_active.is_(True))
+
+    if dedup_window_seconds:
+        existing = aliased(Notification)
+        same_order = (existing.related_order_id.is_(None) if related_order_id is None
+                      else existing.related_order_id == related_order_id)
+        recipients = recipients.where(~exists().where(
+            existing.recipient_id == User.id,
+            existing.created_at >= now - timedelta(seconds=dedup_window_seconds),
+            existing.content == content,
+            same_order
+        ))
+
+    stmt = insert(Notification).from_select(
+        ['recipient_id', 'content', 'is_read', 'related_order_id', 'created_at'],
+        recipients
+    )
+    return db.session.execute(stmt).rowcount
+
+def _max_notification_id() -> int:
+    return db.session.query(func.max(Notification.id)).scalar() or 0
 
-def notify_all_finances(content: str, related_order_id: int):
+def notify_users(user_ids: list[int], content: str, related_order_id: int = None,
+                 dedup_window_seconds: int = None) -> int:
+    """向指定的多个用户发送同一条通知，返回发送条数。commit 由调用方处理"""
+    user_ids = list({uid for uid in user_ids if uid})
+    if not user_ids:
+        return 0
+    return _bulk_notify(User.id.in_(user_ids), content, related_order_id, dedup_window_seconds)
+
+def notify_role(role: UserRole, content: str, related_order_id: int = None,
+                dedup_window_seconds: int = None) -> int:
+    """向某个角色的所有启用用户发送通知，返回发送条数。commit 由调用方处理"""
+    return _bulk_notify(User.role == role, content, related_order_id, dedup_window_seconds)
+
+def notify_order_team(order, content: str, dedup_window_seconds: int = None) -> int:
+    """向订单的协作成员(创建订单的客服和负责的技术)发送通知，返回发送条数。commit 由调用方处理"""
+    return notify_users([order.creator_id, order.developer_id], content, order.id, dedup_window_seconds)
+
+def get_active_user_ids(role: UserRole) -> list[int]:
+    """
+    某个角色下所有启用用户的ID。直接查询数据库而不用用户目录缓存：
+    其他 worker 中新增的用户在缓存 TTL 内不可见，会漏发通知
+    """
+    return [user_id for (user_id,) in db.session.query(User.id).filter(
+        User.role == role, User.is_active.is_(True)
+    ).order_by(User.id)]
+
+def send_notifications(messages: list[tuple[list[int], str, int | None]], dedup_window_seconds: int = None) -> int:
+    """
+    批量发送多条内容不同的通知，messages 为 [(接收者ID列表, 内容, 关联订单ID)]。
+    过滤停用用户与去重各一次查询，再用一条多行 INSERT 写入，返回发送条数。commit 由调用方处理。
+    """
+    now = datetime.utcnow()
+    wanted = {
+        (recipient_id, content, related_order_id)
+        for recipient_ids, content, related_order_id in messages
+        for recipient_id in recipient_ids if recipient_id
+    }
+    if not wanted:
+        return 0
+
+    recipient_ids = {recipient_id for recipient_id, _, _ in wanted}
+    active_ids = {user_id for (user_id,) in db.session.query(User.id).filter(
+        User.id.in_(recipient_ids), User.is_active.is_(True)
+    )}
+    wanted = {key for key in wanted if key[0] in active_ids}
+
+    if dedup_window_seconds and wanted:
+        recent = db.session.query(
+            Notification.recipient_id, Notification.content, Notification.related_order_id
+        ).filter(
+            Notification.recipient_id.in_({key[0] for key in wanted}),
+            Notification.created_at >= now - timedelta(seconds=dedup_window_seconds),
+            Notification.content.in_({key[1] for key in wanted})
+        )
+        wanted -= {tuple(row) for row in recent}
+
+    if not wanted:
+        return 0
+    db.session.execute(insert(Notification), [
+        dict(recipient_id=recipient_id, content=content, related_order_id=related_order_id,
+             is_read=False, created_at=now)
+        for recipient_id, content, related_order_id in sorted(wanted, key=lambda key: (key[0], key[2] or 0, key[1]))
+    ])
+    return len(wanted)
+
+def notify_all_finances(content: str, related_order_id: int, dedup_window_seconds: int = None) -> int:
     """
     通知所有财务人员
     """
-    finance_users = User.query.filter_by(role=UserRole.FINANCE, is_active=True).all()
-    for user in finance_users:
-        create_notification(user.id, content, related_order_id)
-        
-def get_notifications_for_user(user_id: int) -> list[Notification]:
+    return notify_role(UserRole.FINANCE, content, related_order_id, dedup_window_seconds)
+
+NOTIFICATION_PAGE_DEFAULT_SIZE = 20
+NOTIFICATION_PAGE_MAX_SIZE = 100
+
+def get_notifications_for_user(user_id: int, params: notification_schemas.NotificationListQuery) -> tuple[list[Notification], str | None]:
     """
-    获取指定用户的所有通知，按时间倒序排列。
+    获取指定用户的通知（键集分页），按 (created_at, id) 倒序。
+    返回 (本页通知, 下一页游标)；没有下一页时游标为 None。
     """
-    return Notification.query.filter_by(recipient_id=user_id).order_by(Notification.created_at.desc()).all()
+    query = Notification.query.filter(Notification.recipient_id == user_id)
+    if params.unread_only:
+        query = query.filter(Notification.is_read.is_(False))
+
+    if params.cursor:
+        query = query.filter(after_cursor(Notification.created_at, Notification.id, params.cursor))
+
+    limit = min(params.limit, NOTIFICATION_PAGE_MAX_SIZE)
+    # 多取一条用于判断是否还有下一页
+    notifications = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        next_cursor = encode_cursor(notifications[-1].created_at, notifications[-1].id)
+    return notifications, next_cursor
 
+def get_unread_count(user_id: int) -> int:
+    """统计用户未读通知数，由 (recipient_id, is_read, created_at) 索引覆盖"""
+    return db.session.query(func.count(Notification.id)).filter(
+        Notification.recipient_id == user_id,
+        Notification.is_read.is_(False)
+    ).scalar()
+
+def mark_notifications_as_read(user_id: int, notification_ids: list[int] | None = None) -> int:
+    """
+    用一条 UPDATE 将用户的通知批量标记为已读，返回实际更新的条数。
+    notification_ids 为 None 时标记该用户的全部未读通知；不属于该用户的ID会被忽略。
+    """
+    stmt = update(Notification).where(
+        Notification.recipient_id == user_id,
+        Notification.is_read.is_(False)
+    )
+    if notification_ids is not None:
+        stmt = stmt.where(Notification.id.in_(notification_ids))
+
+    result = db.session.execute(stmt.values(is_read=True), execution_options={"synchronize_session": False})
+    db.session.commit()
+    return result.rowcount
 
 def mark_notification_as_read(notification_id: int, user_id: int) -> Notification | None:
     """
@@ -49,4 +204,148 @@ def mark_notification_as_read(notification_id: int, user_id: int) -> Notificatio
     notification.is_read = True
     db.session.commit()
     
-    return notification
\ No newline at end of file
+    return notification
+
+
+# --- 通知实时推送 (Server-Sent Events) ---
+# 推送连接由单独的 gevent 进程(docker-compose 中的 notification-stream 服务)承载，不占用 API worker 的线程。
+# 通知由任意 API worker 写入数据库，推送进程内的一个线程按主键轮询新通知并分发给本进程的订阅者，
+# 因此不依赖写入通知的进程，也不需要额外的消息中间件。
+
+# 每次轮询回看的主键范围：自增ID按插入顺序分配、但不一定按顺序提交，
+# 回看最近的ID并跳过已推送的，避免遗漏较晚提交的事务
+_FEED_LOOKBACK_IDS = 500
+_FEED_BATCH_SIZE = 1000
+
+_feed_thread = None
+_feed_lock = threading.Lock()
+_feed_stats = {"polls": 0, "delivered": 0, "last_id": 0, "errors": 0}
+
+def get_broker() -> PubSubBroker:
+    return _broker
+
+def get_feed_stats() -> dict:
+    return dict(_feed_stats, running=_feed_thread is not None)
+
+def _serialize(notification: Notification) -> dict:
+    return notification_schemas.NotificationOut.model_validate(notification).model_dump(mode='json')
+
+def _poll_new_notifications(last_id: int, sent_ids: set) -> int:
+    """推送 last_id 之后(含回看范围)尚未推送过的通知，返回新的 last_id"""
+    rows = db.session.query(Notification.id, Notification.recipient_id).filter(
+        Notification.id > last_id - _FEED_LOOKBACK_IDS
+    ).order_by(Notification.id).limit(_FEED_BATCH_SIZE).all()
+
+    new_rows = [(nid, recipient_id) for nid, recipient_id in rows if nid not in sent_ids]
+    sent_ids.update(nid for nid, _ in new_rows)
+    if rows:
+        last_id = max(last_id, rows[-1][0])
+    for stale_id in [nid for nid in sent_ids if nid <= last_id - _FEED_LOOKBACK_IDS]:
+        sent_ids.discard(stale_id)
+
+    # 只加载有在线订阅者的通知
+    wanted_ids = [nid for nid, recipient_id in new_rows if _broker.has_subscribers(recipient_id)]
+    if wanted_ids:
+        for notification in Notification.query.filter(Notification.id.in_(wanted_ids)).order_by(Notification.id):
+            _broker.publish(notification.recipient_id, _serialize(notification))
+            _feed_stats['delivered'] += 1
+    return last_id
+
+def _feed_loop(app, interval: float):
+    with app.app_context():
+        last_id = _max_notification_id()
+        # 回看范围内已处理过的ID；启动前已存在的通知不再推送
+        sent_ids = {nid for nid, in db.session.query(Notification.id).filter(
+            Notification.id > last_id - _FEED_LOOKBACK_IDS
+        )}
+        db.session.remove()
+        while True:
+            time.sleep(interval)
+            try:
+                last_id = _poll_new_notifications(last_id, sent_ids)
+                _feed_stats['polls'] += 1
+                _feed_stats['last_id'] = last_id
+            except Exception:
+                _feed_stats['errors'] += 1
+                app.logger.exception("Notification feed poll failed")
+            finally:
+                # 结束事务，下次轮询才能读到其他进程新提交的通知
+                db.session.remove()
+
+def _ensure_feed():
+    global _feed_thread
+    with _feed_lock:
+        if _feed_thread is None:
+            _feed_thread = threading.Thread(
+                target=_feed_loop,
+                args=(current_app._get_current_object(), current_app.config['NOTIFICATION_STREAM_POLL_SECONDS']),
+                name='notification-feed',
+                daemon=True
+            )
+            _feed_thread.start()
+
+def _ticket_serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='notification-stream')
+
+def create_stream_ticket(user_id: int) -> str:
+    """
+    签发打开推送连接用的短期凭证。EventSource 无法设置请求头，凭证只能放在 URL 中，
+    因此不使用 Access Token：凭证很快过期，且只能用于打开推送连接
+    """
+    return _ticket_serializer().dumps(user_id)
+
+def verify_stream_ticket(ticket: str) -> int | None:
+    """凭证有效时返回用户ID，过期或无效时返回 None"""
+    try:
+        return int(_ticket_serializer().loads(ticket, max_age=current_app.config['NOTIFICATION_STREAM_TICKET_SECONDS']))
+    except (BadSignature, TypeError, ValueError):
+        return None
+
+def _format_sse(payload: dict) -> str:
+    return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+def open_notification_stream(user_id: int, last_event_id: int | None, heartbeat_seconds: float,
+                             max_duration_seconds: float, backfill_limit: int):
+    """
+    打开用户的通知事件流，返回逐条产出 SSE 文本的生成器。
+    先订阅再补发 last_event_id 之后的通知，断线重连期间的通知不会丢失；
+    补发查询结束后立即归还数据库连接，推送阶段不再访问数据库。
+    连接保持 max_duration_seconds 后主动结束，由客户端重新获取凭证后重连。
+    """
+    _ensure_feed()
+    subscription = _broker.subscribe(user_id)
+    try:
+        backfill = []
+        if last_event_id is not None:
+            notifications = Notification.query.filter(
+                Notification.recipient_id == user_id,
+                Notification.id > last_event_id
+            ).order_by(Notification.id).limit(backfill_limit).all()
+            backfill = [_serialize(n) for n in notifications]
+    finally:
+        db.session.close()
+
+    def generate():
+        # 补发与实时推送可能重叠，按ID去重；实时推送的ID不一定递增，不能只比较大小
+        backfilled_ids = {payload['id'] for payload in backfill}
+        deadline = time.monotonic() + max_duration_seconds
+        try:
+            # retry 告诉浏览器断线后多久重连(毫秒)
+            yield "retry: 3000\n\n"
+            for payload in backfill:
+                yield _format_sse(payload)
+
+            while time.monotonic() < deadline:
+                payload = subscription.get(timeout=heartbeat_seconds)
+                if subscription.overflowed:
+                    # 客户端处理不过来、队列溢出：结束连接，客户端重连后按 Last-Event-ID 补发，不留缺口
+                    break
+                if payload is None:
+                    # 注释行作为心跳，防止代理断开空闲连接
+                    yield ": keep-alive\n\n"
+                elif payload['id'] not in backfilled_ids:
+                    yield _format_sse(payload)
+        finally:
+            subscription.close()
+
+    return generate()
@@ -1,23 +1,57 @@
 # backend/app/services/order_service.py
 
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload, selectinload
 from .. import db
 from ..models.user import User, UserRole
-from ..models.order import Order, OrderStatus
+from ..models.order import Order, OrderStatus, OrderStatusEvent, OrderUidSequence, WorkLog
 from ..schemas import order_schemas
-from datetime import datetime
-import random
+from ..utils.pagination import encode_cursor, after_cursor
+from ..utils.upsert import insert_if_missing
+from datetime import datetime, time, timedelta
 
 # --- ADDED: 导入通知服务 ---
 from . import notification_service 
-from . import commission_service # <-- 新增导入
+from . import dashboard_service
+from . import order_state_machine
+from .order_state_machine import VALID_TRANSITIONS
 
-def generate_order_uid():
+ORDER_UID_PREFIX = "PROJ"
+
+def _lock_uid_sequence(day) -> OrderUidSequence:
+    """
+    对当天的计数器行加锁(SELECT ... FOR UPDATE)并返回，锁持有到当前事务结束。
+    当天第一次生成时创建计数器行，并从当天已有的最大序号继续，兼容改造前随机生成的ID。
+    加锁前先确保行存在：对不存在的行 SELECT ... FOR UPDATE 会加间隙锁，
+    并发的首次插入会互相等待对方的间隙锁而死锁(MySQL 1213)。
+    """
+    exists = db.session.query(OrderUidSequence.day).filter_by(day=day).first() is not None
+    if not exists:
+        date_prefix = f"{ORDER_UID_PREFIX}-{day.strftime('%Y%m%d')}-"
+        max_uid = db.session.query(func.max(Order.order_uid)).filter(
+            Order.order_uid.like(f"{date_prefix}%")
+        ).scalar()
+        start_value = int(max_uid[len(date_prefix):]) if max_uid else 0
+        # 多个请求同时创建当天的计数器行时，只有一个插入生效，其余不报错
+        insert_if_missing(OrderUidSequence, day=day, last_value=start_value)
+    return OrderUidSequence.query.filter_by(day=day).with_for_update().populate_existing().one()
+
+def generate_order_uids(count: int) -> list[str]:
+    """
+    在当前事务中一次分配 count 个格式为 PREFIX-YYYYMMDD-XXXX 的订单ID。
+    序号来自按天计数的 order_uid_sequences 表并在行锁下递增，当天内严格递增、不会重复，无需重试。
+    序号超过 9999 时自动变长。
+    """
+    day = datetime.utcnow().date()
+    sequence = _lock_uid_sequence(day)
+    first_value = sequence.last_value + 1
+    sequence.last_value += count
+    date_str = day.strftime('%Y%m%d')
+    return [f"{ORDER_UID_PREFIX}-{date_str}-{value:04d}" for value in range(first_value, first_value + count)]
+
+def generate_order_uid() -> str:
     """生成格式为 PREFIX-YYYYMMDD-XXXX 的唯一订单ID"""
-    prefix = "PROJ"
-    date_str = datetime.utcnow().strftime('%Y%m%d')
-    random_part = f'{random.randint(0, 9999):04d}'
-    # 在实际生产中，还需要检查ID是否已存在，如果存在则重新生成
-    return f"{prefix}-{date_str}-{random_part}"
+    return generate_order_uids(1)[0]
 
 def create_order(order_data: order_schemas.OrderCreate, creator_id: int) -> Order:
     """
@@ -30,104 +64,220 @@ def create_order(order_data: order_schemas.OrderCreate, creator_id: int) -> Orde
         creator_id=creator_id
     )
     db.session.add(new_order)
+    db.session.flush()
+    record_status_event(new_order, None, new_order.status, creator_id, UserRole.CUSTOMER_SERVICE.value)
     db.session.commit()
+    dashboard_service.on_order_created(new_order.status)
     return new_order
 
-def get_orders_for_user(user_id: int, user_role: str):
+# --- ADDED: 关联数据的预加载策略 ---
+# 列表页只展示创建人/负责人，多对一关系用 JOIN 一次带出
+ORDER_LIST_LOAD_OPTIONS = (
+    joinedload(Order.creator),
+    joinedload(Order.developer),
+)
+# 详情页额外需要工作日志(含填写人)和提成，一对多关系用 SELECT ... IN 批量加载
+ORDER_DETAIL_LOAD_OPTIONS = ORDER_LIST_LOAD_OPTIONS + (
+    selectinload(Order.logs).joinedload(WorkLog.developer),
+    selectinload(Order.commissions),
+)
+
+# --- ADDED: 订单列表键集分页 ---
+# 每页默认条数与上限，上限用于防止单次请求拉取过多订单
+ORDER_PAGE_DEFAULT_SIZE = 20
+ORDER_PAGE_MAX_SIZE = 100
+
+def get_orders_for_user(user_id: int, user_role: str, params: order_schemas.OrderListQuery) -> tuple[list[Order], str | None]:
     """
-    根据用户角色获取其有权查看的订单列表
+    根据用户角色获取其有权查看的订单列表（键集分页）。
+    按 (created_at, id) 倒序，返回 (本页订单, 下一页游标)；没有下一页时游标为 None。
     """
-    query = Order.query.order_by(Order.created_at.desc())
-    
+    query = Order.query.options(*ORDER_LIST_LOAD_OPTIONS)
+
+    # 角色可见范围
     if user_role == UserRole.SUPER_ADMIN.value or user_role == UserRole.FINANCE.value:
-        return query.all()
+        pass
     elif user_role == UserRole.CUSTOMER_SERVICE.value:
-        return query.filter_by(creator_id=user_id).all()
+        query = query.filter(Order.creator_id == user_id)
     elif user_role == UserRole.DEVELOPER.value:
-        return query.filter_by(developer_id=user_id).all()
-    
-    return [] # 其他角色或无角色，返回空列表
-
-# --- ADDED: 订单状态流转的核心逻辑 ---
-# 定义状态机: { '当前角色': { '当前状态': ['允许的目标状态1', '允许的目标状态2'] } }
-# 定义状态机 (保持不变)
-VALID_TRANSITIONS = {
-    UserRole.CUSTOMER_SERVICE.value: {
-        OrderStatus.PENDING_ASSIGNMENT: [OrderStatus.PENDING_PAYMENT, OrderStatus.CANCELLED],
-        OrderStatus.PENDING_PAYMENT: [OrderStatus.PAID, OrderStatus.CANCELLED],
-        OrderStatus.PAID: [OrderStatus.IN_DEVELOPMENT, OrderStatus.CANCELLED],
-        OrderStatus.IN_DEVELOPMENT: [OrderStatus.SHIPPED, OrderStatus.CANCELLED],
-        OrderStatus.SHIPPED: [OrderStatus.RECEIVED, OrderStatus.IN_DEVELOPMENT, OrderStatus.CANCELLED],
-        OrderStatus.RECEIVED: [OrderStatus.IN_DEVELOPMENT, OrderStatus.CANCELLED],
-    },
-    UserRole.DEVELOPER.value: {
-        OrderStatus.RECEIVED: [OrderStatus.PENDING_SETTLEMENT]
-    },
-    UserRole.FINANCE.value: {
-        OrderStatus.PENDING_SETTLEMENT: [OrderStatus.VERIFIED], # 审核通过，触发提成计算
-        OrderStatus.VERIFIED: [OrderStatus.SETTLED] # 确认结算，锁定订单
-    },
-    UserRole.SUPER_ADMIN.value: {
-        # 超管可以取消任何未锁定状态的订单 (简化处理，赋予更大权限)
-        OrderStatus.PENDING_ASSIGNMENT: [OrderStatus.CANCELLED],
-        OrderStatus.PENDING_PAYMENT: [OrderStatus.CANCELLED],
-        OrderStatus.IN_DEVELOPMENT: [OrderStatus.CANCELLED],
-        OrderStatus.SHIPPED: [OrderStatus.CANCELLED],
-        OrderStatus.RECEIVED: [OrderStatus.CANCELLED],
-        OrderStatus.PENDING_SETTLEMENT: [OrderStatus.CANCELLED],
-    }
-}
+        query = query.filter(Order.developer_id == user_id)
+    else:
+        return [], None # 其他角色或无角色，返回空列表
+
+    # 服务端筛选
+    if params.status is not None:
+        query = query.filter(Order.status == params.status)
+    if params.creator_id is not None:
+        query = query.filter(Order.creator_id == params.creator_id)
+    if params.developer_id is not None:
+        query = query.filter(Order.developer_id == params.developer_id)
+    if params.start_date is not None:
+        query = query.filter(Order.created_at >= datetime.combine(params.start_date, time.min))
+    if params.end_date is not None:
+        # 半开区间，包含结束日期当天
+        query = query.filter(Order.created_at < datetime.combine(params.end_date + timedelta(days=1), time.min))
+
+    # 游标：只取严格排在上一页最后一条之后的记录
+    if params.cursor:
+        query = query.filter(after_cursor(Order.created_at, Order.id, params.cursor))
+
+    limit = min(params.limit, ORDER_PAGE_MAX_SIZE)
+    # 多取一条用于判断是否还有下一页
+    orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+    return orders, next_cursor
 
 def get_order_by_id(order_id: int) -> Order | None:
     """通过ID获取订单"""
     return db.session.get(Order, order_id)
 
-def update_order_status(order: Order, target_status: OrderStatus, user_role: str) -> Order:
-    """更新订单状态，内置权限和逻辑校验"""
-    # 【修复点】检查订单是否锁定，但对超管豁免
-    # - if order.is_locked:
-    # + 新的豁免逻辑
-    if order.is_locked and user_role != UserRole.SUPER_ADMIN.value:
-        raise ValueError("Order is locked and cannot be modified.")
+def get_order_detail(order_id: int) -> Order | None:
+    """通过ID获取订单，并预加载详情页所需的全部关联数据"""
+    return db.session.get(Order, order_id, options=ORDER_DETAIL_LOAD_OPTIONS)
 
-    current_status = order.status
-    
-    # ... (权限和状态转换校验逻辑保持不变) ...
-    role_transitions = VALID_TRANSITIONS.get(user_role)
-    if not role_transitions:
-        raise PermissionError("You do not have permission to change order status.")
-
-    allowed_statuses = role_transitions.get(current_status)
-    if not allowed_statuses or target_status not in allowed_statuses:
-        raise ValueError(f"Transition from {current_status.value} to {target_status.value} is not allowed for your role.")
-
-    # 更新状态和相关时间戳
-    order.status = target_status
-    if target_status == OrderStatus.SHIPPED:
-        order.shipped_at = datetime.utcnow()
-    
-    # --- 触发通知和业务逻辑 ---
-    if target_status == OrderStatus.PENDING_SETTLEMENT and order.developer:
-        content = f"订单 [{order.order_uid}] 已被技术人员 {order.developer.full_name} 确认为可结算，请审核。"
-        notification_service.notify_all_finances(content, order.id)
-
-    # 【Bug 2 修复】当财务核验通过时，计算提成
-    if target_status == OrderStatus.VERIFIED:
-        commission_service.calculate_and_create_commissions(order)
-        # 可以选择性地通知客服和技术提成已生成
-        if order.creator:
-             notification_service.create_notification(order.creator.id, f"您的订单 [{order.order_uid}] 提成已计算完成。", order.id)
-        if order.developer:
-             notification_service.create_notification(order.developer.id, f"您的订单 [{order.order_uid}] 提成已计算完成。", order.id)
-            
-    # 【Bug 1 修复】当订单最终完成或取消时，锁定订单
-    if target_status in [OrderStatus.SETTLED, OrderStatus.CANCELLED]:
-        order.is_locked = True
-        
+def record_status_event(order: Order, from_status: OrderStatus | None, to_status: OrderStatus,
+                        user_id: int | None, user_role: str | None, changed_at: datetime | None = None) -> OrderStatusEvent:
+    """追加一条订单状态流转记录，由调用者统一提交"""
+    event = OrderStatusEvent(
+        order_id=order.id,
+        from_status=from_status,
+        to_status=to_status,
+        changed_by_id=user_id,
+        changed_by_role=user_role,
+        created_at=changed_at or datetime.utcnow()
+    )
+    db.session.add(event)
+    return event
+
+def record_status_events(rows: list[dict]):
+    """用一条多行 INSERT 追加多条状态流转记录(不构造 ORM 对象)，由调用者统一提交"""
+    db.session.execute(insert(OrderStatusEvent), rows)
+
+def get_allowed_next_statuses(order: Order, user_role: str, user_id: int | None) -> list[OrderStatus]:
+    """获取当前角色可以将订单流转到的状态列表，供前端决定展示哪些操作"""
+    return list(order_state_machine.allowed_next_statuses(order, user_role, user_id))
+
+def get_status_events(order: Order) -> list[OrderStatusEvent]:
+    """获取订单的状态流转记录，按发生顺序排列"""
+    return order.status_events.all()
+
+def update_order_status(order: Order, target_status: OrderStatus, user_role: str, user_id: int | None = None) -> Order:
+    """更新订单状态，内置权限和逻辑校验，并记录状态流转"""
+    order_state_machine.check_transition(order, target_status, user_role, user_id)
+
+    effects = order_state_machine.TransitionEffects()
+    order_state_machine.apply_transition(order, target_status, user_role, user_id, datetime.utcnow(), effects)
+    effects.flush()
     db.session.commit()
+    effects.after_commit()
     return order
 
 
+# --- ADDED: 批量操作，每块一个事务 ---
+BULK_CHUNK_SIZE = 50
+
+def bulk_create_orders(items: list[tuple[int, order_schemas.OrderCreate]], creator_id: int,
+                       chunk_size: int = BULK_CHUNK_SIZE) -> list[dict]:
+    """
+    批量创建订单。items 为 [(请求中的序号, OrderCreate)]。
+    每块一次性分配业务ID、一次刷新写入订单和状态记录、一次提交；某块失败时该块内的订单全部失败。
+    返回每一项的结果 {"index", "ok", "order_id", "order_uid"} 或 {"index", "ok": False, "error"}。
+    """
+    results = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        try:
+            uids = generate_order_uids(len(chunk))
+            orders = [
+                Order(
+                    order_uid=uid,
+                    customer_info=order_data.customer_info,
+                    requirements_desc=order_data.requirements_desc,
+                    creator_id=creator_id
+                )
+                for uid, (_, order_data) in zip(uids, chunk)
+            ]
+            db.session.add_all(orders)
+            db.session.flush()
+            now = datetime.utcnow()
+            record_status_events([
+                dict(order_id=order.id, from_status=None, to_status=order.status, changed_by_id=creator_id,
+                     changed_by_role=UserRole.CUSTOMER_SERVICE.value, created_at=now)
+                for order in orders
+            ])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            results.extend({"index": index, "ok": False, "error": str(e)} for index, _ in chunk)
+            continue
+
+        for (index, _), order in zip(chunk, orders):
+            dashboard_service.on_order_created(order.status)
+            results.append({"index": index, "ok": True, "order_id": order.id, "order_uid": order.order_uid})
+    return results
+
+def bulk_update_order_status(items: list[tuple[int, OrderStatus]], user_role: str, user_id: int | None,
+                             chunk_size: int = BULK_CHUNK_SIZE) -> list[dict]:
+    """
+    批量流转订单状态。items 为 [(订单ID, 目标状态)]，由状态机整块校验。
+    每块一次查询加载订单、副作用(提成、通知)合并执行、一次提交；
+    校验失败的订单单独报告，不影响同块的其他订单；提交失败时该块内已通过校验的订单全部失败。
+    返回每一项的结果 {"order_id", "ok", "status"} 或 {"order_id", "ok": False, "error"}，顺序与输入一致。
+    """
+    results = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        orders = {
+            order.id: order
+            for order in Order.query.options(*ORDER_LIST_LOAD_OPTIONS).filter(
+                Order.id.in_({order_id for order_id, _ in chunk})
+            )
+        }
+
+        chunk_orders = [orders.get(order_id) for order_id, _ in chunk]
+        errors = order_state_machine.validate_transitions(
+            [(order, target_status) for order, (_, target_status) in zip(chunk_orders, chunk)], user_role, user_id
+        )
+
+        effects = order_state_machine.TransitionEffects()
+        now = datetime.utcnow()
+        chunk_results = []
+        applied = []
+        for order, (order_id, target_status), error in zip(chunk_orders, chunk, errors):
+            if error is None:
+                # 整块校验针对的是流转前的状态，执行前按会话中的当前状态再校验一次
+                try:
+                    order_state_machine.check_transition(order, target_status, user_role, user_id)
+                except (ValueError, PermissionError) as e:
+                    error = str(e)
+            if error:
+                chunk_results.append({"order_id": order_id, "ok": False, "error": error})
+                continue
+            order_state_machine.apply_transition(order, target_status, user_role, user_id, now, effects)
+            result = {"order_id": order_id, "ok": True, "status": target_status.value}
+            chunk_results.append(result)
+            applied.append(result)
+
+        if applied:
+            try:
+                effects.flush()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                for result in applied:
+                    result.pop("status")
+                    result.update(ok=False, error=str(e))
+                effects = None
+            if effects:
+                effects.after_commit()
+        results.extend(chunk_results)
+    return results
+
+
 def update_order_details_by_cs(order: Order, update_data: order_schemas.OrderUpdateByCs, user_role: str) -> Order:
     """由客服更新订单信息（价格、分配技术），超管也可操作"""
     # + 传入 user_role 并添加豁免逻辑
@@ -136,6 +286,7 @@ def update_order_details_by_cs(order: Order, update_data: order_schemas.OrderUpd
     
     update_dict = update_data.model_dump(exclude_unset=True)
 
+    old_price = order.final_price
     if 'final_price' in update_dict:
         order.final_price = update_dict['final_price']
 
@@ -157,6 +308,8 @@ def update_order_details_by_cs(order: Order, update_data: order_schemas.OrderUpd
 
 
     db.session.commit()
+    if order.final_price != old_price:
+        dashboard_service.on_order_price_changed(order.status, old_price, order.final_price)
     return order
 
 
@@ -166,10 +319,12 @@ def set_commission_override(order: Order, override_data: order_schemas.Commissio
     if order.is_locked and user_role != UserRole.SUPER_ADMIN.value:
         raise ValueError("Order is locked and cannot be modified.")
         
-    current_override = order.commission_rate_override or {}
+    # 复制一份再修改，原地修改 JSON 字段不会被 SQLAlchemy 识别为变更
+    current_override = dict(order.commission_rate_override or {})
     update_dict = override_data.model_dump(exclude_unset=True)
     
-    current_override.update(update_dict)
+    # Decimal 无法直接写入 JSON 字段，转换为 float
+    current_override.update({k: float(v) if v is not None else None for k, v in update_dict.items()})
     order.commission_rate_override = current_override
     
     db.session.commit()
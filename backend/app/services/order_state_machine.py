@@ -0,0 +1,211 @@
+# backend/app/services/order_state_machine.py
+
+from types import MappingProxyType
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from .. import db
+from ..models.user import UserRole
+from ..models.order import Order, OrderStatus, OrderStatusEvent
+from . import notification_service
+from . import commission_service
+from . import dashboard_service
+
+# 定义状态机: { '当前角色': { '当前状态': ['允许的目标状态1', '允许的目标状态2'] } }
+# 列表顺序即"下一步可选状态"接口返回的顺序
+VALID_TRANSITIONS = {
+    UserRole.CUSTOMER_SERVICE.value: {
+        OrderStatus.PENDING_ASSIGNMENT: [OrderStatus.PENDING_PAYMENT, OrderStatus.CANCELLED],
+        OrderStatus.PENDING_PAYMENT: [OrderStatus.PAID, OrderStatus.CANCELLED],
+        OrderStatus.PAID: [OrderStatus.IN_DEVELOPMENT, OrderStatus.CANCELLED],
+        OrderStatus.IN_DEVELOPMENT: [OrderStatus.SHIPPED, OrderStatus.CANCELLED],
+        OrderStatus.SHIPPED: [OrderStatus.RECEIVED, OrderStatus.IN_DEVELOPMENT, OrderStatus.CANCELLED],
+        OrderStatus.RECEIVED: [OrderStatus.IN_DEVELOPMENT, OrderStatus.CANCELLED],
+    },
+    UserRole.DEVELOPER.value: {
+        OrderStatus.RECEIVED: [OrderStatus.PENDING_SETTLEMENT]
+    },
+    UserRole.FINANCE.value: {
+        OrderStatus.PENDING_SETTLEMENT: [OrderStatus.VERIFIED], # 审核通过，触发提成计算
+        OrderStatus.VERIFIED: [OrderStatus.SETTLED] # 确认结算，锁定订单
+    },
+    UserRole.SUPER_ADMIN.value: {
+        # 超管可以取消任何未锁定状态的订单 (简化处理，赋予更大权限)
+        OrderStatus.PENDING_ASSIGNMENT: [OrderStatus.CANCELLED],
+        OrderStatus.PENDING_PAYMENT: [OrderStatus.CANCELLED],
+        OrderStatus.IN_DEVELOPMENT: [OrderStatus.CANCELLED],
+        OrderStatus.SHIPPED: [OrderStatus.CANCELLED],
+        OrderStatus.RECEIVED: [OrderStatus.CANCELLED],
+        OrderStatus.PENDING_SETTLEMENT: [OrderStatus.CANCELLED],
+    }
+}
+
+
+class TransitionEffects:
+    """
+    收集一批状态流转产生的状态记录、通知、提成计算和仪表盘更新，
+    在同一事务中合并执行，单个订单与批量操作共用。
+    """
+
+    def __init__(self):
+        self.finance_messages = []  # (内容, 订单ID)，发送给所有财务
+        self.messages = []  # (接收者ID列表, 内容, 订单ID)
+        self.commission_orders = []
+        self.status_events = []  # 待写入 order_status_events 的行
+        self.status_changes = []  # (原状态, 新状态, 订单金额)
+
+    def flush(self):
+        """在提交前执行：一次多行插入写入状态流转记录，批量计算提成，再用一次多行插入发送全部通知"""
+        if self.status_events:
+            db.session.execute(insert(OrderStatusEvent), self.status_events)
+        if self.commission_orders:
+            commission_service.calculate_and_create_commissions_for_orders(self.commission_orders)
+
+        messages = list(self.messages)
+        if self.finance_messages:
+            finance_ids = notification_service.get_active_user_ids(UserRole.FINANCE)
+            messages += [(finance_ids, content, order_id) for content, order_id in self.finance_messages]
+        if messages:
+            # 订单在同一状态间反复切换时，窗口期内不重复通知
+            notification_service.send_notifications(
+                messages, current_app.config['NOTIFICATION_DEDUP_WINDOW_SECONDS']
+            )
+
+    def after_commit(self):
+        for from_status, to_status, final_price in self.status_changes:
+            dashboard_service.on_order_status_changed(from_status, to_status, final_price)
+
+
+# --- 副作用钩子 ---
+# 钩子签名: hook(order, from_status, to_status, now, effects)，在订单状态已更新后调用。
+# 钩子只修改订单字段或向 effects 登记副作用，不直接访问数据库，由 effects 在提交前合并执行。
+_registered_hooks = []  # (原状态或 None 表示任意, 目标状态, 钩子)
+
+def on_transition(to_status: OrderStatus, from_status: OrderStatus | None = None):
+    """注册流转到 to_status 时执行的钩子；from_status 为 None 时匹配任意原状态。需在模块导入阶段注册"""
+    def decorator(hook):
+        _registered_hooks.append((from_status, to_status, hook))
+        return hook
+    return decorator
+
+
+@on_transition(OrderStatus.SHIPPED)
+def _stamp_shipped_at(order, from_status, to_status, now, effects):
+    order.shipped_at = now
+
+@on_transition(OrderStatus.VERIFIED)
+def _stamp_verified_at(order, from_status, to_status, now, effects):
+    order.verified_at = now
+
+@on_transition(OrderStatus.SETTLED)
+def _stamp_settled_at(order, from_status, to_status, now, effects):
+    order.settled_at = now
+
+@on_transition(OrderStatus.PENDING_SETTLEMENT)
+def _notify_finance_for_review(order, from_status, to_status, now, effects):
+    # 使用订单关联的用户(列表查询已预加载)，不用用户目录缓存：其他 worker 新建的技术在缓存过期前查不到
+    developer = order.developer
+    if developer:
+        content = f"订单 [{order.order_uid}] 已被技术人员 {developer.full_name} 确认为可结算，请审核。"
+        effects.finance_messages.append((content, order.id))
+
+@on_transition(OrderStatus.VERIFIED)
+def _calculate_commissions(order, from_status, to_status, now, effects):
+    """财务核验通过时计算提成，并通知客服和技术提成已生成"""
+    effects.commission_orders.append(order)
+    effects.messages.append((
+        [order.creator_id, order.developer_id],
+        f"您的订单 [{order.order_uid}] 提成已计算完成。",
+        order.id
+    ))
+
+@on_transition(OrderStatus.SETTLED)
+@on_transition(OrderStatus.CANCELLED)
+def _lock_order(order, from_status, to_status, now, effects):
+    """订单最终完成或取消时锁定订单"""
+    order.is_locked = True
+
+
+# --- 导入时编译 ---
+def _compile_transition_table(transitions: dict) -> MappingProxyType:
+    """编译为只读的 {(角色, 当前状态): (目标状态, ...)}，查询时一次字典查找"""
+    return MappingProxyType({
+        (role, from_status): tuple(targets)
+        for role, role_transitions in transitions.items()
+        for from_status, targets in role_transitions.items()
+    })
+
+def _compile_hooks(table: MappingProxyType) -> MappingProxyType:
+    """为表中每一条 (原状态, 目标状态) 边预先解析出按注册顺序排列的钩子元组"""
+    edges = {(from_status, to_status) for (_, from_status), targets in table.items() for to_status in targets}
+    return MappingProxyType({
+        (from_status, to_status): tuple(
+            hook for hook_from, hook_to, hook in _registered_hooks
+            if hook_to == to_status and hook_from in (None, from_status)
+        )
+        for from_status, to_status in edges
+    })
+
+TRANSITION_TABLE = _compile_transition_table(VALID_TRANSITIONS)
+TRANSITION_HOOKS = _compile_hooks(TRANSITION_TABLE)
+_ROLES_WITH_TRANSITIONS = frozenset(VALID_TRANSITIONS)
+
+
+def _is_assigned_developer(order: Order, user_role: str, user_id: int | None) -> bool:
+    """技术人员只能流转分配给自己的订单，其他角色不受此限制"""
+    return user_role != UserRole.DEVELOPER.value or order.developer_id == user_id
+
+def allowed_next_statuses(order: Order, user_role: str, user_id: int | None) -> tuple[OrderStatus, ...]:
+    """返回该用户当前可以将订单流转到的状态，订单已锁定(超管除外)或不是负责的技术时为空"""
+    if order.is_locked and user_role != UserRole.SUPER_ADMIN.value:
+        return ()
+    if not _is_assigned_developer(order, user_role, user_id):
+        return ()
+    return TRANSITION_TABLE.get((user_role, order.status), ())
+
+def check_transition(order: Order, target_status: OrderStatus, user_role: str, user_id: int | None):
+    """校验订单能否由该用户流转到目标状态，不允许时抛出 ValueError/PermissionError"""
+    # 【修复点】检查订单是否锁定，但对超管豁免
+    if order.is_locked and user_role != UserRole.SUPER_ADMIN.value:
+        raise ValueError("Order is locked and cannot be modified.")
+
+    if user_role not in _ROLES_WITH_TRANSITIONS:
+        raise PermissionError("You do not have permission to change order status.")
+
+    if not _is_assigned_developer(order, user_role, user_id):
+        raise PermissionError("Only the developer assigned to this order can change its status.")
+
+    if target_status not in TRANSITION_TABLE.get((user_role, order.status), ()):
+        raise ValueError(f"Transition from {order.status.value} to {target_status.value} is not allowed for your role.")
+
+def validate_transitions(items: list[tuple[Order | None, OrderStatus]], user_role: str,
+                         user_id: int | None) -> list[str | None]:
+    """
+    一次校验一批流转，items 为 [(订单, 目标状态)]，订单为 None 表示不存在。
+    返回与输入顺序一致的错误信息列表，可以流转的项为 None。
+    """
+    errors = []
+    for order, target_status in items:
+        if order is None:
+            errors.append("Order not found")
+            continue
+        try:
+            check_transition(order, target_status, user_role, user_id)
+        except (ValueError, PermissionError) as e:
+            errors.append(str(e))
+        else:
+            errors.append(None)
+    return errors
+
+def apply_transition(order: Order, target_status: OrderStatus, user_role: str, user_id: int | None,
+                     now: datetime, effects: TransitionEffects):
+    """执行已校验的状态流转：更新状态、记录流转，依次执行该边注册的钩子"""
+    from_status = order.status
+    order.status = target_status
+    effects.status_events.append(dict(
+        order_id=order.id, from_status=from_status, to_status=target_status,
+        changed_by_id=user_id, changed_by_role=user_role, created_at=now
+    ))
+    for hook in TRANSITION_HOOKS.get((from_status, target_status), ()):
+        hook(order, from_status, target_status, now, effects)
+    effects.status_changes.append((from_status, target_status, order.final_price))
@@ -0,0 +1,211 @@
+# backend/app/services/report_job_service.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from flask import current_app
+from . import report_service
+
+# 任务状态
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+SETTLED_ORDERS_REPORT = 'settled-orders'
+
+_JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+# 本进程中尚未结束的任务, job_id -> Future
+_active_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _heartbeat_loop(cache_dir: str, interval: float):
+    """
+    定期更新本进程中排队和执行中任务的状态文件修改时间作为心跳。
+    只修改 mtime 不改写内容，不会与任务线程写入的状态相互覆盖。
+    """
+    while True:
+        time.sleep(interval)
+        for job_id in list(_active_jobs):
+            try:
+                os.utime(os.path.join(cache_dir, f"{job_id}.json"))
+            except FileNotFoundError:
+                pass
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config['REPORT_JOB_WORKERS'],
+                thread_name_prefix='report-job'
+            )
+            threading.Thread(
+                target=_heartbeat_loop,
+                args=(_cache_dir(), current_app.config['REPORT_JOB_HEARTBEAT_SECONDS']),
+                name='report-job-heartbeat',
+                daemon=True
+            ).start()
+        return _executor
+
+
+def _cache_dir() -> str:
+    cache_dir = current_app.config['REPORT_CACHE_DIR']
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _state_path(job_id: str) -> str:
+    return os.path.join(_cache_dir(), f"{job_id}.json")
+
+
+def _result_path(job_id: str) -> str:
+    return os.path.join(_cache_dir(), f"{job_id}.xlsx")
+
+
+def _read_state(job_id: str) -> dict | None:
+    try:
+        with open(_state_path(job_id), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_state(state: dict):
+    """原子地写入任务状态文件，其他 gunicorn worker 也能读到"""
+    path = _state_path(state['job_id'])
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def make_job_id(report_type: str, params: dict) -> str:
+    """任务ID由报表类型和参数决定，相同参数的请求共用同一个任务和缓存文件"""
+    raw = json.dumps([report_type, params], sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def evict_expired_results():
+    """删除超过 TTL 的任务状态和结果文件（本进程正在执行的任务除外）"""
+    ttl = current_app.config['REPORT_CACHE_TTL_SECONDS']
+    expire_before = time.time() - ttl
+    cache_dir = _cache_dir()
+    for name in os.listdir(cache_dir):
+        job_id = name.split('.', 1)[0]
+        if job_id in _active_jobs:
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _is_alive(job_id: str, state: dict) -> bool:
+    """排队中或执行中的任务可能属于其他 worker：心跳未超时才视为仍在进行，所属 worker 崩溃后可重新提交"""
+    if job_id in _active_jobs:
+        return True
+    if state.get('worker_pid') == os.getpid():
+        # 本进程的任务不在 _active_jobs 中，说明已经丢失
+        return False
+    try:
+        heartbeat_age = time.time() - os.path.getmtime(_state_path(job_id))
+    except FileNotFoundError:
+        return False
+    return heartbeat_age < current_app.config['REPORT_JOB_HEARTBEAT_SECONDS'] * 3
+
+
+def _is_reusable(job_id: str, state: dict | None) -> bool:
+    if not state:
+        return False
+    if state['status'] == JOB_DONE:
+        return os.path.exists(_result_path(job_id))
+    return state['status'] in (JOB_PENDING, JOB_RUNNING) and _is_alive(job_id, state)
+
+
+def submit_settled_orders_job(start_date: date, end_date: date) -> dict:
+    """
+    提交已结算订单报表任务，返回任务状态。
+    若相同参数的任务正在执行或已有未过期的结果，则直接复用。
+    """
+    params = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
+    job_id = make_job_id(SETTLED_ORDERS_REPORT, params)
+
+    evict_expired_results()
+
+    with _jobs_lock:
+        state = _read_state(job_id)
+        if _is_reusable(job_id, state):
+            return state
+
+        state = {
+            "job_id": job_id,
+            "report_type": SETTLED_ORDERS_REPORT,
+            "params": params,
+            "status": JOB_PENDING,
+            "row_count": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "worker_pid": os.getpid()
+        }
+        _write_state(state)
+
+        app = current_app._get_current_object()
+        _active_jobs[job_id] = _get_executor().submit(_run_settled_orders_job, app, state)
+
+    return state
+
+
+def _run_settled_orders_job(app, state: dict):
+    """在后台线程中生成报表文件"""
+    job_id = state['job_id']
+    with app.app_context():
+        try:
+            state = dict(state, status=JOB_RUNNING)
+            _write_state(state)
+
+            start_date, end_date = report_service.parse_date_range(
+                state['params']['start_date'], state['params']['end_date']
+            )
+            result_path = _result_path(job_id)
+            tmp_path = f"{result_path}.{os.getpid()}.{threading.get_ident()}.tmp.xlsx"
+            row_count = report_service.write_settled_orders_report(start_date, end_date, tmp_path)
+            os.replace(tmp_path, result_path)
+
+            state = dict(state, status=JOB_DONE, row_count=row_count, finished_at=datetime.utcnow().isoformat())
+        except Exception as e:
+            app.logger.exception("Report job %s failed", job_id)
+            state = dict(state, status=JOB_FAILED, error=str(e), finished_at=datetime.utcnow().isoformat())
+        finally:
+            _write_state(state)
+            with _jobs_lock:
+                _active_jobs.pop(job_id, None)
+
+
+def get_job(job_id: str) -> dict | None:
+    """查询任务状态，任务不存在或已过期时返回 None"""
+    if not _JOB_ID_PATTERN.match(job_id):
+        return None
+    return _read_state(job_id)
+
+
+def get_job_result_path(job_id: str) -> str | None:
+    """返回已完成任务的结果文件路径，未完成或已过期时返回 None"""
+    state = get_job(job_id)
+    if not state or state['status'] != JOB_DONE:
+        return None
+    path = _result_path(job_id)
+    return path if os.path.exists(path) else None
@@ -1,85 +1,159 @@
 # backend/app/services/report_service.py
 
-from io import BytesIO
+import pickle
+from tempfile import SpooledTemporaryFile
 from datetime import datetime
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+from sqlalchemy import func, case
+from sqlalchemy.orm import aliased
 from .. import db
 from ..models.order import Order, OrderStatus
 from ..models.commission import Commission
-from ..models.user import UserRole
+from ..models.user import User, UserRole
 
-def generate_settled_orders_report(start_date_str: str, end_date_str: str) -> BytesIO:
-    """
-    根据时间范围生成已结算订单的Excel报表。
-    """
+# 每次从数据库游标中取出的订单条数
+REPORT_FETCH_SIZE = 1000
+# 中间数据与生成的Excel文件在内存中最多占用的字节数，超过后自动落盘
+REPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# 向客户端分块发送文件时每块的大小
+REPORT_CHUNK_SIZE = 64 * 1024
+
+REPORT_HEADERS = [
+    "订单业务ID", "结算时间", "客户姓名", "订单金额",
+    "客服", "客服提成", "技术", "技术提成"
+]
+
+def parse_date_range(start_date_str: str, end_date_str: str) -> tuple[datetime, datetime]:
     try:
         start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
         # 结束日期需要包含当天，所以设置为当天的23:59:59
         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
     except (ValueError, TypeError):
         raise ValueError("Invalid date format. Please use YYYY-MM-DD.")
+    return start_date, end_date
+
+def build_settled_orders_report_query(start_date: datetime, end_date: datetime):
+    """
+    构造报表查询：一次往返取回扁平的行数据，不构建 ORM 对象。
+    订单与客服、技术两个用户角色做关联，提成按 role_at_time 预先聚合成两列后再关联。
+    """
+    creator = aliased(User)
+    developer = aliased(User)
 
-    # 1. 查询已结算的订单
-    orders = db.session.query(Order).filter(
+    commission_pivot = db.session.query(
+        Commission.order_id.label('order_id'),
+        func.sum(case(
+            (Commission.role_at_time == UserRole.CUSTOMER_SERVICE.value, Commission.amount),
+            else_=0
+        )).label('cs_commission'),
+        func.sum(case(
+            (Commission.role_at_time == UserRole.DEVELOPER.value, Commission.amount),
+            else_=0
+        )).label('dev_commission')
+    ).group_by(Commission.order_id).subquery()
+
+    return db.session.query(
+        Order.order_uid,
+        Order.settled_at,
+        Order.customer_info,
+        Order.final_price,
+        creator.full_name,
+        commission_pivot.c.cs_commission,
+        developer.full_name,
+        commission_pivot.c.dev_commission
+    ).outerjoin(
+        creator, creator.id == Order.creator_id
+    ).outerjoin(
+        developer, developer.id == Order.developer_id
+    ).outerjoin(
+        commission_pivot, commission_pivot.c.order_id == Order.id
+    ).filter(
         Order.status == OrderStatus.SETTLED,
-        Order.updated_at.between(start_date, end_date)
-    ).order_by(Order.updated_at.desc()).all()
-
-    # 2. 创建Excel工作簿
-    workbook = Workbook()
-    ws = workbook.active
-    ws.title = "已结算订单报表"
-
-    # 3. 设置表头
-    headers = [
-        "订单业务ID", "结算时间", "客户姓名", "订单金额", 
-        "客服", "客服提成", "技术", "技术提成"
-    ]
-    ws.append(headers)
-    for cell in ws[1]:
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center')
-
-    # 4. 填充数据
-    for order in orders:
-        # 获取关联的提成记录
-        commissions = {
-            comm.role_at_time: comm.amount 
-            for comm in order.commissions
-        }
-        
-        cs_commission = commissions.get(UserRole.CUSTOMER_SERVICE.value, 0)
-        dev_commission = commissions.get(UserRole.DEVELOPER.value, 0)
-
-        row_data = [
-            order.order_uid,
-            order.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-            order.customer_info.get('name', 'N/A'),
-            order.final_price,
-            order.creator.full_name if order.creator else 'N/A',
-            cs_commission,
-            order.developer.full_name if order.developer else 'N/A',
-            dev_commission
+        Order.settled_at.between(start_date, end_date)
+    ).order_by(Order.settled_at.desc())
+
+def _iter_report_rows(start_date: datetime, end_date: datetime):
+    """按批次从数据库游标读取报表查询结果，逐行产出报表数据"""
+    rows = build_settled_orders_report_query(start_date, end_date).yield_per(REPORT_FETCH_SIZE)
+
+    for (order_uid, settled_at, customer_info, final_price,
+         cs_name, cs_commission, dev_name, dev_commission) in rows:
+        yield [
+            order_uid,
+            settled_at.strftime('%Y-%m-%d %H:%M:%S'),
+            (customer_info or {}).get('name', 'N/A'),
+            final_price,
+            cs_name or 'N/A',
+            cs_commission or 0,
+            dev_name or 'N/A',
+            dev_commission or 0
         ]
-        ws.append(row_data)
-
-    # 调整列宽 (可选，但能提升可读性)
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter # 获取列的字母
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = adjusted_width
-
-    # 5. 将工作簿保存到内存中
-    excel_file = BytesIO()
-    workbook.save(excel_file)
+
+def write_settled_orders_report(start_date: datetime, end_date: datetime, output) -> int:
+    """
+    将已结算订单报表写入 output (文件路径或可写文件对象)，返回数据行数。
+    数据库按批读取，工作表使用 write_only 模式逐行写入，内存占用与订单数量无关。
+    """
+    # 1. 读取数据的同时记录每列最大宽度，并将行暂存到临时文件
+    # (xlsx 要求列宽定义写在所有行之前，所以行需要先暂存，拿到最终列宽后再写入工作表)
+    column_widths = [len(str(header)) for header in REPORT_HEADERS]
+    row_buffer = SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
+    row_count = 0
+    try:
+        for row_data in _iter_report_rows(start_date, end_date):
+            for index, value in enumerate(row_data):
+                column_widths[index] = max(column_widths[index], len(str(value)))
+            pickle.dump(row_data, row_buffer, protocol=pickle.HIGHEST_PROTOCOL)
+            row_count += 1
+
+        # 2. 创建 write_only 工作簿，先设置列宽再写表头
+        workbook = Workbook(write_only=True)
+        ws = workbook.create_sheet(title="已结算订单报表")
+        for index, width in enumerate(column_widths, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width + 2
+
+        header_cells = []
+        for header in REPORT_HEADERS:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal='center')
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        # 3. 逐行写入数据
+        row_buffer.seek(0)
+        for _ in range(row_count):
+            ws.append(pickle.load(row_buffer))
+    finally:
+        row_buffer.close()
+
+    # 4. 保存工作簿
+    workbook.save(output)
+    return row_count
+
+def generate_settled_orders_report(start_date_str: str, end_date_str: str) -> SpooledTemporaryFile:
+    """
+    根据时间范围生成已结算订单的Excel报表（流式写入）。
+    返回已定位到开头的临时文件，由调用方负责关闭。
+    """
+    start_date, end_date = parse_date_range(start_date_str, end_date_str)
+
+    excel_file = SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
+    write_settled_orders_report(start_date, end_date, excel_file)
     excel_file.seek(0)
-    
-    return excel_file
\ No newline at end of file
+
+    return excel_file
+
+def iter_file_chunks(file_obj, chunk_size: int = REPORT_CHUNK_SIZE):
+    """分块读取文件用于流式响应，读取完毕后关闭文件"""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
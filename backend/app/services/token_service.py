@@ -0,0 +1,117 @@
+# backend/app/services/token_service.py
+
+import calendar
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token
+from .. import db
+from ..models.user import User, TokenRevocation, RefreshToken
+
+# --- 进程内吊销表: 用户ID -> not_before(秒级时间戳) ---
+# 每个请求只做一次字典查找；各 worker 每隔 TOKEN_REVOCATION_SYNC_SECONDS 从数据库增量同步一次
+_not_before = {}
+_synced_at = None  # 上次同步的 time.monotonic()
+_watermark = None  # 已同步到的 updated_at
+_sync_lock = threading.Lock()
+# 增量同步时往前多读的时间，避免提交较晚的事务因 updated_at 更早而被漏掉
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _timestamp(moment: datetime) -> int:
+    return calendar.timegm(moment.utctimetuple())
+
+
+def _sync_revocations():
+    global _synced_at, _watermark
+    interval = current_app.config['TOKEN_REVOCATION_SYNC_SECONDS']
+    if _synced_at is not None and time.monotonic() - _synced_at < interval:
+        return
+    with _sync_lock:
+        if _synced_at is not None and time.monotonic() - _synced_at < interval:
+            return
+        query = db.session.query(TokenRevocation.user_id, TokenRevocation.not_before, TokenRevocation.updated_at)
+        if _watermark is not None:
+            query = query.filter(TokenRevocation.updated_at >= _watermark - _SYNC_OVERLAP)
+        for user_id, not_before, updated_at in query:
+            _not_before[user_id] = max(_not_before.get(user_id, 0), _timestamp(not_before))
+            if _watermark is None or updated_at > _watermark:
+                _watermark = updated_at
+        _synced_at = time.monotonic()
+
+
+def is_token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
+    """flask_jwt_extended 的 token_in_blocklist_loader：签发时间早于该用户的 not_before 即视为已吊销"""
+    _sync_revocations()
+    try:
+        user_id = int(jwt_payload['sub'])
+    except (KeyError, ValueError):
+        return True
+    return jwt_payload.get('iat', 0) < _not_before.get(user_id, 0)
+
+
+def revoke_user_tokens(user_id: int):
+    """
+    吊销该用户此前签发的全部访问令牌和刷新令牌，由调用者统一提交。
+    not_before 向上取整到秒(JWT 的 iat 精确到秒)，同一秒内稍后签发的令牌也会失效，重新登录即可。
+    """
+    now = datetime.utcnow()
+    not_before = now.replace(microsecond=0) + timedelta(seconds=1 if now.microsecond else 0)
+    db.session.merge(TokenRevocation(user_id=user_id, not_before=not_before, updated_at=now))
+    # 本进程立即生效，其他 worker 在下次同步时生效
+    _not_before[user_id] = max(_not_before.get(user_id, 0), _timestamp(not_before))
+
+
+def issue_tokens(user: User) -> dict:
+    """签发一对令牌(短期访问令牌 + 一次性刷新令牌)，并记录刷新令牌，由调用者统一提交"""
+    additional_claims = {"role": user.role.value, "full_name": user.full_name}
+    access_token = create_access_token(identity=str(user.id), additional_claims=additional_claims)
+
+    jti = str(uuid.uuid4())
+    refresh_token = create_refresh_token(identity=str(user.id), additional_claims={"jti": jti})
+    db.session.add(RefreshToken(
+        jti=jti,
+        user_id=user.id,
+        expires_at=datetime.utcnow() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    ))
+    # 顺带清理该用户已过期的刷新令牌记录
+    RefreshToken.query.filter(
+        RefreshToken.user_id == user.id, RefreshToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    return {"access_token": access_token, "refresh_token": refresh_token}
+
+
+def rotate_refresh_token(user_id: int, jti: str) -> dict:
+    """
+    用刷新令牌换发新的一对令牌，旧刷新令牌随即作废。
+    已使用过的刷新令牌再次出现说明可能被盗用，吊销该用户全部令牌；
+    刚使用过(REFRESH_TOKEN_REUSE_GRACE_SECONDS 内)的只拒绝，多个标签页同时刷新时不会把用户踢下线。
+    用户不存在或已禁用时同样拒绝。失败时抛出 PermissionError。
+    """
+    record = RefreshToken.query.filter_by(jti=jti).with_for_update().first()
+    if record is None or record.user_id != user_id:
+        raise PermissionError("Invalid refresh token")
+    if record.used_at is not None:
+        grace = timedelta(seconds=current_app.config['REFRESH_TOKEN_REUSE_GRACE_SECONDS'])
+        if datetime.utcnow() - record.used_at < grace:
+            raise PermissionError("Refresh token has just been rotated")
+        revoke_user_tokens(user_id)
+        db.session.commit()
+        raise PermissionError("Refresh token has already been used")
+
+    user = db.session.get(User, user_id)
+    if user is None or not user.is_active:
+        raise PermissionError("User account is disabled")
+
+    record.used_at = datetime.utcnow()
+    tokens = issue_tokens(user)
+    db.session.commit()
+    return tokens
+
+
+def revoke_refresh_token(jti: str):
+    """登出：作废当前刷新令牌(访问令牌在短有效期后自然失效)"""
+    RefreshToken.query.filter_by(jti=jti, used_at=None).update({"used_at": datetime.utcnow()})
+    db.session.commit()
@@ -0,0 +1,62 @@
+# backend/app/services/user_directory_service.py
+
+import hashlib
+import json
+from flask import current_app
+from sqlalchemy import func
+from .. import db
+from ..models.user import User, UserRole
+from ..schemas import user_schemas
+from ..utils.cache import TTLCache
+
+# --- 进程内用户目录缓存 ---
+# 用户数量少、改动少、读取多：整张表序列化一次后缓存。
+# 缓存键为数据库中的 (最大 updated_at, 用户数)：任一 worker 的新增、修改(updated_at 变大)、删除(用户数变小)
+# 都会改变键，各 worker 下次读取时即重建，每次读取只需一条走索引的聚合查询。
+# TTL 兜底不经 ORM 直接修改数据库的情况。
+_directory_cache = TTLCache(max_size=4)
+
+
+def _cache_ttl() -> int:
+    return current_app.config['USER_DIRECTORY_CACHE_TTL_SECONDS']
+
+def _etag(records: list[dict]) -> str:
+    """按内容生成 ETag，不同 worker 对相同数据给出相同的值"""
+    raw = json.dumps(records, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def _build_directory() -> dict:
+    """一次查询全部用户并序列化为 UserOut 格式的字典(不含密码哈希)"""
+    users = [
+        user_schemas.UserOut.model_validate(user).model_dump(mode='json')
+        for user in User.query.order_by(User.id)
+    ]
+    developers = [
+        record for record in users
+        if record['role'] == UserRole.DEVELOPER.value and record['is_active']
+    ]
+    return {
+        "users": users,
+        "users_etag": _etag(users),
+        "developers": developers,
+        "developers_etag": _etag(developers)
+    }
+
+def _directory_version() -> tuple:
+    return tuple(db.session.query(func.max(User.updated_at), func.count(User.id)).one())
+
+def _get_directory() -> dict:
+    return _directory_cache.get_or_compute(_directory_version(), _build_directory, _cache_ttl())
+
+def get_directory_stats() -> dict:
+    return _directory_cache.stats()
+
+def list_users() -> tuple[list[dict], str]:
+    """返回 (全部用户, ETag)，按ID排序"""
+    directory = _get_directory()
+    return directory['users'], directory['users_etag']
+
+def list_active_developers() -> tuple[list[dict], str]:
+    """返回 (已启用的技术人员, ETag)，按ID排序"""
+    directory = _get_directory()
+    return directory['developers'], directory['developers_etag']
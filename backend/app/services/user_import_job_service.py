@@ -0,0 +1,229 @@
+# backend/app/services/user_import_job_service.py
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from .. import db
+from . import user_service
+
+# 任务状态
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+_JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+# 本进程中尚未结束的任务, job_id -> Future
+_active_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _heartbeat_loop(job_dir: str, interval: float):
+    """
+    定期更新本进程中排队和执行中任务的状态文件修改时间作为心跳。
+    只修改 mtime 不改写内容，不会与任务线程写入的进度相互覆盖。
+    """
+    while True:
+        time.sleep(interval)
+        for job_id in list(_active_jobs):
+            try:
+                os.utime(os.path.join(job_dir, f"{job_id}.json"))
+            except FileNotFoundError:
+                pass
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config['USER_IMPORT_JOB_WORKERS'],
+                thread_name_prefix='user-import-job'
+            )
+            threading.Thread(
+                target=_heartbeat_loop,
+                args=(_job_dir(), current_app.config['USER_IMPORT_JOB_HEARTBEAT_SECONDS']),
+                name='user-import-job-heartbeat',
+                daemon=True
+            ).start()
+        return _executor
+
+
+def _job_dir() -> str:
+    job_dir = current_app.config['USER_IMPORT_JOB_DIR']
+    os.makedirs(job_dir, exist_ok=True)
+    return job_dir
+
+
+def _state_path(job_id: str) -> str:
+    return os.path.join(_job_dir(), f"{job_id}.json")
+
+
+def _read_state(job_id: str) -> dict | None:
+    try:
+        with open(_state_path(job_id), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_state(state: dict):
+    """原子地写入任务状态文件，其他 gunicorn worker 也能读到"""
+    path = _state_path(state['job_id'])
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def evict_expired_jobs():
+    """删除超过 TTL 的任务状态文件（本进程正在执行的任务除外）"""
+    expire_before = time.time() - current_app.config['USER_IMPORT_JOB_TTL_SECONDS']
+    job_dir = _job_dir()
+    for name in os.listdir(job_dir):
+        if name.split('.', 1)[0] in _active_jobs:
+            continue
+        path = os.path.join(job_dir, name)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def submit_import_job(upload_path: str, file_format: str, filename: str, created_by_id: int) -> dict:
+    """
+    提交批量导入用户的后台任务，立即返回任务状态。
+    upload_path 指向已落盘的上传文件，任务结束后由任务负责删除。
+    """
+    evict_expired_jobs()
+
+    state = {
+        "job_id": uuid.uuid4().hex,
+        "filename": filename,
+        "created_by_id": created_by_id,
+        "status": JOB_PENDING,
+        "total_rows": None,
+        "processed_rows": 0,
+        "rows_per_second": None,
+        "success_count": 0,
+        "failure_count": 0,
+        "errors": [],
+        "error": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "started_at": None,
+        "updated_at": None,
+        "finished_at": None,
+        "worker_pid": os.getpid()
+    }
+    _write_state(state)
+
+    app = current_app._get_current_object()
+    try:
+        with _jobs_lock:
+            _active_jobs[state['job_id']] = _get_executor().submit(
+                _run_import_job, app, state, upload_path, file_format
+            )
+    except Exception:
+        os.remove(upload_path)
+        raise
+    return state
+
+
+def _run_import_job(app, state: dict, upload_path: str, file_format: str):
+    """在后台线程中逐块导入用户，每处理完一块更新一次任务进度"""
+    job_id = state['job_id']
+    with app.app_context():
+        try:
+            state = dict(state, status=JOB_RUNNING, started_at=datetime.utcnow().isoformat())
+            _write_state(state)
+
+            # 第一次回调时的已处理行数为解析阶段即已失败的行，不计入处理速度
+            baseline = {}
+
+            def update_progress(done, total, success_count, failure_count):
+                now = time.monotonic()
+                baseline.setdefault('rows', done)
+                baseline.setdefault('at', now)
+                elapsed = now - baseline['at']
+                state.update(
+                    total_rows=total, processed_rows=done,
+                    success_count=success_count, failure_count=failure_count,
+                    rows_per_second=round((done - baseline['rows']) / elapsed, 2) if elapsed > 0 else None,
+                    updated_at=datetime.utcnow().isoformat()
+                )
+                _write_state(state)
+
+            result = user_service.batch_import_users(
+                upload_path, file_format, update_progress,
+                chunk_size=current_app.config['USER_IMPORT_JOB_BATCH_SIZE']
+            )
+            state.update(
+                status=JOB_DONE,
+                success_count=result['success_count'],
+                failure_count=result['failure_count'],
+                errors=result['errors'],
+                finished_at=datetime.utcnow().isoformat()
+            )
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception("User import job %s failed", job_id)
+            state.update(status=JOB_FAILED, error=str(e), finished_at=datetime.utcnow().isoformat())
+        finally:
+            _write_state(state)
+            with _jobs_lock:
+                _active_jobs.pop(job_id, None)
+            try:
+                os.remove(upload_path)
+            except FileNotFoundError:
+                pass
+
+
+def _is_alive(job_id: str, state: dict) -> bool:
+    """排队中或执行中的任务可能属于其他 worker：心跳未超时才视为仍在进行"""
+    if job_id in _active_jobs:
+        return True
+    if state.get('worker_pid') == os.getpid():
+        # 本进程的任务不在 _active_jobs 中，说明已经丢失
+        return False
+    try:
+        heartbeat_age = time.time() - os.path.getmtime(_state_path(job_id))
+    except FileNotFoundError:
+        return False
+    return heartbeat_age < current_app.config['USER_IMPORT_JOB_HEARTBEAT_SECONDS'] * 3
+
+
+def _eta_seconds(state: dict) -> float | None:
+    """根据最近一次进度更新时的处理速度估算剩余秒数"""
+    if state['status'] != JOB_RUNNING or not state['total_rows'] or not state['rows_per_second']:
+        return None
+    remaining_rows = state['total_rows'] - state['processed_rows']
+    since_update = (datetime.utcnow() - datetime.fromisoformat(state['updated_at'])).total_seconds()
+    return round(max(remaining_rows / state['rows_per_second'] - since_update, 0), 1)
+
+
+def get_job(job_id: str) -> dict | None:
+    """查询任务进度，任务不存在或已过期时返回 None"""
+    if not _JOB_ID_PATTERN.match(job_id):
+        return None
+    state = _read_state(job_id)
+    if state and state['status'] in (JOB_PENDING, JOB_RUNNING) and not _is_alive(job_id, state):
+        # 所属 worker 在导入中途退出(重启、崩溃)，任务不会再更新，标记为失败；已导入的用户保留
+        state.update(
+            status=JOB_FAILED,
+            error="The import was interrupted because its worker stopped. Users imported before the interruption were kept.",
+            finished_at=datetime.utcnow().isoformat()
+        )
+        _write_state(state)
+    if state:
+        state['eta_seconds'] = _eta_seconds(state)
+    return state
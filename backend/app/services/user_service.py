@@ -1,84 +1,276 @@
 # backend/app/services/user_service.py
 
+import os
+import csv
+import tempfile
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from flask import current_app
+from sqlalchemy import insert
 from .. import db
 from ..models.user import User, UserRole
 from ..schemas import user_schemas
+from . import token_service
 import openpyxl
-from io import BytesIO
 
-# +--- 新增的完整函数开始 ---+
-def batch_import_users(file_stream: BytesIO) -> dict:
+# 批量导入时每个 INSERT 语句/事务包含的用户数
+IMPORT_CHUNK_SIZE = 500
+# 待哈希的密码少于该数量时直接在当前线程计算，避免启动线程池的开销
+IMPORT_PARALLEL_HASH_THRESHOLD = 8
+# 支持的导入文件格式
+IMPORT_FILE_FORMATS = ('xlsx', 'csv')
+IMPORT_REQUIRED_HEADERS = ['username', 'password', 'full_name', 'role']
+
+def hash_password(password: str, rounds: int | None = None) -> str:
     """
-    从Excel文件流中批量导入用户。
-    Excel文件应包含表头: username, password, full_name, role, gender, 
-                        skills (多个用逗号分隔), default_commission_rate, financial_account
-    其中 username, password, full_name, role 是必需的。
-    
-    :param file_stream: 文件IO流
-    :return: 一个包含成功和失败信息的字典
+    使用 bcrypt 对密码进行哈希，cost 默认取 BCRYPT_LOG_ROUNDS 配置。
+    在没有应用上下文的线程池中调用时必须显式传入 rounds。
     """
-    try:
-        workbook = openpyxl.load_workbook(file_stream)
-        sheet = workbook.active
-    except Exception as e:
-        raise ValueError(f"无法读取或解析Excel文件: {e}")
+    if rounds is None:
+        rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
 
-    header = [cell.value for cell in sheet[1]]
-    required_headers = ['username', 'password', 'full_name', 'role']
-    if not all(h in header for h in required_headers):
-        raise ValueError(f"Excel文件表头必须至少包含: {', '.join(required_headers)}")
+def _hash_passwords(passwords: list[str], executor: ThreadPoolExecutor | None = None) -> list[str]:
+    """
+    批量哈希密码。bcrypt 是刻意设计的 CPU 密集运算，计算期间释放 GIL，传入线程池时即可多核并行。
+    不使用进程池：导入在 gthread worker 的后台线程中执行，多线程进程中 fork 子进程可能死锁。
+    """
+    rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+    if executor is None:
+        return [hash_password(p, rounds) for p in passwords]
+    workers = current_app.config.get('USER_IMPORT_HASH_WORKERS') or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(executor.map(partial(hash_password, rounds=rounds), passwords, chunksize=chunksize))
 
-    results = {"success_count": 0, "failure_count": 0, "errors": []}
-    
-    # 从第二行开始读取数据
-    for row_index in range(2, sheet.max_row + 1):
-        # 将行数据与表头打包成字典
-        row_data = dict(zip(header, [cell.value for cell in sheet[row_index]]))
+def _build_user_create(row_data: dict) -> user_schemas.UserCreate:
+    """将表格中的一行转换为 UserCreate，校验失败时抛出 ValueError/ValidationError"""
+    # 使用Pydantic Schema进行数据校验和转换
+    user_data_dict = {
+        "username": row_data.get('username'),
+        "password": str(row_data.get('password')) if row_data.get('password') else '123456', # 默认密码
+        "full_name": row_data.get('full_name'),
+        "role": UserRole(row_data.get('role')), # 会自动校验角色枚举值是否有效
+        "gender": row_data.get('gender'),
+        "skills": row_data.get('skills').split(',') if row_data.get('skills') and isinstance(row_data.get('skills'), str) else None,
+        "default_commission_rate": row_data.get('default_commission_rate'),
+        "financial_account": row_data.get('financial_account')
+    }
+    # 清理None值，以便Pydantic使用默认值
+    user_data_dict_cleaned = {k: v for k, v in user_data_dict.items() if v is not None}
+    return user_schemas.UserCreate(**user_data_dict_cleaned)
+
+def _existing_usernames(usernames: list[str]) -> set[str]:
+    """用 IN 查询一次性找出数据库中已存在的用户名"""
+    existing = set()
+    for start in range(0, len(usernames), IMPORT_CHUNK_SIZE):
+        chunk = usernames[start:start + IMPORT_CHUNK_SIZE]
+        existing.update(name for (name,) in db.session.query(User.username).filter(User.username.in_(chunk)))
+    return existing
+
+def _user_mapping(user_data: user_schemas.UserCreate, password_hash: str) -> dict:
+    return dict(
+        username=user_data.username,
+        full_name=user_data.full_name,
+        password_hash=password_hash,
+        role=user_data.role,
+        gender=user_data.gender,
+        skills=user_data.skills,
+        default_commission_rate=user_data.default_commission_rate,
+        financial_account=user_data.financial_account,
+        is_active=True
+    )
+
+def import_user_rows(rows, progress_callback=None, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    批量导入用户的处理流水线：
+    1. 逐行校验并转换数据；
+    2. 用一次 IN 查询检查用户名是否已存在（同时检查文件内重复）；
+    3. 分块在线程池中并行哈希密码，并批量插入，每块一个事务。
+       某块插入失败时逐行重试，以便给出每一行的错误信息。
+
+    :param rows: 可迭代的 (行号, 行数据字典)
+    :param progress_callback: 可选，每处理完一块后以 (已处理行数, 总行数, 成功数, 失败数) 调用
+    :param chunk_size: 每块插入的用户数
+    :return: 一个包含成功和失败信息的字典
+    """
+    errors = []  # (行号, 错误信息)
+    candidates = []  # (行号, UserCreate)
+
+    for row_index, row_data in rows:
         username = row_data.get('username')
 
         # 跳过没有用户名的行
         if not username:
-            results["failure_count"] += 1
-            results["errors"].append(f"第 {row_index} 行: 'username' 不能为空。")
+            errors.append((row_index, f"第 {row_index} 行: 'username' 不能为空。"))
             continue
 
         try:
-            # 使用Pydantic Schema进行数据校验和转换
-            user_data_dict = {
-                "username": username,
-                "password": str(row_data.get('password')) if row_data.get('password') else '123456', # 默认密码
-                "full_name": row_data.get('full_name'),
-                "role": UserRole(row_data.get('role')), # 会自动校验角色枚举值是否有效
-                "gender": row_data.get('gender'),
-                "skills": row_data.get('skills').split(',') if row_data.get('skills') and isinstance(row_data.get('skills'), str) else None,
-                "default_commission_rate": row_data.get('default_commission_rate'),
-                "financial_account": row_data.get('financial_account')
-            }
-            # 清理None值，以便Pydantic使用默认值
-            user_data_dict_cleaned = {k: v for k, v in user_data_dict.items() if v is not None}
-            
-            user_create_schema = user_schemas.UserCreate(**user_data_dict_cleaned)
-            
-            # 调用已有的创建用户服务，它内部包含了对用户名是否存在的检查
-            # 注意：这里我们为每个用户开启一个子事务，以处理单行错误而不影响整个批处理
-            try:
-                db.session.begin_nested()
-                create_user(user_create_schema)
-                db.session.commit() # 提交子事务
-                results["success_count"] += 1
-            except Exception as e_inner:
-                db.session.rollback() # 回滚子事务
-                raise e_inner # 重新抛出错误，由外层捕获
-
-        except ValueError as e: # 捕获用户名已存在等业务错误
-             results["failure_count"] += 1
-             results["errors"].append(f"第 {row_index} 行 (用户: {username}): {e}")
+            candidates.append((row_index, _build_user_create(row_data)))
+        except ValueError as e: # 捕获数据校验等业务错误
+            errors.append((row_index, f"第 {row_index} 行 (用户: {username}): {e}"))
         except Exception as e: # 捕获其他所有错误，如角色名称无效
-            results["failure_count"] += 1
-            results["errors"].append(f"第 {row_index} 行 (用户: {username}): 导入失败 - {e}")
-            
-    return results
+            errors.append((row_index, f"第 {row_index} 行 (用户: {username}): 导入失败 - {e}"))
+
+    # 用户名已存在于数据库或在文件中重复出现
+    existing = _existing_usernames([user_data.username for _, user_data in candidates])
+    to_create = []
+    for row_index, user_data in candidates:
+        if user_data.username in existing:
+            errors.append((row_index, f"第 {row_index} 行 (用户: {user_data.username}): Username already exists"))
+            continue
+        existing.add(user_data.username)
+        to_create.append((row_index, user_data))
+
+    total = len(to_create) + len(errors)
+    success_count = 0
+
+    def report_progress():
+        if progress_callback:
+            progress_callback(len(errors) + success_count, total, success_count, len(errors))
+
+    report_progress()
+
+    executor = None
+    if len(to_create) >= IMPORT_PARALLEL_HASH_THRESHOLD:
+        executor = ThreadPoolExecutor(
+            max_workers=current_app.config.get('USER_IMPORT_HASH_WORKERS') or os.cpu_count() or 1,
+            thread_name_prefix='password-hash'
+        )
+    try:
+        for start in range(0, len(to_create), chunk_size):
+            chunk = to_create[start:start + chunk_size]
+            password_hashes = _hash_passwords([user_data.password for _, user_data in chunk], executor)
+            mappings = [_user_mapping(user_data, password_hash)
+                        for (_, user_data), password_hash in zip(chunk, password_hashes)]
+            try:
+                db.session.execute(insert(User), mappings)
+                db.session.commit()
+                success_count += len(chunk)
+            except Exception:
+                db.session.rollback()
+                # 整块失败（如并发导入了同名用户），逐行重试以定位出错的行
+                for (row_index, user_data), mapping in zip(chunk, mappings):
+                    try:
+                        db.session.execute(insert(User), [mapping])
+                        db.session.commit()
+                        success_count += 1
+                    except Exception as e:
+                        db.session.rollback()
+                        errors.append((row_index, f"第 {row_index} 行 (用户: {user_data.username}): 导入失败 - {e}"))
+            report_progress()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    errors.sort(key=lambda item: item[0])
+    return {
+        "success_count": success_count,
+        "failure_count": len(errors),
+        "errors": [message for _, message in errors]
+    }
+
+def detect_import_format(filename: str) -> str:
+    """根据文件扩展名判断导入文件格式，不支持时抛出 ValueError"""
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if extension not in IMPORT_FILE_FORMATS:
+        raise ValueError("文件类型无效，请上传 .xlsx 或 .csv 文件")
+    return extension
+
+def spool_upload_to_disk(file_storage) -> str:
+    """
+    将上传的文件分块写入磁盘临时文件并返回路径，调用方负责删除。
+    文件大小超过 USER_IMPORT_MAX_FILE_SIZE 时删除临时文件并抛出 ValueError。
+    """
+    file_format = detect_import_format(file_storage.filename)
+    max_size = current_app.config['USER_IMPORT_MAX_FILE_SIZE']
+    fd, path = tempfile.mkstemp(prefix='user-import-', suffix=f".{file_format}")
+    try:
+        size = 0
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = file_storage.stream.read(64 * 1024)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"文件过大，最大允许 {max_size // (1024 * 1024)} MB")
+                f.write(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+def _normalize_cell(value):
+    """CSV 中的空字符串与 Excel 中的空单元格一样视为 None"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+def _iter_sheet_values(path: str, file_format: str):
+    """以流式方式逐行产出表格中每一行的值(含表头)"""
+    if file_format == 'csv':
+        # utf-8-sig 兼容 Excel 另存为 CSV 时写入的 BOM
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.reader(f)
+        return
+
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"无法读取或解析Excel文件: {e}")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        # read_only 模式下工作簿持有文件句柄，需要显式关闭
+        workbook.close()
+
+def iter_import_rows(path: str, file_format: str):
+    """
+    流式解析导入文件，逐行产出 (行号, 行数据字典)，内存占用与文件大小无关。
+    表头缺少必需列或数据行超过 USER_IMPORT_MAX_ROWS 时抛出 ValueError。
+    """
+    max_rows = current_app.config['USER_IMPORT_MAX_ROWS']
+    values = _iter_sheet_values(path, file_format)
+    try:
+        header = [_normalize_cell(h) for h in next(values)]
+    except StopIteration:
+        raise ValueError("文件为空")
+    except UnicodeDecodeError:
+        raise ValueError("CSV 文件必须使用 UTF-8 编码")
+    if not all(h in header for h in IMPORT_REQUIRED_HEADERS):
+        raise ValueError(f"文件表头必须至少包含: {', '.join(IMPORT_REQUIRED_HEADERS)}")
+
+    # 从第二行开始读取数据，将行数据与表头打包成字典
+    try:
+        for row_index, row_values in enumerate(values, start=2):
+            row_values = [_normalize_cell(v) for v in row_values]
+            # 跳过完全空白的行（read_only 模式下表格末尾常带有空行）
+            if not any(v is not None for v in row_values):
+                continue
+            if row_index - 1 > max_rows:
+                raise ValueError(f"数据行数超过上限 {max_rows} 行")
+            yield row_index, dict(zip(header, row_values))
+    except UnicodeDecodeError:
+        raise ValueError("CSV 文件必须使用 UTF-8 编码")
+
+# +--- 新增的完整函数开始 ---+
+def batch_import_users(path: str, file_format: str, progress_callback=None,
+                       chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    从磁盘上的 Excel(.xlsx) 或 CSV 文件中批量导入用户。
+    文件应包含表头: username, password, full_name, role, gender, 
+                    skills (多个用逗号分隔), default_commission_rate, financial_account
+    其中 username, password, full_name, role 是必需的。
+    
+    :param path: 已落盘的上传文件路径
+    :param file_format: 'xlsx' 或 'csv'
+    :param progress_callback: 可选的进度回调，见 import_user_rows
+    :param chunk_size: 每块插入的用户数
+    :return: 一个包含成功和失败信息的字典
+    """
+    return import_user_rows(iter_import_rows(path, file_format), progress_callback, chunk_size)
 
 def get_user_by_username(username: str) -> User | None:
     return User.query.filter_by(username=username).first()
@@ -98,12 +290,10 @@ def create_user(user_data: user_schemas.UserCreate) -> User:
     if get_user_by_username(user_data.username):
         raise ValueError("Username already exists")
 
-    hashed_password = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt())
-    
     new_user = User(
         username=user_data.username,
         full_name=user_data.full_name,
-        password_hash=hashed_password.decode('utf-8'),
+        password_hash=hash_password(user_data.password),
         role=user_data.role,
         gender=user_data.gender,
         skills=user_data.skills,
@@ -126,14 +316,22 @@ def update_user(user_id: int, update_data: user_schemas.UserUpdate) -> User:
         if get_user_by_username(update_dict['username']):
             raise ValueError("Username already exists")
 
+    # 角色变更、禁用、重置密码后，该用户已签发的令牌立即失效
+    revoke_tokens = (
+        ('role' in update_dict and update_dict['role'] != user.role)
+        or update_dict.get('is_active') is False
+        or bool(update_dict.get('password'))
+    )
+
     for key, value in update_dict.items():
         if key == 'password':
             if value: # 确保密码非空
-                hashed_password = bcrypt.hashpw(value.encode('utf-8'), bcrypt.gensalt())
-                setattr(user, 'password_hash', hashed_password.decode('utf-8'))
+                setattr(user, 'password_hash', hash_password(value))
         else:
             setattr(user, key, value)
-            
+
+    if revoke_tokens:
+        token_service.revoke_user_tokens(user.id)
     db.session.commit()
     return user
 
@@ -144,6 +342,8 @@ def toggle_user_status(user_id: int) -> User:
         raise ValueError("User not found")
     
     user.is_active = not user.is_active
+    if not user.is_active:
+        token_service.revoke_user_tokens(user.id)
     db.session.commit()
     return user
 
@@ -154,4 +354,5 @@ def delete_user(user_id: int):
         raise ValueError("User not found")
 
     db.session.delete(user)
-    db.session.commit()
\ No newline at end of file
+    token_service.revoke_user_tokens(user.id)
+    db.session.commit()
@@ -0,0 +1,77 @@
+# backend/app/utils/cache.py
+
+import threading
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    进程内的简单 TTL 缓存，线程安全，并记录命中/未命中次数。
+    注意：每个 gunicorn worker 各有一份缓存，跨进程的数据新鲜度由 TTL 保证。
+    指定 max_size 时，写入前先清理已过期的项，仍然已满则淘汰最早过期的项。
+    """
+
+    def __init__(self, max_size: int | None = None):
+        self._data = {}  # key -> (过期时间戳, 值)
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self._data.pop(key, None)
+            self.misses += 1
+            return default
+
+    def _evict(self, now: float):
+        """调用者需持有锁"""
+        for stale_key in [k for k, entry in self._data.items() if entry[0] <= now]:
+            del self._data[stale_key]
+        while len(self._data) >= self.max_size:
+            del self._data[min(self._data, key=lambda k: self._data[k][0])]
+
+    def set(self, key, value, ttl_seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            if self.max_size is not None and key not in self._data and len(self._data) >= self.max_size:
+                self._evict(now)
+            self._data[key] = (now + ttl_seconds, value)
+
+    def get_or_compute(self, key, compute, ttl_seconds: float):
+        """命中则返回缓存值，否则调用 compute() 计算并写入缓存"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            if ttl_seconds > 0:
+                self.set(key, value, ttl_seconds)
+        return value
+
+    def update(self, key, fn) -> bool:
+        """
+        原地更新未过期的缓存项: 新值 = fn(旧值)，过期时间不变。
+        缓存项不存在时返回 False。
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return False
+            self._data[key] = (entry[0], fn(entry[1]))
+            return True
+
+    def invalidate(self, key=None):
+        """删除指定缓存项；不传 key 时清空全部"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
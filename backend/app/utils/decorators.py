@@ -1,6 +1,6 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from .identity import current_identity
 from typing import Union, List  # 导入 Union 和 List 用于类型提示
 
 def role_required(required_roles: Union[str, List[str]]):
@@ -14,15 +14,14 @@ def role_required(required_roles: Union[str, List[str]]):
         @wraps(fn)
         def wrapper(*args, **kwargs):
             # 首先，验证JWT是否存在且有效
+            # 已经过 @jwt_required() 验证时直接复用本次请求的解码结果，不再重复解码
             try:
-                verify_jwt_in_request()
+                identity = current_identity()
             except Exception as e:
                 return jsonify({"msg": f"JWT verification failed: {str(e)}"}), 401
 
-            # 获取JWT中的声明
-            claims = get_jwt()
             # 从 additional_claims 中获取角色
-            user_role = claims.get("role", None)
+            user_role = identity.role
 
             # 如果Token中没有角色信息，则拒绝访问
             if user_role is None:
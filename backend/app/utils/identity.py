@@ -0,0 +1,48 @@
+# backend/app/utils/identity.py
+
+from flask import g
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from .. import db
+from ..models.user import User
+
+_IDENTITY_KEY = '_request_identity'
+
+
+class RequestIdentity:
+    """当前请求的身份信息：JWT 声明只解码一次，用户对象在第一次访问 user 时才查询数据库"""
+
+    __slots__ = ('claims', 'user_id', 'role', '_user', '_user_loaded')
+
+    def __init__(self, claims: dict):
+        self.claims = claims
+        self.user_id = int(claims['sub']) if 'sub' in claims else None
+        self.role = claims.get('role')
+        self._user = None
+        self._user_loaded = False
+
+    @property
+    def user(self) -> User | None:
+        """当前用户对象，同一请求内只查询一次(用户不存在时为 None)"""
+        if not self._user_loaded:
+            self._user = db.session.get(User, self.user_id) if self.user_id is not None else None
+            self._user_loaded = True
+        return self._user
+
+
+def current_identity() -> RequestIdentity:
+    """
+    返回当前请求的身份信息，同一请求内的后续调用直接返回缓存。
+    JWT 已由 @jwt_required() 验证时复用其解码结果，否则在这里验证一次(失败时抛出 flask_jwt_extended 的异常)。
+    """
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        verify_jwt_in_request()
+        claims = get_jwt()
+
+    # 缓存与本次解码结果绑定：应用上下文被多个请求复用(测试、流式响应)时不会读到上一个请求的身份
+    identity = g.get(_IDENTITY_KEY)
+    if identity is None or identity.claims is not claims:
+        identity = RequestIdentity(claims)
+        setattr(g, _IDENTITY_KEY, identity)
+    return identity
@@ -0,0 +1,30 @@
+# backend/app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+# --- 按 (created_at, id) 倒序的键集分页游标 ---
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """将 (created_at, id) 编码为不透明的分页游标"""
+    raw = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """解析分页游标，返回 (created_at, id)，格式不正确时抛出 ValueError"""
+    try:
+        created_at_str, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at_str), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+def after_cursor(created_at_column, id_column, cursor: str):
+    """过滤条件：只取严格排在游标所指记录之后的行(按 created_at, id 倒序)"""
+    cursor_created_at, cursor_id = decode_cursor(cursor)
+    return or_(
+        created_at_column < cursor_created_at,
+        and_(created_at_column == cursor_created_at, id_column < cursor_id)
+    )
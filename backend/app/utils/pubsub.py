@@ -0,0 +1,92 @@
+# backend/app/utils/pubsub.py
+
+import queue
+import threading
+
+
+class Subscription:
+    """
+    一个订阅者的事件队列。
+    队列满时不能只丢弃新事件：之后送达的事件会让客户端的 Last-Event-ID 越过缺口，丢失的事件再也不会补发。
+    因此溢出时结束订阅(overflowed)，由消费者断开连接，客户端重连后按 Last-Event-ID 补齐。
+    """
+
+    def __init__(self, broker: 'PubSubBroker', channel, max_size: int):
+        self.broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=max_size)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+            self.broker.unsubscribe(self)
+            self.broker.record_overflow()
+
+    def get(self, timeout: float):
+        """等待下一个事件，超时返回 None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class PubSubBroker:
+    """
+    进程内的发布/订阅分发器，线程安全。
+    注意：每个 gunicorn worker 各有一份，只能分发本进程内发布的事件。
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self._channels = {}  # channel -> set[Subscription]
+        self._lock = threading.Lock()
+        self.max_queue_size = max_queue_size
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, channel) -> Subscription:
+        subscription = Subscription(self, channel, self.max_queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def record_overflow(self):
+        with self._lock:
+            self.overflows += 1
+
+    def has_subscribers(self, channel) -> bool:
+        with self._lock:
+            return channel in self._channels
+
+    def publish(self, channel, event) -> int:
+        """向频道的所有订阅者发送事件，返回收到事件的订阅者数量"""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+            self.published += 1
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(s) for s in self._channels.values()),
+                "published": self.published,
+                "overflows": self.overflows
+            }
@@ -0,0 +1,56 @@
+# backend/app/utils/rate_limit.py
+
+import threading
+import time
+from collections import deque
+
+
+class AttemptLimiter:
+    """
+    按键统计滑动窗口内的失败次数(如按用户名、按IP)，线程安全。
+    注意：每个 gunicorn worker 各有一份计数，实际上限最多为配置值乘以 worker 数。
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self._attempts = {}  # key -> deque[失败时间戳]
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+        self.blocked = 0
+
+    def _prune(self, key, now: float, window_seconds: float):
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - window_seconds:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    def retry_after(self, key, limit: int, window_seconds: float) -> float:
+        """窗口内失败次数已达到 limit 时返回需要等待的秒数，否则返回 0"""
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._prune(key, now, window_seconds)
+            if attempts is None or len(attempts) < limit:
+                return 0
+            self.blocked += 1
+            return attempts[-limit] + window_seconds - now
+
+    def record_failure(self, key, window_seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._attempts and len(self._attempts) >= self.max_keys:
+                # 键过多时清理所有已过期的键，防止被大量随机用户名撑满内存
+                for stale_key in list(self._attempts):
+                    self._prune(stale_key, now, window_seconds)
+            self._attempts.setdefault(key, deque()).append(now)
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._attempts), "blocked": self.blocked}
@@ -0,0 +1,24 @@
+# backend/app/utils/upsert.py
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from .. import db
+
+
+# --- 先确保行存在，再 SELECT ... FOR UPDATE ---
+# 对不存在的行加锁读会在 InnoDB 上加间隙锁，两个事务同时为同一个键创建行时会互相等待而死锁(1213)，
+# 或者在插入时违反唯一约束。先用不报错的插入确保行存在，再对已存在的行加锁。
+
+def insert_if_missing(model, **values):
+    """
+    插入一行，唯一键已存在时什么也不做，由调用者提交。
+    MySQL 使用 ON DUPLICATE KEY UPDATE(把第一列更新为原值)，SQLite 使用 INSERT OR IGNORE。
+    """
+    table = model.__table__
+    if db.session.get_bind().dialect.name == 'mysql':
+        stmt = mysql_insert(table).values(**values)
+        column = next(iter(values))
+        stmt = stmt.on_duplicate_key_update({column: table.c[column]})
+    else:
+        stmt = insert(table).values(**values).prefix_with('OR IGNORE')
+    db.session.execute(stmt)
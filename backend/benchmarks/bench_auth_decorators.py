@@ -0,0 +1,97 @@
+# backend/benchmarks/bench_auth_decorators.py
+"""
+鉴权装饰器开销基准测试：对比每个请求在鉴权上花费的时间与SQL语句数量。
+  before: @jwt_required() + 旧版 role_required(再次调用 verify_jwt_in_request 解码JWT)，
+          视图再调用 get_jwt()/get_jwt_identity() 并按ID查询当前用户
+  after:  @jwt_required() + role_required 复用请求级身份上下文，当前用户在首次访问时查询
+
+运行方式 (在 backend 目录下):
+    python -m benchmarks.bench_auth_decorators [每个场景的请求次数, 默认20000]
+"""
+
+import sys
+import time
+from functools import wraps
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, jwt_required, verify_jwt_in_request
+
+from benchmarks.bench_app import create_bench_app, count_queries
+from app import db
+from app.models.user import User, UserRole
+from app.utils.decorators import role_required
+from app.utils.identity import current_identity
+
+
+def legacy_role_required(required_roles):
+    """改造前的 role_required，仅用于对比"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                verify_jwt_in_request()
+            except Exception as e:
+                return jsonify({"msg": f"JWT verification failed: {str(e)}"}), 401
+            user_role = get_jwt().get("role", None)
+            if user_role is None:
+                return jsonify({"msg": "Forbidden: Role information missing in token"}), 403
+            roles = [required_roles] if isinstance(required_roles, str) else required_roles
+            if user_role not in roles:
+                return jsonify({"msg": "Forbidden: Insufficient permissions"}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@jwt_required()
+@legacy_role_required([UserRole.CUSTOMER_SERVICE.value, UserRole.SUPER_ADMIN.value])
+def before_view():
+    user_id = int(get_jwt_identity())
+    user_role = get_jwt().get("role")
+    user = db.session.get(User, user_id)
+    return user_role, user.full_name
+
+
+@jwt_required()
+@role_required([UserRole.CUSTOMER_SERVICE.value, UserRole.SUPER_ADMIN.value])
+def after_view():
+    identity = current_identity()
+    return identity.role, identity.user.full_name
+
+
+def measure(app, view, token: str, requests: int) -> tuple[float, float]:
+    """返回 (每个请求的平均微秒数, 每个请求的平均SQL语句数)"""
+    headers = {'Authorization': f'Bearer {token}'}
+    with count_queries() as counter:
+        start = time.perf_counter()
+        for _ in range(requests):
+            # 与真实请求一样每次推入新的应用上下文：g 和数据库会话都不跨请求保留
+            with app.app_context(), app.test_request_context('/bench', headers=headers):
+                view()
+        elapsed = time.perf_counter() - start
+    return elapsed / requests * 1_000_000, counter.count / requests
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = create_bench_app()
+
+    user = User(username='bench-cs', full_name='基准客服', password_hash='-', role=UserRole.CUSTOMER_SERVICE)
+    db.session.add(user)
+    db.session.commit()
+    with app.test_request_context():
+        token = create_access_token(identity=str(user.id), additional_claims={"role": user.role.value})
+
+    # 预热
+    measure(app, before_view, token, 200)
+    measure(app, after_view, token, 200)
+
+    before_us, before_queries = measure(app, before_view, token, requests)
+    after_us, after_queries = measure(app, after_view, token, requests)
+    print(f"before: {before_us:.1f} us/request, {before_queries:.1f} queries/request")
+    print(f"after:  {after_us:.1f} us/request, {after_queries:.1f} queries/request")
+    print(f"saved:  {before_us - after_us:.1f} us/request ({(1 - after_us / before_us) * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# backend/benchmarks/bench_login.py
+"""
+登录压测：测量每核每秒可完成的登录次数，以及过载时被快速拒绝(503)的比例。
+
+运行方式 (在 backend 目录下):
+    python -m benchmarks.bench_login [--processes N] [--threads 8] [--duration 10] [--rounds 12]
+        在本机启动 N 个进程(默认等于 CPU 核数，模拟 gunicorn worker)，每个进程内 threads 个线程并发登录，
+        数据库为临时 SQLite 文件
+    python -m benchmarks.bench_login --url http://localhost:5000 --username u --password p [--threads 32]
+        对已部署的服务压测(注意目标服务的登录失败次数限制)
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.test import Client
+
+BENCH_USERNAME = 'bench-login'
+BENCH_PASSWORD = 'bench-password'
+
+
+def _run_threads(login_once, threads: int, duration: float) -> Counter:
+    """threads 个线程在 duration 秒内不断调用 login_once()，按返回的状态码计数"""
+    counts = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def loop():
+        local = Counter()
+        while time.perf_counter() < deadline:
+            status = login_once()
+            local[status] += 1
+            if status in (429, 503):
+                # 与真实客户端一样被拒绝后稍等再重试，避免压测线程空转抢占CPU
+                time.sleep(0.1)
+        with lock:
+            counts.update(local)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in range(threads):
+            executor.submit(loop)
+    return counts
+
+
+def _create_app(db_path: str, rounds: int, verify_concurrency: int):
+    from benchmarks.bench_app import BenchConfig
+    from app import create_app
+
+    class LoginBenchConfig(BenchConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 60, 'check_same_thread': False}}
+        BCRYPT_LOG_ROUNDS = rounds
+        LOGIN_VERIFY_CONCURRENCY = verify_concurrency
+        # 压测账号反复登录成功，不会触发失败次数限制
+        LOGIN_MAX_ATTEMPTS_PER_IP = 10 ** 9
+
+    return create_app(LoginBenchConfig)
+
+
+def _seed(db_path: str, rounds: int):
+    from app import db
+    from app.models.user import User, UserRole
+    from app.services.user_service import hash_password
+
+    app = _create_app(db_path, rounds, 1)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username=BENCH_USERNAME, full_name='压测', role=UserRole.DEVELOPER,
+                            password_hash=hash_password(BENCH_PASSWORD, rounds)))
+        db.session.commit()
+
+
+def _worker_process(db_path: str, rounds: int, verify_concurrency: int, threads: int, duration: float) -> Counter:
+    app = _create_app(db_path, rounds, verify_concurrency)
+    client = Client(app)
+    body = {'username': BENCH_USERNAME, 'password': BENCH_PASSWORD}
+    return _run_threads(lambda: client.post('/api/auth/login', json=body).status_code, threads, duration)
+
+
+def run_local(args) -> tuple[Counter, int]:
+    tmp_dir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(tmp_dir.name, 'login.db')
+    _seed(db_path, args.rounds)
+    verify_concurrency = args.verify_concurrency or max(1, (os.cpu_count() or 1) // args.processes)
+
+    counts = Counter()
+    with ProcessPoolExecutor(max_workers=args.processes) as executor:
+        futures = [
+            executor.submit(_worker_process, db_path, args.rounds, verify_concurrency, args.threads, args.duration)
+            for _ in range(args.processes)
+        ]
+        for future in futures:
+            counts.update(future.result())
+    tmp_dir.cleanup()
+    return counts, min(args.processes * verify_concurrency, os.cpu_count() or 1)
+
+
+def run_remote(args) -> tuple[Counter, int]:
+    body = json.dumps({'username': args.username, 'password': args.password}).encode('utf-8')
+    url = args.url.rstrip('/') + '/api/auth/login'
+
+    def login_once():
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except OSError:
+            return 'error'
+
+    return _run_threads(login_once, args.threads, args.duration), args.server_cores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=8, help='每个进程内并发登录的线程数')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost')
+    parser.add_argument('--verify-concurrency', type=int, default=0, help='每个进程同时进行的密码校验数，默认按核数平分')
+    parser.add_argument('--url')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--server-cores', type=int, default=1, help='--url 模式下目标服务的CPU核数')
+    args = parser.parse_args()
+
+    counts, cores = run_remote(args) if args.url else run_local(args)
+    succeeded = counts.get(200, 0)
+    print(f"status codes: {dict(counts)}")
+    print(f"{succeeded / args.duration:.1f} logins/s, {succeeded / args.duration / cores:.1f} logins/s per core "
+          f"({cores} cores), rejected early (503): {counts.get(503, 0) / max(sum(counts.values()), 1) * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
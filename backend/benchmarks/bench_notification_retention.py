@@ -0,0 +1,103 @@
+# backend/benchmarks/bench_notification_retention.py
+"""
+通知归档基准测试：对比归档前后收件箱查询(第一页 + 未读数)的耗时。
+
+运行方式 (在 backend 目录下):
+    python -m benchmarks.bench_notification_retention [通知数量, 默认200000]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.bench_app import create_bench_app, count_queries
+from app import db
+from app.models.user import User, UserRole
+from app.models.notification import Notification, NotificationArchive
+from app.schemas.notification_schemas import NotificationListQuery
+from app.services import notification_service, notification_archive_service
+
+USER_COUNT = 20
+RETENTION_DAYS = 90
+# 每个场景重复执行的次数，取平均值
+REPEAT = 200
+
+
+def seed(notification_count: int):
+    """按时间均匀分布在过去两年内，最近 30 天以外的通知都已读"""
+    users = [
+        User(username=f'user{i}', full_name=f'用户{i}', password_hash='-', role=UserRole.DEVELOPER)
+        for i in range(USER_COUNT)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    user_ids = [u.id for u in users]
+
+    now = datetime.utcnow()
+    step = timedelta(days=730) / notification_count
+    rows = []
+    for i in range(notification_count):
+        created_at = now - step * (notification_count - i)
+        rows.append(dict(
+            recipient_id=user_ids[i % USER_COUNT],
+            content=f'订单 [PROJ-BENCH-{i:06d}] 状态已更新',
+            is_read=created_at < now - timedelta(days=30),
+            created_at=created_at
+        ))
+        if len(rows) == 10000:
+            db.session.bulk_insert_mappings(Notification, rows)
+            rows = []
+    db.session.bulk_insert_mappings(Notification, rows)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return user_ids
+
+
+def measure_inbox(user_ids) -> float:
+    """返回单次收件箱请求(第一页 + 翻一页 + 未读数)的平均毫秒数"""
+    params = NotificationListQuery(limit=20)
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        user_id = user_ids[i % len(user_ids)]
+        _, next_cursor = notification_service.get_notifications_for_user(user_id, params)
+        notification_service.get_notifications_for_user(
+            user_id, NotificationListQuery(limit=20, cursor=next_cursor)
+        )
+        notification_service.get_unread_count(user_id)
+        db.session.rollback()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def measure_full_history(user_ids) -> float:
+    """返回读取单个用户全部通知(分页之前接口的做法)的平均毫秒数，随表中行数线性增长"""
+    start = time.perf_counter()
+    for user_id in user_ids:
+        Notification.query.filter_by(recipient_id=user_id).order_by(Notification.created_at.desc()).all()
+        db.session.rollback()
+    return (time.perf_counter() - start) / len(user_ids) * 1000
+
+
+def main():
+    notification_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    create_bench_app()
+    user_ids = seed(notification_count)
+
+    before = measure_inbox(user_ids)
+    before_full = measure_full_history(user_ids)
+    print(f"Before archiving: {Notification.query.count()} rows in notifications, "
+          f"inbox {before:.2f} ms, full history {before_full:.2f} ms")
+
+    with count_queries() as counter:
+        result = notification_archive_service.archive_read_notifications(RETENTION_DAYS)
+    print(f"Archived {result['archived']} rows in {result['batches']} batches, "
+          f"{counter.count} queries, {counter.elapsed:.2f} s")
+    db.session.execute(db.text('ANALYZE'))
+
+    after = measure_inbox(user_ids)
+    after_full = measure_full_history(user_ids)
+    print(f"After archiving:  {Notification.query.count()} rows in notifications "
+          f"({NotificationArchive.query.count()} archived), inbox {after:.2f} ms, full history {after_full:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# backend/benchmarks/bench_settled_report.py
+"""
+已结算订单报表基准测试：对比逐条懒加载的 ORM 循环与单条扁平查询。
+
+运行方式 (在 backend 目录下):
+    python -m benchmarks.bench_settled_report [订单数量, 默认10000]
+"""
+
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.bench_app import create_bench_app, count_queries
+from app import db
+from app.models.user import User, UserRole
+from app.models.order import Order, OrderStatus
+from app.models.commission import Commission
+from app.services import report_service
+
+START = datetime(2025, 1, 1)
+
+
+def seed(order_count: int):
+    users = [
+        User(username=f'cs{i}', full_name=f'客服{i}', password_hash='-', role=UserRole.CUSTOMER_SERVICE)
+        for i in range(20)
+    ] + [
+        User(username=f'dev{i}', full_name=f'技术{i}', password_hash='-', role=UserRole.DEVELOPER)
+        for i in range(50)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    cs_ids = [u.id for u in users if u.role == UserRole.CUSTOMER_SERVICE]
+    dev_ids = [u.id for u in users if u.role == UserRole.DEVELOPER]
+
+    db.session.bulk_insert_mappings(Order, [
+        dict(
+            id=i + 1,
+            order_uid=f'PROJ-BENCH-{i:06d}',
+            customer_info={'name': f'客户{i}'},
+            requirements_desc='-',
+            final_price=Decimal('1000.00') + i,
+            status=OrderStatus.SETTLED,
+            creator_id=cs_ids[i % len(cs_ids)],
+            developer_id=dev_ids[i % len(dev_ids)],
+            is_locked=True,
+            created_at=START + timedelta(minutes=i),
+            updated_at=START + timedelta(minutes=i),
+            settled_at=START + timedelta(minutes=i),
+        )
+        for i in range(order_count)
+    ])
+    db.session.bulk_insert_mappings(Commission, [
+        dict(order_id=i + 1, user_id=cs_ids[i % len(cs_ids)], amount=Decimal('100.00'),
+             role_at_time=UserRole.CUSTOMER_SERVICE.value)
+        for i in range(order_count)
+    ] + [
+        dict(order_id=i + 1, user_id=dev_ids[i % len(dev_ids)], amount=Decimal('150.00'),
+             role_at_time=UserRole.DEVELOPER.value)
+        for i in range(order_count)
+    ])
+    db.session.commit()
+
+
+def legacy_rows(start_date, end_date):
+    """旧实现：加载 Order 对象后逐条访问 commissions/creator/developer"""
+    orders = db.session.query(Order).filter(
+        Order.status == OrderStatus.SETTLED,
+        Order.settled_at.between(start_date, end_date)
+    ).order_by(Order.settled_at.desc()).all()
+    rows = []
+    for order in orders:
+        commissions = {comm.role_at_time: comm.amount for comm in order.commissions}
+        rows.append([
+            order.order_uid,
+            order.settled_at.strftime('%Y-%m-%d %H:%M:%S'),
+            order.customer_info.get('name', 'N/A'),
+            order.final_price,
+            order.creator.full_name if order.creator else 'N/A',
+            commissions.get(UserRole.CUSTOMER_SERVICE.value, 0),
+            order.developer.full_name if order.developer else 'N/A',
+            commissions.get(UserRole.DEVELOPER.value, 0),
+        ])
+    return rows
+
+
+def main():
+    order_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    create_bench_app()
+    seed(order_count)
+    start_date, end_date = START, START + timedelta(days=3650)
+
+    db.session.expunge_all()
+    with count_queries() as legacy:
+        before = legacy_rows(start_date, end_date)
+
+    db.session.expunge_all()
+    with count_queries() as flat:
+        after = list(report_service._iter_report_rows(start_date, end_date))
+
+    assert before == after, "两种实现产出的报表行不一致"
+
+    print(f"settled orders: {order_count}")
+    print(f"{'implementation':<20}{'queries':>10}{'seconds':>12}")
+    print(f"{'lazy ORM loop':<20}{legacy.count:>10}{legacy.elapsed:>12.3f}")
+    print(f"{'flat report query':<20}{flat.count:>10}{flat.elapsed:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# backend/benchmarks/check_order_uid_concurrency.py
+"""
+订单业务ID并发检查：多线程同时调用 order_service.create_order，
+确认生成的 order_uid 没有重复、没有失败，且按创建顺序严格递增。
+
+运行方式 (在 backend 目录下):
+    python -m benchmarks.check_order_uid_concurrency [--threads 16] [--orders 2000]
+    python -m benchmarks.check_order_uid_concurrency --mysql   # 使用 .env 中配置的 MySQL，结束后删除测试订单
+SQLite 不支持 SELECT ... FOR UPDATE，这里用 BEGIN IMMEDIATE 让写事务串行化来模拟行锁，
+真正的锁竞争请用 --mysql 验证。任一检查失败时以非零状态码退出。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from benchmarks.bench_app import BenchConfig
+from app import create_app, db
+from app.models.user import User, UserRole
+from app.models.order import Order, OrderStatusEvent
+from app.schemas.order_schemas import OrderCreate
+from app.services import order_service
+
+
+def create_sqlite_app(path: str):
+    class FileConfig(BenchConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 60, 'check_same_thread': False}}
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        engine = db.engine
+
+        @event.listens_for(engine, 'connect')
+        def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def _begin_immediate(connection):
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+        db.create_all()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--mysql', action='store_true')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.mysql:
+        app = create_app()
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        app = create_sqlite_app(os.path.join(tmp_dir.name, 'orders.db'))
+
+    with app.app_context():
+        creator = User(username=f'uid-check-{os.getpid()}', full_name='并发检查', password_hash='-',
+                       role=UserRole.CUSTOMER_SERVICE, is_active=False)
+        db.session.add(creator)
+        db.session.commit()
+        creator_id = creator.id
+
+    order_data = OrderCreate(customer_info={'name': '并发检查'}, requirements_desc='-')
+
+    def create_one(_):
+        with app.app_context():
+            order = order_service.create_order(order_data, creator_id)
+            return order.id, order.order_uid
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        futures = [executor.submit(create_one, i) for i in range(args.orders)]
+    results, errors = [], []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            errors.append(repr(e))
+    elapsed = time.perf_counter() - start
+
+    results.sort()
+    uids = [uid for _, uid in results]
+    # 同一天内序号等宽时字符串顺序即数值顺序；跨天时日期部分同样递增
+    suffix = lambda uid: (uid.rsplit('-', 1)[0], int(uid.rsplit('-', 1)[1]))
+    monotonic = all(suffix(a) < suffix(b) for a, b in zip(uids, uids[1:]))
+    duplicates = len(uids) - len(set(uids))
+
+    print(f"{len(results)} orders created by {args.threads} threads in {elapsed:.2f} s "
+          f"({len(results) / elapsed:.0f} orders/s)")
+    print(f"errors: {len(errors)}, duplicate uids: {duplicates}, monotonic by id: {monotonic}")
+    if uids:
+        print(f"first: {uids[0]}, last: {uids[-1]}")
+    for error in errors[:5]:
+        print(f"   {error}")
+
+    if args.mysql:
+        with app.app_context():
+            order_ids = [order_id for order_id, _ in results]
+            for start_index in range(0, len(order_ids), 500):
+                chunk = order_ids[start_index:start_index + 500]
+                OrderStatusEvent.query.filter(OrderStatusEvent.order_id.in_(chunk)).delete(synchronize_session=False)
+                Order.query.filter(Order.id.in_(chunk)).delete(synchronize_session=False)
+            User.query.filter_by(id=creator_id).delete()
+            db.session.commit()
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+    sys.exit(0 if not errors and not duplicates and monotonic else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 from datetime import timedelta # <-- 1. 导入 timedelta
@@ -11,7 +12,11 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
 
 # 2. 新增下面这行，将 Access Token 的有效期设置为 1 小时
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=720)
+    # Access Token 改为短期有效(默认 15 分钟)，过期后前端用 Refresh Token 换发新令牌
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+    # 刷新令牌被使用后的这段时间(秒)内再次出现只拒绝、不吊销全部令牌：同一浏览器的多个标签页可能几乎同时刷新
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(os.environ.get('REFRESH_TOKEN_REUSE_GRACE_SECONDS', 30))
 
     # SQLAlchemy 配置
     MYSQL_HOST = os.environ.get('MYSQL_HOST')
@@ -21,3 +26,73 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{quote_plus(MYSQL_PASSWORD)}@{MYSQL_HOST}/{MYSQL_DB}"
     # SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # 连接池配置(每个 gunicorn worker 各有一个连接池)：
+    # 常驻连接数按 worker 的线程数加后台任务线程数估算，峰值时最多再临时创建 DB_MAX_OVERFLOW 个；
+    # 借出前先 ping 一次、并定期回收连接，避免使用已被 MySQL 因空闲超时断开的连接
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'connect_args': {'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5))}
+    }
+
+    # 异步报表任务配置
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS', 2))
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'report_cache'))
+    REPORT_CACHE_TTL_SECONDS = int(os.environ.get('REPORT_CACHE_TTL_SECONDS', 3600))
+    # 报表任务心跳间隔(秒)：排队中/执行中的任务超过 3 个间隔没有心跳时视为所属 worker 已崩溃，重新提交
+    REPORT_JOB_HEARTBEAT_SECONDS = int(os.environ.get('REPORT_JOB_HEARTBEAT_SECONDS', 10))
+
+    # 仪表盘聚合数据缓存时间(秒)，0 表示不缓存
+    DASHBOARD_CACHE_TTL_SECONDS = int(os.environ.get('DASHBOARD_CACHE_TTL_SECONDS', 60))
+
+    # 批量导入用户时并行哈希密码的线程数，默认为 CPU 核数
+    USER_IMPORT_HASH_WORKERS = int(os.environ.get('USER_IMPORT_HASH_WORKERS', 0)) or os.cpu_count()
+    # 批量导入用户的文件大小(字节)与数据行数上限
+    USER_IMPORT_MAX_FILE_SIZE = int(os.environ.get('USER_IMPORT_MAX_FILE_SIZE', 20 * 1024 * 1024))
+    USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS', 50000))
+
+    # 批量导入用户后台任务配置
+    USER_IMPORT_JOB_WORKERS = int(os.environ.get('USER_IMPORT_JOB_WORKERS', 1))
+    USER_IMPORT_JOB_DIR = os.environ.get('USER_IMPORT_JOB_DIR', os.path.join(tempfile.gettempdir(), 'user_import_jobs'))
+    USER_IMPORT_JOB_TTL_SECONDS = int(os.environ.get('USER_IMPORT_JOB_TTL_SECONDS', 24 * 3600))
+    # 后台导入任务每批处理的行数，每批结束后更新一次进度
+    USER_IMPORT_JOB_BATCH_SIZE = int(os.environ.get('USER_IMPORT_JOB_BATCH_SIZE', 100))
+    # 导入任务心跳间隔(秒)：排队中/执行中的任务超过 3 个间隔没有心跳时视为所属 worker 已退出，标记为失败
+    USER_IMPORT_JOB_HEARTBEAT_SECONDS = int(os.environ.get('USER_IMPORT_JOB_HEARTBEAT_SECONDS', 10))
+
+    # 通知推送(SSE)配置: 心跳间隔、单个连接最长保持时间(秒)、重连时最多补发的通知数
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15))
+    NOTIFICATION_STREAM_MAX_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_MAX_SECONDS', 300))
+    NOTIFICATION_STREAM_BACKFILL_LIMIT = int(os.environ.get('NOTIFICATION_STREAM_BACKFILL_LIMIT', 100))
+    # 只有单独的推送进程(gevent worker)开启，普通 API worker 对 /stream 返回 503；本地开发时可在 .env 中开启
+    NOTIFICATION_STREAM_ENABLED = os.environ.get('NOTIFICATION_STREAM_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    # 推送进程轮询新通知的间隔(秒)，以及打开推送连接用的凭证有效期(秒)
+    NOTIFICATION_STREAM_POLL_SECONDS = float(os.environ.get('NOTIFICATION_STREAM_POLL_SECONDS', 1))
+    NOTIFICATION_STREAM_TICKET_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_TICKET_SECONDS', 60))
+    # 相同内容的通知在该时间窗口(秒)内不重复发送给同一用户，0 表示不去重
+    NOTIFICATION_DEDUP_WINDOW_SECONDS = int(os.environ.get('NOTIFICATION_DEDUP_WINDOW_SECONDS', 600))
+
+    # 已读通知保留天数，超过后由 archive-notifications 命令移入归档表
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+
+    # 用户目录缓存时间(秒)。本进程内的用户增删改会立即失效缓存，其他 worker 中的修改最迟在该时间后可见
+    USER_DIRECTORY_CACHE_TTL_SECONDS = int(os.environ.get('USER_DIRECTORY_CACHE_TTL_SECONDS', 300))
+
+    # bcrypt 的 cost(2 的幂次轮数)。修改后，已有用户在下次登录成功时自动按新 cost 重新哈希
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # 每个 worker 中同时进行的密码校验数，超出时登录直接返回 503。
+    # 需小于 gunicorn 的 --threads (Dockerfile 中为 4)，登录洪峰时其余线程仍能处理其他请求
+    LOGIN_VERIFY_CONCURRENCY = int(os.environ.get('LOGIN_VERIFY_CONCURRENCY', 2))
+    # 登录失败次数限制：时间窗口(秒)内同一用户名/同一IP最多失败的次数，超过后返回 429
+    LOGIN_ATTEMPT_WINDOW_SECONDS = int(os.environ.get('LOGIN_ATTEMPT_WINDOW_SECONDS', 300))
+    LOGIN_MAX_ATTEMPTS_PER_USER = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_USER', 5))
+    LOGIN_MAX_ATTEMPTS_PER_IP = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_IP', 50))
+    # 后端前面的反向代理层数(frontend 的 nginx 为 1)，用于从 X-Forwarded-For 中取出客户端IP；直连时设为 0
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 1))
+    # 令牌吊销表的同步间隔(秒)：其他 worker 中的角色变更/禁用最迟在该时间后对本 worker 生效
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS', 5))
+    # 就绪检查(/api/health/ready)中数据库往返耗时超过该值(毫秒)时视为未就绪
+    HEALTH_DB_LATENCY_THRESHOLD_MS = int(os.environ.get('HEALTH_DB_LATENCY_THRESHOLD_MS', 1000))
@@ -37,4 +37,59 @@ def create_admin(username, password):
         # 存入数据库
         db.session.add(admin_user)
         db.session.commit()
-        print(f"Successfully created SUPER_ADMIN user: '{username}'.")
\ No newline at end of file
+        print(f"Successfully created SUPER_ADMIN user: '{username}'.")
+
+
+@app.cli.command("rebuild-commission-rollup")
+def rebuild_commission_rollup():
+    """根据提成明细全量重建月度提成汇总表"""
+    from app.services import commission_service
+
+    with app.app_context():
+        row_count = commission_service.rebuild_monthly_rollups()
+        print(f"Rebuilt commission_monthly_rollup: {row_count} rows.")
+
+
+@app.cli.command("recalculate-commissions")
+@click.option("--user-id", "user_ids", type=int, multiple=True, help="只重算该用户参与的订单，可重复指定")
+@click.option("--order-id", "order_ids", type=int, multiple=True, help="只重算该订单，可重复指定")
+@click.option("--apply", "apply_changes", is_flag=True, help="写入数据库；不加此参数时只预览差异")
+def recalculate_commissions(user_ids, order_ids, apply_changes):
+    """批量重算已核验订单的提成"""
+    from app.services import commission_service
+
+    with app.app_context():
+        result = commission_service.recalculate_commissions(
+            list(user_ids) or None, list(order_ids) or None, dry_run=not apply_changes
+        )
+        for diff in result["diffs"]:
+            for change in diff["changes"]:
+                print(f"{diff['order_uid']} user={change['user_id']} {change['role_at_time']}: "
+                      f"{change['old_amount']} -> {change['new_amount']}")
+        mode = "Applied" if apply_changes else "Dry run"
+        print(f"{mode}: {result['orders_changed']}/{result['orders_scanned']} orders changed, "
+              f"total delta {result['total_delta']}.")
+
+
+@app.cli.command("archive-notifications")
+@click.option("--days", type=int, default=None, help="归档多少天前的已读通知，默认取 NOTIFICATION_RETENTION_DAYS")
+@click.option("--batch-size", type=int, default=1000, show_default=True, help="每批移动的条数")
+@click.option("--max-batches", type=int, default=None, help="本次最多处理的批数，默认处理完为止")
+@click.option("--pause", type=float, default=0.1, show_default=True, help="每批之间停顿的秒数")
+@click.option("--every", type=int, default=None, help="常驻运行，每隔多少秒执行一次（用于定时任务容器）")
+def archive_notifications(days, batch_size, max_batches, pause, every):
+    """将已读的旧通知分批移入归档表"""
+    import time
+    from app.services import notification_archive_service
+
+    with app.app_context():
+        days = days if days is not None else app.config['NOTIFICATION_RETENTION_DAYS']
+        while True:
+            result = notification_archive_service.archive_read_notifications(
+                days, batch_size=batch_size, max_batches=max_batches, pause_seconds=pause
+            )
+            print(f"Archived {result['archived']} read notifications created before "
+                  f"{result['cutoff']} in {result['batches']} batches.", flush=True)
+            if not every:
+                break
+            time.sleep(every)
@@ -0,0 +1,52 @@
+"""backfill order_status_events for orders created before status tracking
+
+Revision ID: b5e18c3f7a20
+Revises: 6a9d2e4b7c18
+Create Date: 2026-10-19 10:21:44.608153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e18c3f7a20'
+down_revision = '6a9d2e4b7c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # c41e7a9d2b53 之前创建的订单没有流转记录，技术人员的本期完成数(按进入"可结算"的流转记录统计)
+    # 对历史周期一律为 0。沿用此前的口径补写记录：
+
+    # 1. 已到达"可结算"及之后状态、但没有"可结算"记录的订单，补一条"可结算"记录。
+    #    时间取该订单最早的流转记录(迁移后才发生的后续流转)，没有记录时取 updated_at
+    op.execute("""
+        INSERT INTO order_status_events (order_id, from_status, to_status, changed_by_id, changed_by_role, created_at)
+        SELECT o.id, NULL, 'PENDING_SETTLEMENT', NULL, NULL,
+               COALESCE((SELECT MIN(e.created_at) FROM order_status_events e WHERE e.order_id = o.id),
+                        o.updated_at, o.created_at)
+        FROM orders o
+        WHERE o.status IN ('PENDING_SETTLEMENT', 'VERIFIED', 'SETTLED')
+          AND NOT EXISTS (
+              SELECT 1 FROM order_status_events e
+              WHERE e.order_id = o.id AND e.to_status = 'PENDING_SETTLEMENT'
+          )
+    """)
+
+    # 2. 没有当前状态记录的订单，按当前状态和 updated_at 补一条记录
+    op.execute("""
+        INSERT INTO order_status_events (order_id, from_status, to_status, changed_by_id, changed_by_role, created_at)
+        SELECT o.id, NULL, o.status, NULL, NULL, COALESCE(o.updated_at, o.created_at)
+        FROM orders o
+        WHERE NOT EXISTS (
+            SELECT 1 FROM order_status_events e
+            WHERE e.order_id = o.id AND e.to_status = o.status
+        )
+    """)
+
+
+def downgrade():
+    # 补写的记录与真实记录无法区分，降级时保留
+    pass
@@ -154,7 +154,7 @@ wait_for_services() {
     # 等待后端就绪
     echo -n "等待后端服务启动"
     for i in {1..30}; do
-        if curl -f http://localhost:5000/api/health >/dev/null 2>&1; then
+        if curl -f http://localhost:5000/api/health/ready >/dev/null 2>&1; then
             break
         fi
         echo -n "."
@@ -209,7 +209,7 @@ health_check() {
     echo "🔍 服务健康检查:"
     
     # 检查后端
-    if curl -f http://localhost:5000/api/health >/dev/null 2>&1; then
+    if curl -f http://localhost:5000/api/health/ready >/dev/null 2>&1; then
         echo "✅ 后端服务: 健康"
     else
         echo "❌ 后端服务: 异常"
@@ -5,8 +5,9 @@ import { type Order, OrderStatus, UserRole } from '@/services/types'
 /**
  * 封装订单详情页中的所有操作逻辑和权限判断
  * @param order - 一个包含订单信息的 Ref 对象
+ * @param nextStatuses - 后端返回的当前用户可流转到的状态，状态类操作以此为准
  */
-export function useOrderActions(order: Ref<Order | null>) {
+export function useOrderActions(order: Ref<Order | null>, nextStatuses: Ref<OrderStatus[]>) {
   const authStore = useAuthStore()
   const userRole = computed(() => authStore.userRole)
   const currentUserId = computed(() => (authStore.user?.sub ? parseInt(authStore.user.sub, 10) : null))
@@ -24,27 +25,19 @@ export function useOrderActions(order: Ref<Order | null>) {
   });
 
   // --- 权限计算属性 ---
-  const canCancelOrder = computed(() => {
-    if (!order.value) return false;
-    // + 如果是超管，则忽略锁定状态
-    if (isSuperAdmin.value) return ![OrderStatus.SETTLED, OrderStatus.CANCELLED].includes(order.value.status);
-    // 对其他角色，保持原有逻辑
-    if (!isCS.value) return false;
-    return !order.value.is_locked && ![OrderStatus.SETTLED, OrderStatus.CANCELLED].includes(order.value.status);
-  });
+  // 状态流转的权限(含锁定、超管豁免)由后端状态机决定，这里只判断目标状态是否在允许列表中
+  const canTransitionTo = (status: OrderStatus) => !!order.value && nextStatuses.value.includes(status);
+
+  const canCancelOrder = computed(() => canTransitionTo(OrderStatus.CANCELLED));
 
   const canRevertToDev = computed(() => {
     if (!order.value) return false;
-    // + 如果是超管，则忽略锁定状态
-    if (isSuperAdmin.value) return [OrderStatus.SHIPPED, OrderStatus.RECEIVED].includes(order.value.status);
-    // 对其他角色，保持原有逻辑
-    if (!isCS.value) return false;
-    return !order.value.is_locked && [OrderStatus.SHIPPED, OrderStatus.RECEIVED].includes(order.value.status);
+    return [OrderStatus.SHIPPED, OrderStatus.RECEIVED].includes(order.value.status) && canTransitionTo(OrderStatus.IN_DEVELOPMENT);
   });
 
 
   const canSettleByTech = computed(() => {
-    return isTech.value && isAssignedDeveloper.value && order.value?.status === OrderStatus.RECEIVED
+    return isAssignedDeveloper.value && canTransitionTo(OrderStatus.PENDING_SETTLEMENT)
   })
 
   const canAddWorkLog = computed(() => {
@@ -61,6 +54,7 @@ export function useOrderActions(order: Ref<Order | null>) {
     isAssignedDeveloper,
 
     // 权限
+    canTransitionTo,
     canCancelOrder,
     canRevertToDev,
     canSettleByTech,
@@ -9,16 +9,19 @@ const apiClient = axios.create({
   },
 })
 
-// 请求拦截器：在每个请求前都附加上Token
+// 请求拦截器：在每个请求前都附加上Token (已显式指定 Authorization 的请求除外，如刷新令牌)
 apiClient.interceptors.request.use((config) => {
   const authStore = useAuthStore()
   const token = authStore.token
-  if (token) {
+  if (token && !config.headers.Authorization) {
     config.headers.Authorization = `Bearer ${token}`
   }
   return config
 })
 
+// 登录、刷新、登出接口返回 401 时不再尝试刷新令牌
+const AUTH_ENDPOINTS = ['/auth/login', '/auth/refresh', '/auth/logout']
+
 // --- 响应拦截器 (新增代码) ---
 // 在收到响应后进行处理
 apiClient.interceptors.response.use(
@@ -26,14 +29,25 @@ apiClient.interceptors.response.use(
   (response) => response,
 
   // 对于失败的响应 (非 2xx 状态码)，进行处理
-  (error) => {
+  async (error) => {
+    const config = error.config
     // 检查是否是 401 Unauthorized 错误
-    if (error.response && error.response.status === 401) {
-      // 如果是 401 错误，说明 token 无效或已过期
+    if (
+      error.response &&
+      error.response.status === 401 &&
+      config &&
+      !AUTH_ENDPOINTS.includes(config.url)
+    ) {
       const authStore = useAuthStore()
+      // Access Token 已过期：先用 Refresh Token 换发新令牌，再重试一次原请求
+      if (!config._retried && (await authStore.refreshAccessToken())) {
+        config._retried = true
+        config.headers.Authorization = `Bearer ${authStore.token}`
+        return apiClient(config)
+      }
+      // 刷新失败(Refresh Token 过期、已被吊销或账号被禁用)，清空本地会话并跳转到登录页
       console.error('Authentication Error: Token is invalid or expired. Logging out.')
-      // 调用 logout 方法，它会清空本地存储并跳转到登录页
-      authStore.logout()
+      authStore.clearSession()
     }
     // 将错误继续抛出，以便组件中的 .catch() 可以捕获到
     return Promise.reject(error)
@@ -2,11 +2,22 @@
 
 import apiClient from './api'
 
+// 统计周期参数，不传时默认为本月
+export interface DashboardPeriodParams {
+  period?: 'month' | 'quarter' | 'custom';
+  year?: number;
+  month?: number;
+  quarter?: number;
+  start_date?: string;
+  end_date?: string;
+}
+
 // 定义个人仪表盘数据的接口
 export interface PersonalDashboardStats {
   monthly_orders_created?: number;
   monthly_orders_completed?: number;
   total_commission_earned: number;
+  period_commission_earned?: number;
 }
 
 // 定义全局仪表盘数据的接口
@@ -32,8 +43,8 @@ export const dashboardService = {
   /**
    * 获取个人业绩数据 (客服/技术)
    */
-  getPersonalDashboard(): Promise<PersonalDashboardStats> {
-    return apiClient.get('/v1/dashboard/personal').then((res) => res.data)
+  getPersonalDashboard(params: DashboardPeriodParams = {}): Promise<PersonalDashboardStats> {
+    return apiClient.get('/v1/dashboard/personal', { params }).then((res) => res.data)
   },
 
   /**
@@ -45,8 +56,8 @@ export const dashboardService = {
   /**
    * 获取团队绩效统计数据 (超管)
    */
-  getTeamPerformance(): Promise<TeamPerformanceStats> {
-    return apiClient.get('/v1/dashboard/team-performance').then((res) => res.data);
+  getTeamPerformance(params: DashboardPeriodParams = {}): Promise<TeamPerformanceStats> {
+    return apiClient.get('/v1/dashboard/team-performance', { params }).then((res) => res.data);
   },
 
 }
@@ -1,14 +1,57 @@
 // frontend/src/services/notificationService.ts (新建文件)
 
 import apiClient from './api'
-import type { Notification } from './types' // 确保你的 types.ts 文件导出了 Notification 类型
+import type { Notification, NotificationPage } from './types' // 确保你的 types.ts 文件导出了 Notification 类型
+
+export type NotificationListParams = {
+  unread_only?: boolean
+  cursor?: string
+  limit?: number
+}
 
 export const notificationService = {
   /**
-   * 获取当前用户的所有通知
+   * 分页获取当前用户的通知，传入上一页的 next_cursor 获取下一页
+   */
+  getNotifications(params: NotificationListParams = {}): Promise<NotificationPage> {
+    return apiClient.get('/notifications/', { params }).then((res) => res.data)
+  },
+
+  /**
+   * 获取当前用户的未读通知数
+   */
+  getUnreadCount(): Promise<number> {
+    return apiClient.get('/notifications/unread-count').then((res) => res.data.unread_count)
+  },
+
+  /**
+   * 批量标记已读，不传 ids 时标记全部
+   * @param ids 要标记的通知ID列表
+   */
+  markManyAsRead(ids?: number[]): Promise<number> {
+    const body = ids ? { ids } : { all: true }
+    return apiClient.post('/notifications/read', body).then((res) => res.data.updated)
+  },
+
+  /**
+   * 获取打开推送连接用的短期凭证(有效期约一分钟)
+   */
+  createStreamTicket(): Promise<string> {
+    return apiClient.post('/notifications/stream-ticket').then((res) => res.data.ticket)
+  },
+
+  /**
+   * 打开通知实时推送(SSE)连接。EventSource 无法设置请求头，使用短期凭证而不是访问令牌放在 URL 中；
+   * 服务端补发 lastEventId 之后错过的通知
+   * @param ticket createStreamTicket 返回的凭证
+   * @param lastEventId 已收到的最后一条通知ID
    */
-  getNotifications(): Promise<Notification[]> {
-    return apiClient.get('/notifications/').then((res) => res.data)
+  openStream(ticket: string, lastEventId: number | null = null): EventSource {
+    const params = new URLSearchParams({ ticket })
+    if (lastEventId !== null) {
+      params.set('last_event_id', String(lastEventId))
+    }
+    return new EventSource(`${apiClient.defaults.baseURL}/notifications/stream?${params}`)
   },
 
   /**
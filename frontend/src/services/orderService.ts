@@ -1,7 +1,7 @@
 // frontend/src/services/orderService.ts
 
 import apiClient from './api'
-import type { Order, OrderStatus, WorkLog } from './types'
+import type { Order, OrderPage, OrderStatus, OrderTransitions, WorkLog } from './types'
 
 type OrderCreationData = Partial<Order> & {
   customer_info: object
@@ -20,14 +20,25 @@ type OrderUpdateData = {
   developer_id?: number
 }
 
+// 订单列表的筛选与分页参数
+type OrderListParams = {
+  status?: OrderStatus
+  creator_id?: number
+  developer_id?: number
+  start_date?: string
+  end_date?: string
+  cursor?: string
+  limit?: number
+}
+
 // ---【任务 4.1】新增用于创建工作日志的类型 ---
 type WorkLogCreationData = {
   log_content: string
 }
 
 export const orderService = {
-  getOrders(): Promise<Order[]> {
-    return apiClient.get('/orders/').then((res) => res.data)
+  getOrders(params: OrderListParams = {}): Promise<OrderPage> {
+    return apiClient.get('/orders/', { params }).then((res) => res.data)
   },
 
   createOrder(orderData: OrderCreationData): Promise<Order> {
@@ -53,6 +64,11 @@ export const orderService = {
     return apiClient.post(`/orders/${id}/status`, { status }).then((res) => res.data)
   },
 
+  // 获取当前用户可执行的下一步状态
+  getOrderTransitions(id: number): Promise<OrderTransitions> {
+    return apiClient.get(`/orders/${id}/transitions`).then((res) => res.data)
+  },
+
   // --- ADDED: 客服更新订单信息 ---
   updateOrderDetails(id: number, data: OrderUpdateData): Promise<Order> {
     return apiClient.patch(`/orders/${id}`, data).then((res) => res.data)
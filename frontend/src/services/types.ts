@@ -88,10 +88,45 @@ export interface Order {
   created_at: string
   updated_at: string
   shipped_at?: string | null
+  verified_at?: string | null
+  settled_at?: string | null
   logs: WorkLog[]
   commissions: Commission[]
 }
 
+// 订单列表中的精简订单（不含工作日志和提成）
+export type OrderSummary = Omit<Order, 'logs' | 'commissions'>
+
+// 订单列表分页返回结构
+export interface OrderPage {
+  items: OrderSummary[]
+  next_cursor: string | null
+}
+
+// 当前用户可将订单流转到的下一步状态
+export interface OrderTransitions {
+  order_id: number
+  status: OrderStatus
+  next_statuses: OrderStatus[]
+}
+
+// 批量导入用户的后台任务
+export interface UserImportJob {
+  job_id: string
+  filename: string
+  status: 'pending' | 'running' | 'done' | 'failed'
+  total_rows: number | null
+  processed_rows: number
+  success_count: number
+  failure_count: number
+  eta_seconds?: number | null
+  errors: string[]
+  error: string | null
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
+
 export interface Notification {
   id: number;
   content: string;
@@ -99,3 +134,9 @@ export interface Notification {
   related_order_id: number | null;
   created_at: string;
 }
+
+// 通知列表分页返回结构
+export interface NotificationPage {
+  items: Notification[]
+  next_cursor: string | null
+}
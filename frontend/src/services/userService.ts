@@ -2,7 +2,7 @@
 
 import apiClient from './api'
 import type { User } from './types'
-import type { UserCreationData } from './types'
+import type { UserCreationData, UserImportJob } from './types'
 
 
 export const userService = {
@@ -15,7 +15,7 @@ export const userService = {
 
   /**
      * 批量导入用户
-     * @param file Excel文件对象
+     * @param file Excel(.xlsx) 或 CSV 文件对象
      */
   batchImportUsers(file: File): Promise<{ success_count: number; failure_count: number; errors: string[] }> {
       const formData = new FormData();
@@ -28,6 +28,29 @@ export const userService = {
       }).then(res => res.data);
   },
 
+  /**
+   * 提交后台批量导入任务，立即返回任务信息
+   * @param file Excel(.xlsx) 或 CSV 文件对象
+   */
+  startImportJob(file: File): Promise<UserImportJob> {
+      const formData = new FormData();
+      formData.append('file', file);
+
+      return apiClient.post('/users/import/jobs', formData, {
+          headers: {
+              'Content-Type': undefined,
+          },
+      }).then(res => res.data);
+  },
+
+  /**
+   * 查询批量导入任务的进度
+   * @param jobId 任务ID
+   */
+  getImportJob(jobId: string): Promise<UserImportJob> {
+    return apiClient.get(`/users/import/jobs/${jobId}`).then((res) => res.data);
+  },
+
   /**
    * 【新增】创建新用户
    * @param userData 创建用户所需的数据
@@ -14,6 +14,7 @@ function parseJwt(token: string) {
 
 export const useAuthStore = defineStore('auth', () => {
   const token = ref(localStorage.getItem('token'))
+  const refreshToken = ref(localStorage.getItem('refreshToken'))
   const user = ref(JSON.parse(localStorage.getItem('user') || '{}'))
 
   const isAuthenticated = computed(() => !!token.value)
@@ -22,13 +23,7 @@ export const useAuthStore = defineStore('auth', () => {
   async function login(username: string, password: string): Promise<boolean> {
     try {
       const response = await apiClient.post('/auth/login', { username, password })
-      const newTocken = response.data.access_token
-
-      token.value = newTocken
-      user.value = parseJwt(newTocken)
-
-      localStorage.setItem('token', newTocken)
-      localStorage.setItem('user', JSON.stringify(user.value))
+      saveTokens(response.data.access_token, response.data.refresh_token)
 
       await router.push('/') // 登录成功后跳转到首页
       return true
@@ -39,13 +34,100 @@ export const useAuthStore = defineStore('auth', () => {
     }
   }
 
-  function logout() {
+  function saveTokens(accessToken: string, newRefreshToken: string) {
+    token.value = accessToken
+    refreshToken.value = newRefreshToken
+    user.value = parseJwt(accessToken)
+
+    localStorage.setItem('token', accessToken)
+    localStorage.setItem('refreshToken', newRefreshToken)
+    localStorage.setItem('user', JSON.stringify(user.value))
+  }
+
+  // 从 localStorage 读取令牌，同一浏览器的各标签页共享同一份
+  function loadFromStorage() {
+    token.value = localStorage.getItem('token')
+    refreshToken.value = localStorage.getItem('refreshToken')
+    user.value = JSON.parse(localStorage.getItem('user') || '{}')
+  }
+
+  // 其他标签页刷新令牌或登出后，同步到本标签页
+  window.addEventListener('storage', (event) => {
+    if (event.storageArea !== localStorage) return
+    if (event.key !== null && !['token', 'refreshToken', 'user'].includes(event.key)) return
+    loadFromStorage()
+    if (!token.value && router.currentRoute.value.path !== '/login') {
+      router.push('/login')
+    }
+  })
+
+  // Access Token 过期后用 Refresh Token 换发新令牌。
+  // 每个 Refresh Token 只能使用一次，并发的请求共用同一次刷新；
+  // 多个标签页之间用 Web Locks 排队，拿到锁后先看其他标签页是否已经刷新过
+  let refreshing: Promise<boolean> | null = null
+
+  function refreshAccessToken(): Promise<boolean> {
+    if (!refreshing) {
+      const task = () => rotateTokens()
+      refreshing = (navigator.locks ? navigator.locks.request('auth-refresh', task) : task()).finally(() => {
+        refreshing = null
+      })
+    }
+    return refreshing
+  }
+
+  async function rotateTokens(): Promise<boolean> {
+    const usedToken = refreshToken.value
+    loadFromStorage()
+    if (!refreshToken.value) return false
+    if (refreshToken.value !== usedToken) return true
+
+    try {
+      const response = await apiClient.post('/auth/refresh', null, {
+        headers: { Authorization: `Bearer ${refreshToken.value}` },
+      })
+      saveTokens(response.data.access_token, response.data.refresh_token)
+      return true
+    } catch (error) {
+      // 不支持 Web Locks 的浏览器中，其他标签页可能同时用同一个令牌刷新成功
+      loadFromStorage()
+      if (refreshToken.value && refreshToken.value !== usedToken) return true
+      console.error('Token refresh failed:', error)
+      return false
+    }
+  }
+
+  function clearSession() {
     token.value = null
+    refreshToken.value = null
     user.value = {}
     localStorage.removeItem('token')
+    localStorage.removeItem('refreshToken')
     localStorage.removeItem('user')
     router.push('/login')
   }
 
-  return { token, user, isAuthenticated, userRole, login, logout }
+  function logout() {
+    // 通知服务端作废 Refresh Token，不等待结果
+    if (refreshToken.value) {
+      apiClient
+        .post('/auth/logout', null, {
+          headers: { Authorization: `Bearer ${refreshToken.value}` },
+        })
+        .catch(() => {})
+    }
+    clearSession()
+  }
+
+  return {
+    token,
+    refreshToken,
+    user,
+    isAuthenticated,
+    userRole,
+    login,
+    logout,
+    clearSession,
+    refreshAccessToken,
+  }
 })
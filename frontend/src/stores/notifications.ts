@@ -6,21 +6,131 @@ import { notificationService } from '@/services/notificationService'
 import type { Notification } from '@/services/types'
 import { message } from 'ant-design-vue'
 
+// 推送连接断开后重连的退避间隔(毫秒)
+const RECONNECT_MIN_MS = 3000
+const RECONNECT_MAX_MS = 60000
+
 export const useNotificationStore = defineStore('notifications', () => {
   const notifications = ref<Notification[]>([])
+  const nextCursor = ref<string | null>(null)
+  // 未读数由服务端统计，不再依赖已加载的列表
+  const unreadCount = ref(0)
+
+  const hasMore = computed(() => nextCursor.value !== null)
+
+  let stream: EventSource | null = null
+  let streamWanted = false
+  let reconnectTimer: ReturnType<typeof setTimeout> | null = null
+  let reconnectDelay = RECONNECT_MIN_MS
+  let lastEventId: number | null = null
+
+  // 订阅服务端推送的新通知，替代轮询
+  function connectStream() {
+    lastEventId = null
+    reconnectDelay = RECONNECT_MIN_MS
+    openStream()
+  }
+
+  async function openStream() {
+    disconnectStream()
+    streamWanted = true
+    let ticket: string
+    try {
+      ticket = await notificationService.createStreamTicket()
+    } catch {
+      scheduleReconnect()
+      return
+    }
+    if (!streamWanted || stream) return
+
+    stream = notificationService.openStream(ticket, lastEventId)
+    stream.onopen = () => {
+      reconnectDelay = RECONNECT_MIN_MS
+    }
+    stream.addEventListener('notification', (event) => {
+      const notification: Notification = JSON.parse((event as MessageEvent).data)
+      lastEventId = Math.max(lastEventId ?? 0, notification.id)
+      if (notifications.value.some((n) => n.id === notification.id)) return
+      notifications.value.unshift(notification)
+      if (!notification.is_read) {
+        unreadCount.value += 1
+      }
+    })
+    // 凭证只在打开连接时有效，浏览器自动重连被拒绝(或推送服务不可用)后不再重试；
+    // 此时按指数退避重新获取凭证再连接，期间刷新未读数
+    stream.onerror = () => {
+      if (stream && stream.readyState === EventSource.CLOSED) {
+        stream.close()
+        stream = null
+        fetchUnreadCount()
+        scheduleReconnect()
+      }
+    }
+  }
+
+  function scheduleReconnect() {
+    if (!streamWanted || reconnectTimer) return
+    reconnectTimer = setTimeout(() => {
+      reconnectTimer = null
+      if (streamWanted) openStream()
+    }, reconnectDelay)
+    reconnectDelay = Math.min(reconnectDelay * 2, RECONNECT_MAX_MS)
+  }
+
+  function disconnectStream() {
+    streamWanted = false
+    if (reconnectTimer) {
+      clearTimeout(reconnectTimer)
+      reconnectTimer = null
+    }
+    if (stream) {
+      stream.close()
+      stream = null
+    }
+  }
 
-  const unreadCount = computed(() => {
-    return notifications.value.filter((n) => !n.is_read).length
-  })
+  async function fetchUnreadCount() {
+    try {
+      unreadCount.value = await notificationService.getUnreadCount()
+    } catch (error) {
+      console.error('Failed to fetch unread count:', error)
+    }
+  }
 
+  // 重新加载第一页
   async function fetchNotifications() {
     try {
-      const data = await notificationService.getNotifications()
-      notifications.value = data
+      const page = await notificationService.getNotifications()
+      notifications.value = page.items
+      nextCursor.value = page.next_cursor
     } catch (error) {
       console.error('Failed to fetch notifications:', error)
       message.error('获取通知列表失败')
     }
+    await fetchUnreadCount()
+  }
+
+  async function loadMore() {
+    if (!nextCursor.value) return
+    try {
+      const page = await notificationService.getNotifications({ cursor: nextCursor.value })
+      notifications.value.push(...page.items)
+      nextCursor.value = page.next_cursor
+    } catch (error) {
+      console.error('Failed to load more notifications:', error)
+      message.error('获取通知列表失败')
+    }
+  }
+
+  async function markAllAsRead() {
+    try {
+      await notificationService.markManyAsRead()
+      notifications.value = notifications.value.map((n) => ({ ...n, is_read: true }))
+      unreadCount.value = 0
+    } catch (error) {
+      console.error('Failed to mark all notifications as read:', error)
+      message.error('标记已读失败')
+    }
   }
 
   async function markOneAsRead(notificationId: number) {
@@ -36,6 +146,7 @@ export const useNotificationStore = defineStore('notifications', () => {
         // 使用 splice 方法替换数组中的元素，以确保 Vue 能够检测到变化
         notifications.value.splice(index, 1, updatedNotification);
       }
+      unreadCount.value = Math.max(0, unreadCount.value - 1)
     } catch (error) {
       console.error('Failed to mark notification as read:', error)
       message.error('标记已读失败')
@@ -44,7 +155,13 @@ export const useNotificationStore = defineStore('notifications', () => {
   return {
     notifications,
     unreadCount,
+    hasMore,
+    fetchUnreadCount,
     fetchNotifications,
+    loadMore,
     markOneAsRead,
+    markAllAsRead,
+    connectStream,
+    disconnectStream,
   }
 })